@@ -7,6 +7,9 @@ from aiida_gui.app.process_node import router as process_router
 from aiida_gui.app.daemon import router as daemon_router
 from aiida_gui.app.data_node import router as datanode_router
 from aiida_gui.app.group_node import router as groupnode_router
+from aiida_gui.app.events import router as events_router
+from aiida_gui.app.repository import router as repository_router
+from aiida_gui.app.jobs import router as jobs_router
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 import os
@@ -40,6 +43,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    # ETag lets polling clients send If-None-Match; the X-Frame-* headers
+    # describe binary trajectory frames, the others partial file downloads
+    expose_headers=[
+        "ETag",
+        "Content-Range",
+        "X-File-Size",
+        "X-Frame-Start",
+        "X-Frame-Stop",
+        "X-Frame-Stride",
+        "X-Frame-Count",
+        "X-Atom-Count",
+        "X-Has-Cell",
+    ],
 )
 
 
@@ -62,6 +78,9 @@ app.include_router(process_router)
 app.include_router(datanode_router)
 app.include_router(groupnode_router)
 app.include_router(daemon_router)
+app.include_router(events_router)
+app.include_router(repository_router)
+app.include_router(jobs_router)
 mount_plugins(app)
 
 
@@ -70,6 +89,26 @@ async def debug() -> dict:
     return {"loaded_aiida_profile": manager.get_manager().get_profile()}
 
 
+@app.get("/api/stats")
+async def read_stats() -> dict:
+    """Return the counters of the caches, request coalescing and executor."""
+    from aiida_gui.app.cache import (
+        ancestor_cache,
+        count_cache,
+        sealed_cache,
+        single_flight,
+    )
+    from aiida_gui.app.executor import executor_stats
+
+    return {
+        "count_cache": count_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "sealed_cache": sealed_cache.stats(),
+        "ancestor_cache": ancestor_cache.stats(),
+        "executor": executor_stats(),
+    }
+
+
 @app.get("/backend-setting")
 async def backend_settings():
     return backend_settings
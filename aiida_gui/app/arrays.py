@@ -0,0 +1,196 @@
+"""Read row slices of the numpy arrays of `ArrayData` nodes.
+
+Arrays are stored as ``<name>.npy`` files in the node repository. Instead of
+loading a whole array, the npy header is parsed and only the rows of the
+requested slice (along the first axis) are read: loose repository files are
+memory-mapped, packed ones are read with seeks. Slices are served as npy or,
+with `pyarrow` installed, as Arrow IPC tensors.
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import math
+import os
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple, Union
+
+import numpy
+from numpy.lib import format as npy_format
+
+# bytes per chunk when streaming arrays
+CHUNK_SIZE = 1024 * 1024
+
+
+def read_npy_header(handle: BinaryIO) -> Tuple[Tuple[int, ...], Any, bool, int]:
+    """
+    Return (shape, dtype, fortran order, data offset) of the npy file open in
+    `handle`, which must be at its start.
+    """
+    version = npy_format.read_magic(handle)
+    if version == (1, 0):
+        shape, fortran_order, dtype = npy_format.read_array_header_1_0(handle)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = npy_format.read_array_header_2_0(handle)
+    else:
+        raise ValueError(f"Unsupported npy format version {version}")
+    return shape, dtype, fortran_order, handle.tell()
+
+
+def read_rows(
+    handle: BinaryIO,
+    start: Optional[int] = None,
+    stop: Optional[int] = None,
+    step: Optional[int] = None,
+) -> numpy.ndarray:
+    """Return the rows `start:stop:step` of the npy file open in `handle`."""
+    path = getattr(handle, "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        array = numpy.load(path, mmap_mode="r", allow_pickle=False)
+        return numpy.array(array[start:stop:step])
+
+    shape, dtype, fortran_order, offset = read_npy_header(handle)
+    if fortran_order or dtype.hasobject or not shape:
+        handle.seek(0)
+        return numpy.load(handle, allow_pickle=False)[start:stop:step]
+
+    indices = range(*slice(start, stop, step).indices(shape[0]))
+    row_shape = shape[1:]
+    row_size = dtype.itemsize * math.prod(row_shape)
+    if not indices:
+        return numpy.empty((0, *row_shape), dtype=dtype)
+    if indices.step == 1:
+        handle.seek(offset + indices.start * row_size)
+        buffer = handle.read(len(indices) * row_size)
+    else:
+        chunks = []
+        for index in indices:
+            handle.seek(offset + index * row_size)
+            chunks.append(handle.read(row_size))
+        buffer = b"".join(chunks)
+    return numpy.frombuffer(buffer, dtype=dtype).reshape((len(indices), *row_shape))
+
+
+def get_array_shape(node, name: str) -> Optional[Tuple[int, ...]]:
+    """Return the shape of array `name` of an `ArrayData` node, or None."""
+    shape = node.base.attributes.get(f"{node.array_prefix}{name}", None)
+    return tuple(shape) if shape is not None else None
+
+
+def get_array_rows(
+    node,
+    name: str,
+    start: Optional[int] = None,
+    stop: Optional[int] = None,
+    step: Optional[int] = None,
+) -> numpy.ndarray:
+    """Return the rows `start:stop:step` of array `name` of an `ArrayData` node."""
+    filename = f"{name}.npy"
+    if filename not in node.base.repository.list_object_names():
+        raise KeyError(f"Array with name `{name}` not found in ArrayData<{node.pk}>")
+    with node.base.repository.open(filename, mode="rb") as handle:
+        return read_rows(handle, start, stop, step)
+
+
+def get_array_header(node, name: str) -> Dict[str, Any]:
+    """Return the shape, dtype and size of array `name` of an `ArrayData`
+    node, read from the npy header without loading the array."""
+    filename = f"{name}.npy"
+    if filename not in node.base.repository.list_object_names():
+        raise KeyError(f"Array with name `{name}` not found in ArrayData<{node.pk}>")
+    with node.base.repository.open(filename, mode="rb") as handle:
+        shape, dtype, fortran_order, _ = read_npy_header(handle)
+    return {
+        "shape": list(shape),
+        "dtype": dtype.str,
+        "fortran_order": fortran_order,
+        "nbytes": int(dtype.itemsize * math.prod(shape)),
+    }
+
+
+def parse_index(text: Optional[str]) -> Tuple[Union[int, slice], ...]:
+    """Parse a numpy-style index such as `0:10,::2,3` into a tuple of slices
+    and integers."""
+    if not text:
+        return ()
+    index = []
+    for part in text.split(","):
+        part = part.strip()
+        if ":" in part:
+            bounds = part.split(":")
+            if len(bounds) > 3:
+                raise ValueError(f"Invalid slice `{part}`")
+            index.append(slice(*(int(b) if b.strip() else None for b in bounds)))
+            if index[-1].step == 0:
+                raise ValueError(f"Slice step cannot be zero in `{part}`")
+        elif part:
+            index.append(int(part))
+        else:
+            index.append(slice(None))
+    return tuple(index)
+
+
+def slice_array(node, name: str, index: Tuple[Union[int, slice], ...]) -> numpy.ndarray:
+    """
+    Return `array[index]` of array `name` of an `ArrayData` node, reading
+    only the rows selected along the first axis from the repository.
+    """
+    if not index:
+        return get_array_rows(node, name)
+    first, rest = index[0], index[1:]
+    if isinstance(first, int):
+        length = get_array_shape(node, name)[0]
+        row = first + length if first < 0 else first
+        if not 0 <= row < length:
+            raise IndexError(
+                f"Index {first} is out of bounds for axis 0 of size {length}"
+            )
+        array = get_array_rows(node, name, row, row + 1)[0]
+    else:
+        array = get_array_rows(node, name, first.start, first.stop, first.step)
+        rest = (slice(None), *rest)
+    return array[rest] if rest else array
+
+
+def iter_array_file(node, name: str) -> Iterator[bytes]:
+    """
+    Return an iterator over the chunks of the npy file of array `name` of an
+    `ArrayData` node. The file is opened right away, so the iterator can be
+    consumed after the storage session of the caller was closed.
+    """
+    stack = contextlib.ExitStack()
+    handle = stack.enter_context(node.base.repository.open(f"{name}.npy", mode="rb"))
+
+    def iterate():
+        with stack:
+            while True:
+                chunk = handle.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    return iterate()
+
+
+def iter_npy(array: numpy.ndarray) -> Iterator[bytes]:
+    """Yield `array` in the npy format in chunks, without copying it whole."""
+    # `require` keeps the shape of 0-d selections, `ascontiguousarray` does not
+    array = numpy.require(array, requirements="C")
+    header = io.BytesIO()
+    npy_format.write_array_header_1_0(
+        header, npy_format.header_data_from_array_1_0(array)
+    )
+    yield header.getvalue()
+    data = memoryview(array.reshape(-1)).cast("B")
+    for offset in range(0, len(data), CHUNK_SIZE):
+        yield bytes(data[offset : offset + CHUNK_SIZE])
+
+
+def array_to_arrow(array: numpy.ndarray) -> bytes:
+    """Return `array` as an Arrow IPC tensor message; needs `pyarrow`."""
+    import pyarrow
+
+    sink = pyarrow.BufferOutputStream()
+    pyarrow.ipc.write_tensor(
+        pyarrow.Tensor.from_numpy(numpy.require(array, requirements="C")), sink
+    )
+    return sink.getvalue().to_pybytes()
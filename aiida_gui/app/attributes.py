@@ -0,0 +1,365 @@
+"""Read large attribute dictionaries of nodes piece by piece.
+
+A `Dict` node holding parsed output can have attributes of hundreds of
+megabytes. Instead of loading the node, the attributes are inspected with
+the JSON functions of the database (`jsonb` on PostgreSQL, `json1` on
+SQLite): values up to a size limit are returned as they are, larger ones
+are replaced by a marker with their type, size and number of items, and
+can be opened one level at a time with a dotted `path` like the
+QueryBuilder's `attributes.a.b.0`, where a backslash escapes a dot in a
+key. On storage backends without SQL access the attributes are loaded
+with the QueryBuilder and inspected in Python instead.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiida_gui.app.utils import execute_sql, get_storage_session, supports_raw_sql
+
+# values of at most this many bytes of JSON are sent as they are
+ATTRIBUTE_VALUE_MAX_BYTES = int(
+    os.getenv("AIIDA_GUI_ATTRIBUTE_VALUE_MAX_BYTES", str(10 * 1024))
+)
+# keys or items of a truncated value listed per request
+ATTRIBUTE_CHILD_LIMIT = int(os.getenv("AIIDA_GUI_ATTRIBUTE_CHILD_LIMIT", "200"))
+
+# json_type() of SQLite → jsonb_typeof() of PostgreSQL
+SQLITE_JSON_TYPES = {
+    "integer": "number",
+    "real": "number",
+    "text": "string",
+    "true": "boolean",
+    "false": "boolean",
+}
+
+
+def truncated_marker(json_type: str, size: int, length: Optional[int]) -> Dict:
+    """Return the placeholder of a value that is too large to be sent."""
+    return {"__truncated__": True, "type": json_type, "size": size, "length": length}
+
+
+def split_path(path: Optional[str]) -> List[str]:
+    """Split a dotted path into keys; a backslash escapes a dot or a
+    backslash within a key, e.g. `a\\.b.c` is `["a.b", "c"]`."""
+    keys, key, escaped = [], "", False
+    for char in path or "":
+        if escaped:
+            key += char
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == ".":
+            keys.append(key)
+            key = ""
+        else:
+            key += char
+    keys.append(key)
+    return [key for key in keys if key]
+
+
+def _pg_path(keys: List[str]) -> str:
+    """Return `keys` as a PostgreSQL text array literal."""
+    quoted = ('"' + key.replace("\\", "\\\\").replace('"', '\\"') + '"' for key in keys)
+    return "{" + ",".join(quoted) + "}"
+
+
+def _sqlite_path(pk: int, keys: List[str]) -> Optional[Tuple[str, str, Dict]]:
+    """
+    Return (document, path, parameters) of `keys` for SQLite: the JSON path
+    `path` in the SQL expression `document`, or None if the path does not
+    exist. Negative array indices count from the end. A JSON path cannot
+    quote a key containing `"`, so below such a key the document is a
+    subquery selecting that child of the attributes.
+    """
+    document, path, params = "attributes", "$", {}
+    for key in keys:
+        rows = execute_sql(
+            f"""
+            SELECT json_type({document}, :path), json_array_length({document}, :path)
+            FROM db_dbnode WHERE id = :pk
+            """,
+            pk=pk,
+            path=path,
+            **params,
+        )
+        json_type, length = rows[0] if rows else (None, None)
+        if json_type == "array" and key.lstrip("-").isdigit():
+            index = int(key)
+            if index < 0:
+                index += length
+            if index < 0:
+                return None
+            path = f"{path}[{index}]"
+        elif json_type == "object" and '"' not in key:
+            path = f'{path}."{key}"'
+        elif json_type == "object":
+            n = len(params) // 2
+            params.update({f"path{n}": path, f"key{n}": key})
+            # json_each gives booleans as integers, keep them JSON
+            document = f"""(
+                SELECT CASE child.type WHEN 'true' THEN 'true' WHEN 'false' THEN 'false'
+                    ELSE json_quote(child.value) END
+                FROM json_each({document}, :path{n}) AS child WHERE child.key = :key{n}
+            )"""
+            path = "$"
+        else:
+            return None
+    return document, path, params
+
+
+def _decode(json_type: str, value: Any) -> Any:
+    """Return the Python value of a JSON value selected as text (containers)
+    or as its SQL value (SQLite scalars)."""
+    if value is None or json_type == "null":
+        return None
+    if json_type == "boolean" and not isinstance(value, str):
+        return bool(value)
+    if isinstance(value, str) and (
+        json_type in ("object", "array") or get_dialect() == "postgresql"
+    ):
+        return json.loads(value)
+    return value
+
+
+def _load_attribute(pk: int, keys: List[str]) -> Tuple[bool, Any]:
+    """Return (found, value) of the attribute at `keys` of node `pk`, loading
+    all attributes with the QueryBuilder."""
+    from aiida import orm
+
+    qb = orm.QueryBuilder()
+    qb.append(orm.Node, filters={"id": pk}, project="attributes")
+    row = qb.first()
+    if row is None:
+        return False, None
+    value = row[0]
+    for key in keys:
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        elif (
+            isinstance(value, list)
+            and key.lstrip("-").isdigit()
+            and -len(value) <= int(key) < len(value)
+        ):
+            value = value[int(key)]
+        else:
+            return False, None
+    return True, value
+
+
+def _describe(value: Any) -> Tuple[str, int, Optional[int]]:
+    """Return the JSON type, size and number of items of a loaded value."""
+    if isinstance(value, bool):
+        json_type = "boolean"
+    elif isinstance(value, (int, float)):
+        json_type = "number"
+    elif isinstance(value, str):
+        json_type = "string"
+    elif isinstance(value, dict):
+        json_type = "object"
+    elif isinstance(value, list):
+        json_type = "array"
+    else:
+        json_type = "null"
+    size = len(json.dumps(value, separators=(",", ":")).encode())
+    length = len(value) if json_type in ("object", "array") else None
+    return json_type, size, length
+
+
+def _overview_of(value: Any, max_size: int, skip: int, limit: int) -> Dict[str, Any]:
+    """`get_attribute_overview` of a loaded value."""
+    json_type, size, length = _describe(value)
+    overview = {"type": json_type, "size": size, "length": length, "skip": 0}
+    if size <= max_size:
+        overview["value"] = value
+        return overview
+    if json_type not in ("object", "array"):
+        overview["value"] = truncated_marker(json_type, size, length)
+        return overview
+    items = sorted(value.items()) if json_type == "object" else enumerate(value)
+    children = {}
+    for key, child in list(items)[skip : skip + limit]:
+        child_type, child_size, child_length = _describe(child)
+        if child_size <= max_size:
+            children[key] = child
+        else:
+            children[key] = truncated_marker(child_type, child_size, child_length)
+    overview["skip"] = skip
+    overview["value"] = children if json_type == "object" else list(children.values())
+    return overview
+
+
+def get_dialect() -> str:
+    return get_storage_session().get_bind().dialect.name
+
+
+def get_attribute_value(pk: int, path: Optional[str] = None) -> Tuple[bool, Any]:
+    """Return (found, value) of the attribute at `path` of node `pk`, or of
+    all attributes without a path."""
+    keys = split_path(path)
+    if not supports_raw_sql():
+        return _load_attribute(pk, keys)
+    if get_dialect() == "postgresql":
+        rows = execute_sql(
+            """
+            SELECT jsonb_typeof(value), value::text
+            FROM (SELECT attributes #> CAST(:path AS text[]) AS value
+                  FROM db_dbnode WHERE id = :pk) AS attribute
+            """,
+            pk=pk,
+            path=_pg_path(keys),
+        )
+    else:
+        sqlite_path = _sqlite_path(pk, keys)
+        if sqlite_path is None:
+            return False, None
+        document, json_path, params = sqlite_path
+        rows = execute_sql(
+            f"""
+            SELECT json_type({document}, :path), json_extract({document}, :path)
+            FROM db_dbnode WHERE id = :pk
+            """,
+            pk=pk,
+            path=json_path,
+            **params,
+        )
+    if not rows or rows[0][0] is None:
+        return False, None
+    json_type = SQLITE_JSON_TYPES.get(rows[0][0], rows[0][0])
+    return True, _decode(json_type, rows[0][1])
+
+
+def _children(
+    pk: int, keys: List[str], json_type: str, max_size: int, skip: int, limit: int
+) -> List[Tuple[Any, ...]]:
+    """Return (key, type, size, value if small, length) of the children of
+    the container at `keys`, in key (objects) or index (arrays) order."""
+    if get_dialect() == "postgresql":
+        if json_type == "object":
+            each = "jsonb_each(value) AS child"
+            key, order = "child.key", "child.key"
+        else:
+            each = "jsonb_array_elements(value) WITH ORDINALITY AS child(value, idx)"
+            key, order = "child.idx - 1", "child.idx"
+        return execute_sql(
+            f"""
+            SELECT {key}, jsonb_typeof(child.value), octet_length(child.value::text),
+                CASE WHEN octet_length(child.value::text) <= :max_size
+                    THEN child.value::text END,
+                CASE jsonb_typeof(child.value)
+                    WHEN 'object' THEN (SELECT count(*) FROM jsonb_object_keys(child.value))
+                    WHEN 'array' THEN jsonb_array_length(child.value) END
+            FROM (SELECT attributes #> CAST(:path AS text[]) AS value
+                  FROM db_dbnode WHERE id = :pk) AS attribute, {each}
+            ORDER BY {order} LIMIT :limit OFFSET :skip
+            """,
+            pk=pk,
+            path=_pg_path(keys),
+            max_size=max_size,
+            limit=limit,
+            skip=skip,
+        )
+    document, json_path, params = _sqlite_path(pk, keys)
+    rows = execute_sql(
+        f"""
+        SELECT child.key, child.type, length(child.value),
+            CASE WHEN length(child.value) <= :max_size THEN child.value END,
+            CASE child.type
+                WHEN 'object' THEN (SELECT count(*) FROM json_each(child.value))
+                WHEN 'array' THEN json_array_length(child.value) END
+        FROM db_dbnode, json_each({document}, :path) AS child
+        WHERE db_dbnode.id = :pk
+        ORDER BY child.id LIMIT :limit OFFSET :skip
+        """,
+        pk=pk,
+        path=json_path,
+        max_size=max_size,
+        limit=limit,
+        skip=skip,
+        **params,
+    )
+    return [(row[0], SQLITE_JSON_TYPES.get(row[1], row[1]), *row[2:]) for row in rows]
+
+
+def get_attribute_overview(
+    pk: int,
+    path: Optional[str] = None,
+    max_size: int = ATTRIBUTE_VALUE_MAX_BYTES,
+    skip: int = 0,
+    limit: int = ATTRIBUTE_CHILD_LIMIT,
+) -> Optional[Dict[str, Any]]:
+    """
+    Return the type, size (bytes of JSON) and number of items of the
+    attribute at `path` of node `pk` (all attributes without a path), or
+    None if there is no such attribute.
+
+    Its `value` is the attribute itself if it is at most `max_size` bytes.
+    Otherwise it is the dictionary or list of the children `skip` to
+    `skip + limit`, where children larger than `max_size` are replaced by a
+    truncation marker.
+    """
+    keys = split_path(path)
+    if not supports_raw_sql():
+        found, value = _load_attribute(pk, keys)
+        return _overview_of(value, max_size, skip, limit) if found else None
+    if get_dialect() == "postgresql":
+        rows = execute_sql(
+            """
+            SELECT jsonb_typeof(value), octet_length(value::text),
+                CASE WHEN octet_length(value::text) <= :max_size THEN value::text END,
+                CASE jsonb_typeof(value)
+                    WHEN 'object' THEN (SELECT count(*) FROM jsonb_object_keys(value))
+                    WHEN 'array' THEN jsonb_array_length(value) END
+            FROM (SELECT attributes #> CAST(:path AS text[]) AS value
+                  FROM db_dbnode WHERE id = :pk) AS attribute
+            """,
+            pk=pk,
+            path=_pg_path(keys),
+            max_size=max_size,
+        )
+    else:
+        sqlite_path = _sqlite_path(pk, keys)
+        if sqlite_path is None:
+            return None
+        document, json_path, params = sqlite_path
+        rows = execute_sql(
+            f"""
+            SELECT json_type({document}, :path),
+                length(json_extract({document}, :path)),
+                CASE WHEN length(json_extract({document}, :path)) <= :max_size
+                    THEN json_extract({document}, :path) END,
+                CASE json_type({document}, :path)
+                    WHEN 'object' THEN (SELECT count(*) FROM json_each({document}, :path))
+                    WHEN 'array' THEN json_array_length({document}, :path) END
+            FROM db_dbnode WHERE id = :pk
+            """,
+            pk=pk,
+            path=json_path,
+            max_size=max_size,
+            **params,
+        )
+    if not rows or rows[0][0] is None:
+        return None
+    json_type, size, value, length = rows[0]
+    json_type = SQLITE_JSON_TYPES.get(json_type, json_type)
+    overview = {"type": json_type, "size": size, "length": length, "skip": 0}
+    if size is None or size <= max_size:
+        overview["value"] = _decode(json_type, value)
+        return overview
+    if json_type not in ("object", "array"):
+        # a huge string: only its marker
+        overview["value"] = truncated_marker(json_type, size, length)
+        return overview
+
+    children = {}
+    for key, child_type, child_size, child_value, child_length in _children(
+        pk, keys, json_type, max_size, skip, limit
+    ):
+        if child_value is None and child_type != "null":
+            children[key] = truncated_marker(child_type, child_size, child_length)
+        else:
+            children[key] = _decode(child_type, child_value)
+    overview["skip"] = skip
+    overview["value"] = children if json_type == "object" else list(children.values())
+    return overview
@@ -0,0 +1,452 @@
+"""Background jobs for long-running destructive operations.
+
+Deleting a node also deletes everything that depends on it, which for a
+large workchain or a group purge can take minutes. Such operations are
+queued as jobs in a small SQLite table next to the AiiDA configuration and
+run in a local process pool, so they neither block the API nor die with the
+request that started them. The worker records its progress, the nodes it
+found and its result in the table, and checks it for cancellation between
+steps; the server only reads it. Every job records the host and pid of the
+server that queued it, so that a restarted server fails only the jobs whose
+server is gone, not those of another live one sharing the table. Clients
+follow a job through the routes of `aiida_gui.app.jobs`.
+"""
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# path of the job table, by default `aiida-gui/jobs.sqlite` in the AiiDA
+# configuration directory
+JOB_DB = os.getenv("AIIDA_GUI_JOB_DB") or None
+# worker processes; 0 runs the jobs one by one in a thread of the server
+JOB_WORKERS = int(os.getenv("AIIDA_GUI_JOB_WORKERS", "1"))
+# finished jobs kept in the table; the oldest are dropped first
+JOB_HISTORY_SIZE = int(os.getenv("AIIDA_GUI_JOB_HISTORY_SIZE", "200"))
+# nodes listed per event of a deletion job
+DELETE_EVENT_SIZE = 1000
+
+FINISHED_JOB_STATES = ("done", "failed", "cancelled")
+
+SCHEMA = """
+PRAGMA journal_mode=WAL;
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    stage TEXT,
+    progress INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    owner_host TEXT,
+    owner_pid INTEGER,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+# columns added after the first release of the table
+MIGRATIONS = {
+    "owner_host": "ALTER TABLE jobs ADD COLUMN owner_host TEXT",
+    "owner_pid": "ALTER TABLE jobs ADD COLUMN owner_pid INTEGER",
+}
+
+
+def is_owner_gone(host: Optional[str], pid: Optional[int]) -> bool:
+    """Whether the server that queued a job is known to have stopped: it ran
+    on this host under a pid that no longer exists, or is not recorded. The
+    servers of other hosts cannot be checked and are assumed alive."""
+    import psutil
+
+    if host is None or pid is None:
+        return True
+    return host == socket.gethostname() and not psutil.pid_exists(pid)
+
+
+class JobCancelled(Exception):
+    """Raised in a job when its cancellation was requested."""
+
+
+class JobTable:
+    """
+    The persistent jobs, shared by the server and the worker processes
+    through one SQLite file. Besides its state, a job has a log of events,
+    e.g. the batches of nodes a traversal found, numbered by `seq` so
+    clients can ask for the events after the last one they saw.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._initialized:
+                conn.executescript(SCHEMA)
+                columns = {
+                    row["name"] for row in conn.execute("PRAGMA table_info(jobs)")
+                }
+                for column, statement in MIGRATIONS.items():
+                    if column not in columns:
+                        conn.execute(statement)
+                self._initialized = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        job["done"] = job["status"] in FINISHED_JOB_STATES
+        return job
+
+    def create(self, kind: str, profile: str, params: Dict[str, Any]) -> str:
+        """Queue a job, owned by the calling process."""
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, profile, kind, params, owner_host, owner_pid, created)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    profile,
+                    kind,
+                    json.dumps(params),
+                    socket.gethostname(),
+                    os.getpid(),
+                    time.time(),
+                ),
+            )
+            old = conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?, ?) ORDER BY created DESC LIMIT -1 OFFSET ?",
+                (*FINISHED_JOB_STATES, JOB_HISTORY_SIZE),
+            ).fetchall()
+            for (old_id,) in old:
+                conn.execute("DELETE FROM job_events WHERE job_id = ?", (old_id,))
+                conn.execute("DELETE FROM jobs WHERE id = ?", (old_id,))
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT jobs.*, (SELECT COALESCE(MAX(seq), 0) FROM job_events"
+                " WHERE job_id = jobs.id) AS events FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, profile: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT *, NULL AS events FROM jobs WHERE ? IS NULL OR profile = ?"
+                " ORDER BY created DESC LIMIT ?",
+                (profile, profile, limit),
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id)
+            )
+
+    def finish(self, job_id: str, status: str, **fields: Any) -> None:
+        """Set the final `status` of a job, unless it already has one."""
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        columns = ", ".join(f"{key} = ?" for key in ("status", "finished", *fields))
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ? AND status NOT IN (?, ?, ?)",
+                (status, time.time(), *fields.values(), job_id, *FINISHED_JOB_STATES),
+            )
+
+    def add_event(self, job_id: str, data: Any) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO job_events (job_id, seq, data) SELECT ?,"
+                " COALESCE(MAX(seq), 0) + 1, ? FROM job_events WHERE job_id = ?",
+                (job_id, json.dumps(data), job_id),
+            )
+
+    def events_since(self, job_id: str, seq: int = 0) -> List[Tuple[int, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT seq, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, seq),
+            ).fetchall()
+        return [(row["seq"], json.loads(row["data"])) for row in rows]
+
+    def request_cancel(self, job_id: str) -> None:
+        """Ask the worker to give up on a job at its next check."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status NOT IN (?, ?, ?)",
+                (job_id, *FINISHED_JOB_STATES),
+            )
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def fail_unfinished(self, profile: str, message: str) -> None:
+        """Fail the queued and running jobs of `profile` whose server is gone,
+        see `is_owner_gone`."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, owner_host, owner_pid FROM jobs"
+                " WHERE profile = ? AND status NOT IN (?, ?, ?)",
+                (profile, *FINISHED_JOB_STATES),
+            ).fetchall()
+            for row in rows:
+                if is_owner_gone(row["owner_host"], row["owner_pid"]):
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, finished = ?"
+                        " WHERE id = ?",
+                        (message, time.time(), row["id"]),
+                    )
+
+
+class JobContext:
+    """What a running job uses to report to, and hear from, the job table."""
+
+    def __init__(self, table: JobTable, job_id: str):
+        self.table = table
+        self.job_id = job_id
+
+    @property
+    def cancelled(self) -> bool:
+        return self.table.is_cancel_requested(self.job_id)
+
+    def check_cancelled(self) -> None:
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, progress: int, total: Optional[int] = None, stage=None):
+        fields = {"progress": progress, "total": total}
+        if stage is not None:
+            fields["stage"] = stage
+        self.table.update(self.job_id, **fields)
+
+    def event(self, data: Any) -> None:
+        self.table.add_event(self.job_id, data)
+
+
+def delete_nodes_job(
+    ctx: JobContext, pks: List[int], dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Find the nodes that deleting `pks` deletes, report them in batches, then
+    delete them unless `dry_run`. The nodes are found once, by the traversal
+    of `delete_nodes` itself, which hands them to its `dry_run` callable
+    right before deleting. The deletion is one transaction and can no longer
+    be cancelled once it started.
+    """
+    from aiida.tools import delete_nodes
+
+    def confirm(found) -> bool:
+        """Report the nodes to delete; True stops before deleting them."""
+        found = sorted(found)
+        for start in range(0, len(found), DELETE_EVENT_SIZE):
+            ctx.check_cancelled()
+            batch = found[start : start + DELETE_EVENT_SIZE]
+            ctx.event({"pks": batch})
+            ctx.progress(start + len(batch), stage="traversing")
+        if dry_run:
+            return True
+        ctx.check_cancelled()
+        ctx.progress(0, len(found), stage="deleting")
+        return False
+
+    ctx.progress(0, stage="traversing")
+    deleted, ok = delete_nodes(pks, dry_run=confirm)
+    if dry_run:
+        return {"dry_run": True, "count": len(deleted)}
+    ctx.progress(len(deleted), len(deleted))
+    return {"dry_run": False, "deleted": ok, "count": len(deleted)}
+
+
+def delete_group_job(
+    ctx: JobContext, group_id: int, delete_nodes: bool = False, dry_run: bool = False
+) -> Dict[str, Any]:
+    """Delete a group, and with `delete_nodes` first the nodes it contains."""
+    from aiida import orm
+
+    result: Dict[str, Any] = {"dry_run": dry_run, "deleted": True, "count": 0}
+    if delete_nodes:
+        qb = orm.QueryBuilder()
+        qb.append(orm.Group, filters={"id": group_id}, tag="group")
+        qb.append(orm.Node, with_group="group", project="id")
+        result = delete_nodes_job(ctx, qb.all(flat=True), dry_run=dry_run)
+    if dry_run or not result["deleted"]:
+        return {**result, "group_deleted": False}
+    orm.Group.collection.delete(group_id)
+    return {**result, "group_deleted": True}
+
+
+JOB_KINDS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "delete_nodes": delete_nodes_job,
+    "delete_group": delete_group_job,
+}
+
+
+def run_job(
+    path: str,
+    job_id: str,
+    profile: Optional[str] = None,
+    aiida_path: Optional[str] = None,
+) -> str:
+    """
+    Run the job `job_id` of the table at `path` and return its final status.
+    In a worker process, `profile` of the configuration at `aiida_path` is
+    loaded first.
+    """
+    table = JobTable(path)
+    if profile is not None:
+        if aiida_path:
+            os.environ["AIIDA_PATH"] = aiida_path
+        from aiida import load_profile
+
+        load_profile(profile, allow_switch=True)
+    job = table.get(job_id)
+    if job is None:
+        return "failed"
+    if job["cancel_requested"]:
+        table.finish(job_id, "cancelled")
+        return "cancelled"
+    table.update(job_id, status="running", started=time.time())
+    ctx = JobContext(table, job_id)
+    try:
+        result = JOB_KINDS[job["kind"]](ctx, **job["params"])
+    except JobCancelled:
+        table.finish(job_id, "cancelled")
+        return "cancelled"
+    except Exception as e:
+        table.finish(job_id, "failed", error=f"{e}\n\n{traceback.format_exc()}")
+        return "failed"
+    finally:
+        from aiida.manage import get_manager
+
+        try:
+            get_manager().get_profile_storage().get_session().close()
+        except Exception:
+            pass
+    table.finish(job_id, "done", result=result)
+    return "done"
+
+
+_table: Optional[JobTable] = None
+_pool = None
+_lock = threading.Lock()
+
+
+def get_job_table() -> JobTable:
+    """Return the job table, on first use failing the jobs that a stopped
+    server left unfinished."""
+    global _table
+    from aiida.manage import get_manager
+    from aiida.manage.configuration import get_config
+
+    with _lock:
+        if _table is None:
+            path = JOB_DB or os.path.join(
+                get_config().dirpath, "aiida-gui", "jobs.sqlite"
+            )
+            _table = JobTable(path)
+            _table.fail_unfinished(
+                get_manager().get_profile().name, "Interrupted by a server restart"
+            )
+        return _table
+
+
+def get_pool():
+    """Return the pool running the jobs, created on first use. Workers are
+    spawned, not forked, so they share no connections with the server."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            if JOB_WORKERS > 0:
+                _pool = ProcessPoolExecutor(
+                    max_workers=JOB_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                _pool = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="aiida-gui-jobs"
+                )
+        return _pool
+
+
+def _on_job_done(table: JobTable, job_id: str, future: Future) -> None:
+    global _pool
+    from concurrent.futures.process import BrokenProcessPool
+
+    from aiida_gui.app.cache import ancestor_cache, count_cache
+    from aiida_gui.app.rollup import rollup_cache
+
+    # the worker may have deleted nodes the cached counts and ancestors include
+    count_cache.clear()
+    ancestor_cache.clear()
+    rollup_cache.clear()
+    error = None if future.cancelled() else future.exception()
+    if error is not None:
+        table.finish(job_id, "failed", error=str(error) or type(error).__name__)
+        if isinstance(error, BrokenProcessPool):
+            with _lock:
+                _pool = None
+
+
+def submit_job(kind: str, **params: Any) -> Dict[str, Any]:
+    """Queue a job of `kind` (see `JOB_KINDS`) and return it."""
+    from aiida.manage import get_manager
+    from aiida.manage.configuration import get_config
+
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind {kind}")
+    table = get_job_table()
+    profile = get_manager().get_profile().name
+    job_id = table.create(kind, profile, params)
+    if JOB_WORKERS > 0:
+        future = get_pool().submit(
+            run_job, table.path, job_id, profile, str(get_config().dirpath)
+        )
+    else:
+        future = get_pool().submit(run_job, table.path, job_id)
+    future.add_done_callback(functools.partial(_on_job_done, table, job_id))
+    return table.get(job_id)
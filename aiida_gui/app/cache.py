@@ -0,0 +1,389 @@
+"""In-process caches shared by the API routes."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+
+# A cached count is recomputed after this many seconds even if the table looks
+# unchanged, e.g. because nodes were deleted or moved between groups, which
+# moves neither max(id) nor max(mtime).
+COUNT_CACHE_TTL = float(os.getenv("AIIDA_GUI_COUNT_CACHE_TTL", "30"))
+COUNT_CACHE_SIZE = int(os.getenv("AIIDA_GUI_COUNT_CACHE_SIZE", "256"))
+# Seconds for which the result of a coalesced query is handed to later
+# identical requests. Polling clients ask every few seconds, so a short
+# window already collapses the requests of all open tabs into one query.
+SINGLE_FLIGHT_WINDOW = float(os.getenv("AIIDA_GUI_SINGLE_FLIGHT_WINDOW", "1"))
+
+
+class CountCache:
+    """
+    Cache for the totals of the table endpoints.
+
+    Entries are keyed by (node class, normalized filters) and remember the
+    fingerprint of the table, e.g. (max id, max mtime), at the time of
+    counting. An entry is reused as long as the fingerprint is unchanged and
+    it is younger than `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = COUNT_CACHE_TTL, maxsize: int = COUNT_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_count(
+        self, key: Hashable, fingerprint: Hashable, count: Callable[[], Any]
+    ) -> Any:
+        """Return the cached count for `key`, calling `count` if it is stale."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and entry[0] == fingerprint
+                and now - entry[2] < self.ttl
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = count()
+        with self._lock:
+            self._entries[key] = (fingerprint, value, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries, e.g. after nodes were deleted through the API."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+count_cache = CountCache()
+
+
+class _Call:
+    """One in-flight computation of `SingleFlight`."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent computations.
+
+    Callers passing the same key while a computation is running wait for it
+    and share its result instead of starting their own. The result is also
+    handed to callers arriving within `window` seconds after it finished.
+    Shared results must be treated as read-only. Waiting blocks the calling
+    thread, so coroutines must call `do` from a worker thread.
+    """
+
+    def __init__(self, window: float = SINGLE_FLIGHT_WINDOW, maxsize: int = 512):
+        self.window = window
+        self.maxsize = maxsize
+        self.hits = 0
+        self.shared = 0
+        self.misses = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Return `func(*args, **kwargs)`, sharing the call with identical keys."""
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None and time.monotonic() - result[0] < self.window:
+                self.hits += 1
+                return result[1]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                self.misses += 1
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.window > 0:
+                    self._results[key] = (time.monotonic(), call.value)
+                    self._results.move_to_end(key)
+                    while len(self._results) > self.maxsize:
+                        self._results.popitem(last=False)
+            call.done.set()
+        return call.value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "shared": self.shared,
+                "misses": self.misses,
+                "in_flight": len(self._calls),
+                "window": self.window,
+            }
+
+
+single_flight = SingleFlight()
+
+
+# Memory budget of the sealed node cache, measured as serialized JSON size.
+SEALED_CACHE_MAX_BYTES = int(
+    os.getenv("AIIDA_GUI_SEALED_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+# Directory to persist the sealed node cache across restarts; off if unset.
+SEALED_CACHE_DIR = os.getenv("AIIDA_GUI_SEALED_CACHE_DIR") or None
+# Disk budget of that directory; the least recently used files are deleted
+# down to three quarters of it once it is exceeded.
+SEALED_CACHE_MAX_DISK_BYTES = int(
+    os.getenv("AIIDA_GUI_SEALED_CACHE_MAX_DISK_BYTES", str(1024 * 1024 * 1024))
+)
+
+
+class SealedNodeCache:
+    """
+    LRU cache for the results derived from sealed (terminated) nodes, such as
+    their summary, graph, parent chain and logs, which no longer change.
+
+    Entries are keyed by node UUID plus the kind of result and remember a
+    version, e.g. the node mtime, so an edit of the label or extras of a
+    sealed node still invalidates them. Results of nodes that are not sealed
+    bypass the cache. Values are stored JSON-encoded and evicted least
+    recently used first once their total size exceeds `max_bytes`. With a
+    `directory`, entries are also written to disk and read back after a
+    restart or an eviction; the files are bounded by `max_disk_bytes` in the
+    same way.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = SEALED_CACHE_MAX_BYTES,
+        directory: Optional[str] = SEALED_CACHE_DIR,
+        max_disk_bytes: int = SEALED_CACHE_MAX_DISK_BYTES,
+    ):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        # size of the directory, found by listing it on the first write
+        self.disk_bytes: Optional[int] = None
+        self.disk_evictions = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(
+        self,
+        key: Tuple[Any, ...],
+        version: Any,
+        sealed: bool,
+        compute: Callable[[], Any],
+    ) -> Any:
+        """
+        Return the cached result for `key` (its first items being the kind
+        of result and the node UUID), calling `compute` if the node is not
+        sealed or the entry is missing or of another `version`.
+        """
+        if not sealed:
+            with self._lock:
+                self.bypassed += 1
+            return compute()
+        value = self.get(key, version)
+        if value is not None:
+            return value
+        value = jsonable_encoder(compute())
+        self._write(key, str(version), value)
+        self._store(key, str(version), value)
+        return value
+
+    def get(self, key: Tuple[Any, ...], version: Any = None) -> Any:
+        """Return the cached result of `version` for `key`, or None."""
+        version = str(version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        value = self._read(key, version)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._store(key, version, value)
+        return value
+
+    def put(self, key: Tuple[Any, ...], value: Any, version: Any = None) -> None:
+        """Cache the result of a sealed node for `key`."""
+        value = jsonable_encoder(value)
+        self._write(key, str(version), value)
+        self._store(key, str(version), value)
+
+    def _store(self, key: Tuple[Any, ...], version: str, value: Any) -> None:
+        size = len(json.dumps(value))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (version, value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def _path(self, key: Tuple[Any, ...]) -> str:
+        digest = hashlib.sha1(json.dumps(key, default=str).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _read(self, key: Tuple[Any, ...], version: str) -> Any:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key)) as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != version:
+            return None
+        try:
+            # the modification time orders the files for eviction
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        return entry["value"]
+
+    def _write(self, key: Tuple[Any, ...], version: str, value: Any) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as handle:
+                json.dump({"version": version, "value": value}, handle)
+            size = os.path.getsize(tmp)
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Could not persist the cache entry {key}: {e}")
+            return
+        with self._lock:
+            if self.disk_bytes is None:
+                try:
+                    self.disk_bytes = sum(size for _, size, _ in self._files())
+                except OSError:
+                    self.disk_bytes = size
+            else:
+                self.disk_bytes += size - replaced
+            exceeded = self.disk_bytes > self.max_disk_bytes
+        if exceeded:
+            self._prune()
+
+    def _files(self) -> List[Tuple[float, int, str]]:
+        """Return (mtime, size, path) of the persisted entries."""
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _prune(self) -> None:
+        """Delete the least recently used files down to 3/4 of the budget."""
+        try:
+            files = sorted(self._files())
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        for _, size, path in files:
+            if total <= self.max_disk_bytes * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self.disk_bytes = total
+            self.disk_evictions += evicted
+
+    def clear(self) -> None:
+        """Drop the entries held in memory; persisted entries are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "directory": self.directory,
+                "disk_bytes": self.disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "disk_evictions": self.disk_evictions,
+            }
+
+
+sealed_cache = SealedNodeCache()
+# Ancestor chains are looked up by pk, which is only unique within a
+# profile, so they are kept in memory only.
+ancestor_cache = SealedNodeCache(max_bytes=SEALED_CACHE_MAX_BYTES // 16, directory=None)
@@ -9,6 +9,8 @@ from aiida.engine.daemon.client import DaemonException, get_daemon_client
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
+from aiida_gui.app.executor import offload
+
 
 router = APIRouter()
 
@@ -23,8 +25,9 @@ class DaemonStatusModel(BaseModel):
 
 
 @router.get("/api/daemon/status", response_model=DaemonStatusModel)
+@offload("daemon")
 @with_dbenv()
-async def get_daemon_status() -> DaemonStatusModel:
+def get_daemon_status() -> DaemonStatusModel:
     """Return the daemon status."""
     client = get_daemon_client()
 
@@ -37,8 +40,9 @@ async def get_daemon_status() -> DaemonStatusModel:
 
 
 @router.get("/api/daemon/worker")
+@offload("daemon")
 @with_dbenv()
-async def get_daemon_worker():
+def get_daemon_worker():
     """Return the daemon status."""
     client = get_daemon_client()
 
@@ -51,8 +55,9 @@ async def get_daemon_worker():
 
 
 @router.post("/api/daemon/start", response_model=DaemonStatusModel)
+@offload("daemon")
 @with_dbenv()
-async def get_daemon_start() -> DaemonStatusModel:
+def get_daemon_start() -> DaemonStatusModel:
     """Start the daemon."""
     client = get_daemon_client()
 
@@ -70,8 +75,9 @@ async def get_daemon_start() -> DaemonStatusModel:
 
 
 @router.post("/api/daemon/stop", response_model=DaemonStatusModel)
+@offload("daemon")
 @with_dbenv()
-async def get_daemon_stop() -> DaemonStatusModel:
+def get_daemon_stop() -> DaemonStatusModel:
     """Stop the daemon."""
     client = get_daemon_client()
 
@@ -87,8 +93,9 @@ async def get_daemon_stop() -> DaemonStatusModel:
 
 
 @router.post("/api/daemon/increase", response_model=DaemonStatusModel)
+@offload("daemon")
 @with_dbenv()
-async def increase_daemon_worker() -> DaemonStatusModel:
+def increase_daemon_worker() -> DaemonStatusModel:
     """increase the daemon worker."""
     client = get_daemon_client()
 
@@ -104,8 +111,9 @@ async def increase_daemon_worker() -> DaemonStatusModel:
 
 
 @router.post("/api/daemon/decrease", response_model=DaemonStatusModel)
+@offload("daemon")
 @with_dbenv()
-async def decrease_daemon_worker() -> DaemonStatusModel:
+def decrease_daemon_worker() -> DaemonStatusModel:
     """decrease the daemon worker."""
     client = get_daemon_client()
 
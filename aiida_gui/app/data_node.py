@@ -1,8 +1,27 @@
 from __future__ import annotations
-from typing import Dict, Any
-from fastapi import HTTPException
+from typing import Dict, Any, Optional
+import numpy
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from aiida_gui.app.node_table import make_node_router
-from weas_widget.utils import ASEAdapter
+from aiida_gui.app.executor import offload
+from aiida_gui.app.cache import sealed_cache
+from aiida_gui.app.attributes import (
+    ATTRIBUTE_CHILD_LIMIT,
+    get_attribute_overview,
+    get_attribute_value,
+)
+from aiida_gui.app.downsample import DOWNSAMPLE_MODES, downsample
+from aiida_gui.app.arrays import (
+    array_to_arrow,
+    get_array_header,
+    get_array_rows,
+    get_array_shape,
+    iter_array_file,
+    iter_npy,
+    parse_index,
+    slice_array,
+)
 from aiida import orm
 
 project = ["id", "uuid", "ctime", "node_type", "label", "description"]
@@ -11,19 +30,258 @@ router = make_node_router(node_cls=orm.Data, prefix="datanode", project=project)
 
 
 @router.get("/api/datanode/{id}")
-async def read_data_node_item(id: int) -> Dict[str, Any]:
+@offload("datanode")
+def read_data_node_item(
+    id: int,
+    path: Optional[str] = None,
+    full: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(ATTRIBUTE_CHILD_LIMIT, ge=1, le=10000),
+) -> Dict[str, Any]:
+    """
+    Return the attributes of a data node without loading it. Attributes
+    larger than `ATTRIBUTE_VALUE_MAX_BYTES` are replaced by a marker with
+    their type, size and number of items, unless `full` is set.
+
+    Only the attributes `skip` to `skip + limit` are listed; `__count__` is
+    the total when there are more. With a dotted `path`, e.g. `a.b.-1`
+    (a backslash escapes a dot in a key), return the type, size and length
+    of that attribute and as `value` the attribute itself or, if it is too
+    large, its children `skip` to `skip + limit`.
+    """
+    qb = orm.QueryBuilder()
+    qb.append(orm.Data, filters={"id": id}, project=["node_type"])
+    row = qb.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Data node {id} not found")
+
+    if path is not None:
+        if full:
+            found, value = get_attribute_value(id, path)
+            overview = {"value": value} if found else None
+        else:
+            overview = get_attribute_overview(id, path, skip=skip, limit=limit)
+        if overview is None:
+            raise HTTPException(
+                status_code=404, detail=f"Attribute {path} not found in node {id}"
+            )
+        return {"path": path, **overview}
+
+    if full:
+        content = get_attribute_value(id)[1] or {}
+    else:
+        overview = get_attribute_overview(id, skip=skip, limit=limit)
+        content = overview["value"] if overview else {}
+        if overview and overview["length"] > skip + len(content):
+            # more keys than listed, load them with `skip`
+            content["__count__"] = overview["length"]
+    content["node_type"] = row[0]
+    # the frames of a TrajectoryData are loaded with /frames
+    return content
+
+
+# frames per request of /frames, the viewer fetches longer trajectories in chunks
+MAX_FRAMES = 1000
+
+
+def load_trajectory(id: int) -> orm.TrajectoryData:
+    from aiida.common.exceptions import NotExistent
+
+    try:
+        node = orm.load_node(id)
+    except NotExistent:
+        raise HTTPException(status_code=404, detail=f"Data node {id} not found")
+    if not isinstance(node, orm.TrajectoryData):
+        raise HTTPException(status_code=400, detail=f"Node {id} is no TrajectoryData")
+    return node
+
+
+@router.get("/api/datanode/{id}/frames/info")
+@offload("datanode")
+def read_trajectory_info(id: int) -> Dict[str, Any]:
+    """Return the number of frames and atoms and the symbols of a trajectory."""
+    node = load_trajectory(id)
+    numsteps, numatoms, _ = get_array_shape(node, "positions")
+    has_cells = get_array_shape(node, "cells") is not None
+    return {
+        "numsteps": numsteps,
+        "numatoms": numatoms,
+        "symbols": node.symbols,
+        "has_cells": has_cells,
+        "pbc": [has_cells] * 3,
+        "max_frames": MAX_FRAMES,
+    }
+
+
+@router.get("/api/datanode/{id}/frames")
+@offload("datanode")
+def read_trajectory_frames(
+    id: int,
+    start: int = 0,
+    stop: Optional[int] = None,
+    stride: int = Query(1, ge=1),
+    format: str = "json",
+):
+    """
+    Return the cells and positions of the frames `start:stop:stride` of a
+    trajectory (at most `MAX_FRAMES`), read straight from the stored arrays.
+
+    With `format=binary` the body holds, per frame, the cell (9 values, if
+    the trajectory has cells) followed by the positions (3 per atom) as
+    little-endian float32; the slice is described by the `X-Frame-*`
+    headers.
+    """
+    if format not in ("json", "binary"):
+        raise HTTPException(status_code=400, detail=f"Unknown format {format}")
+    node = load_trajectory(id)
+    numsteps = get_array_shape(node, "positions")[0]
+    start, stop, stride = slice(start, stop, stride).indices(numsteps)
+    stop = max(start, min(stop, start + MAX_FRAMES * stride))
+    positions = get_array_rows(node, "positions", start, stop, stride)
+    cells = None
+    if get_array_shape(node, "cells") is not None:
+        cells = get_array_rows(node, "cells", start, stop, stride)
+
+    if format == "json":
+        return {
+            "start": start,
+            "stop": stop,
+            "stride": stride,
+            "cells": cells.tolist() if cells is not None else None,
+            "positions": positions.tolist(),
+        }
+
+    count = len(positions)
+    frames = positions.reshape(count, -1)
+    if cells is not None:
+        frames = numpy.concatenate([cells.reshape(count, 9), frames], axis=1)
+    return Response(
+        content=frames.astype("<f4").tobytes(),
+        media_type="application/octet-stream",
+        headers={
+            "X-Frame-Start": str(start),
+            "X-Frame-Stop": str(stop),
+            "X-Frame-Stride": str(stride),
+            "X-Frame-Count": str(count),
+            "X-Atom-Count": str(positions.shape[1]),
+            "X-Has-Cell": "1" if cells is not None else "0",
+        },
+    )
+
+
+def load_array_data(id: int) -> orm.ArrayData:
+    from aiida.common.exceptions import NotExistent
 
     try:
         node = orm.load_node(id)
-        content = node.backend_entity.attributes
-        content["node_type"] = node.node_type
-        # TrajectoryData
-        if isinstance(node, orm.TrajectoryData):
-            weas_atoms = []
-            for i in range(node.numsteps):
-                atoms = node.get_step_structure(i).get_ase()
-                weas_atoms.append(ASEAdapter.to_weas(atoms))
-            content["extras"] = weas_atoms
-        return content
-    except KeyError:
+    except NotExistent:
         raise HTTPException(status_code=404, detail=f"Data node {id} not found")
+    if not isinstance(node, orm.ArrayData):
+        raise HTTPException(status_code=400, detail=f"Node {id} is no ArrayData")
+    return node
+
+
+@router.get("/api/datanode/{id}/arrays")
+@offload("datanode")
+def read_array_info(id: int) -> Dict[str, Any]:
+    """Return the shape, dtype and size of every array of an `ArrayData`
+    node, read from the npy headers without loading the arrays."""
+    node = load_array_data(id)
+    return {name: get_array_header(node, name) for name in node.get_arraynames()}
+
+
+@router.get("/api/datanode/{id}/array/{name}")
+@offload("datanode")
+def read_array(
+    id: int,
+    name: str,
+    index: Optional[str] = None,
+    format: str = "npy",
+):
+    """
+    Return array `name` of an `ArrayData` node, or the numpy-style slice
+    `index` of it (e.g. `0:100,::2,1`), as an npy file or, with
+    `format=arrow`, as an Arrow IPC tensor. Only the rows selected along
+    the first axis are read; an unsliced npy array is streamed as stored.
+    """
+    if format not in ("npy", "arrow"):
+        raise HTTPException(status_code=400, detail=f"Unknown format {format}")
+    try:
+        index = parse_index(index)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid index: {e}")
+    node = load_array_data(id)
+    if name not in node.get_arraynames():
+        raise HTTPException(
+            status_code=404, detail=f"Array {name} not found in node {id}"
+        )
+    headers = {"Content-Disposition": f'attachment; filename="{name}.npy"'}
+    if not index and format == "npy":
+        return StreamingResponse(
+            iter_array_file(node, name),
+            media_type="application/octet-stream",
+            headers=headers,
+        )
+    try:
+        array = slice_array(node, name, index)
+    except IndexError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid index: {e}")
+    if format == "npy":
+        return StreamingResponse(
+            iter_npy(array), media_type="application/octet-stream", headers=headers
+        )
+    try:
+        content = array_to_arrow(array)
+    except ImportError:
+        raise HTTPException(
+            status_code=400, detail="The Arrow format requires pyarrow to be installed"
+        )
+    return Response(content=content, media_type="application/vnd.apache.arrow.stream")
+
+
+@router.get("/api/datanode/{id}/downsample")
+@offload("datanode")
+def read_array_downsampled(
+    id: int,
+    name: str,
+    x: Optional[str] = None,
+    width: int = Query(1000, ge=3, le=20000),
+    mode: str = "lttb",
+) -> Dict[str, Any]:
+    """
+    Return the 1-D array `name` of an `ArrayData` node, or each column of a
+    2-D one, downsampled to about `width` points for plotting: with
+    largest-triangle-three-buckets (`mode=lttb`) or as the minimum and
+    maximum per bucket (`mode=minmax`). The series are plotted against the
+    array `x`, by default the x array of an `XyData` node or the row index.
+    """
+    if mode not in DOWNSAMPLE_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown mode {mode}")
+    node = load_array_data(id)
+    if x is None and isinstance(node, orm.XyData):
+        x = "x_array"
+    arraynames = node.get_arraynames()
+    for array in (name, x):
+        if array is not None and array not in arraynames:
+            raise HTTPException(
+                status_code=404, detail=f"Array {array} not found in node {id}"
+            )
+
+    def compute():
+        try:
+            return downsample(
+                get_array_rows(node, name),
+                get_array_rows(node, x) if x is not None else None,
+                width=width,
+                mode=mode,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # the arrays of a stored node no longer change
+    return sealed_cache.get_or_compute(
+        ("downsample", node.uuid, name, x, width, mode),
+        version=node.mtime,
+        sealed=node.is_stored,
+        compute=compute,
+    )
@@ -0,0 +1,107 @@
+"""Downsample long series of `ArrayData` nodes for plotting.
+
+A browser plot cannot use more points than it has pixels, so series are
+reduced on the server to about the target width: line data with
+largest-triangle-three-buckets (LTTB), which keeps the visually important
+points, and envelopes with the minimum and maximum of each bucket.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy
+
+DOWNSAMPLE_MODES = ("lttb", "minmax")
+
+
+def lttb_indices(x: numpy.ndarray, y: numpy.ndarray, threshold: int) -> numpy.ndarray:
+    """
+    Return the indices of the `threshold` points of the series (x, y) that
+    largest-triangle-three-buckets keeps. The first and last points are
+    always kept; every bucket in between contributes the point spanning the
+    largest triangle with the point kept before it and the mean of the next
+    bucket.
+    """
+    length = len(y)
+    if threshold >= length or threshold < 3:
+        return numpy.arange(length)
+    x = numpy.asarray(x, dtype=float)
+    y = numpy.asarray(y, dtype=float)
+    # threshold - 2 buckets between the first and the last point
+    edges = numpy.linspace(1, length - 1, threshold - 1).astype(int)
+    counts = numpy.diff(edges)
+    mean_x = numpy.add.reduceat(x[1:-1], edges[:-1] - 1) / counts
+    mean_y = numpy.add.reduceat(y[1:-1], edges[:-1] - 1) / counts
+    mean_x = numpy.append(mean_x[1:], x[-1])
+    mean_y = numpy.append(mean_y[1:], y[-1])
+
+    indices = numpy.empty(threshold, dtype=int)
+    indices[0], indices[-1] = 0, length - 1
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        area = numpy.abs(
+            (x[selected] - mean_x[bucket]) * (y[start:stop] - y[selected])
+            - (x[selected] - x[start:stop]) * (mean_y[bucket] - y[selected])
+        )
+        selected = start + int(numpy.argmax(numpy.nan_to_num(area, nan=-1.0)))
+        indices[bucket + 1] = selected
+    return indices
+
+
+def minmax_envelope(
+    x: numpy.ndarray, y: numpy.ndarray, buckets: int
+) -> Dict[str, numpy.ndarray]:
+    """
+    Split the series (x, y) into `buckets` runs of consecutive points and
+    return the first x and the minimum and maximum of y (along the first
+    axis) of each.
+    """
+    length = len(y)
+    if buckets >= length:
+        return {"x": x, "min": y, "max": y}
+    starts = numpy.linspace(0, length, buckets + 1).astype(int)[:-1]
+    return {
+        "x": x[starts],
+        "min": numpy.minimum.reduceat(y, starts, axis=0),
+        "max": numpy.maximum.reduceat(y, starts, axis=0),
+    }
+
+
+def downsample(
+    y: numpy.ndarray,
+    x: Optional[numpy.ndarray] = None,
+    width: int = 1000,
+    mode: str = "lttb",
+) -> Dict[str, Any]:
+    """
+    Downsample the 1-D array `y`, or every column of the 2-D array `y`, to
+    about `width` points, against `x` or the row index. Return the series
+    as lists, ready to be sent as JSON.
+    """
+    if mode not in DOWNSAMPLE_MODES:
+        raise ValueError(f"Unknown mode {mode}")
+    if y.ndim not in (1, 2):
+        raise ValueError(f"Only 1-D and 2-D arrays can be plotted, not {y.ndim}-D")
+    if x is None:
+        x = numpy.arange(len(y))
+    elif x.shape != y.shape[:1]:
+        raise ValueError(f"The x values of shape {x.shape} do not match {y.shape}")
+    columns = y.reshape(len(y), -1)
+
+    series: List[Dict[str, Any]] = []
+    if mode == "minmax":
+        envelope = minmax_envelope(x, columns, width)
+        for column in range(columns.shape[1]):
+            series.append(
+                {
+                    "x": envelope["x"].tolist(),
+                    "min": envelope["min"][:, column].tolist(),
+                    "max": envelope["max"][:, column].tolist(),
+                }
+            )
+    else:
+        for column in columns.T:
+            indices = lttb_indices(x, column, width)
+            series.append({"x": x[indices].tolist(), "y": column[indices].tolist()})
+    return {"mode": mode, "width": width, "length": len(y), "series": series}
@@ -0,0 +1,286 @@
+"""Server-push channel for process state changes.
+
+The server subscribes once to the state-change broadcasts that every AiiDA
+process sends through the broker and fans them out to the clients connected
+to ``/api/events`` as server-sent events.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import queue
+import threading
+import traceback
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from aiida import orm
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+router = APIRouter()
+
+# table prefix (as in /api/{prefix}-data) → node class, for the `table` filter
+event_tables = {
+    "process": orm.ProcessNode,
+    "workchain": orm.WorkChainNode,
+}
+
+KEEP_ALIVE_INTERVAL = 15  # seconds
+SUBSCRIPTION_QUEUE_SIZE = 1000
+
+
+class LocalBroker:
+    """
+    In-process stand-in for the broker communicator. It implements the part
+    of the kiwipy communicator interface the hub relies on, so tests (or a
+    profile without a broker) can drive the event channel by calling
+    `broadcast_send` like a process would.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Callable] = {}
+
+    def add_broadcast_subscriber(self, subscriber, identifier=None):
+        identifier = identifier or str(uuid.uuid4())
+        self._subscribers[identifier] = subscriber
+        return identifier
+
+    def remove_broadcast_subscriber(self, identifier):
+        self._subscribers.pop(identifier, None)
+
+    def broadcast_send(self, body, sender=None, subject=None, correlation_id=None):
+        for subscriber in list(self._subscribers.values()):
+            subscriber(self, body, sender, subject, correlation_id)
+        return True
+
+
+class Subscription:
+    """The filters and the outgoing event queue of one connected client."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        pks: Optional[List[int]] = None,
+        workchain: Optional[int] = None,
+        node_cls: Optional[type] = None,
+        filters: Optional[dict] = None,
+    ):
+        self.loop = loop
+        self.pks = set(pks or [])
+        self.workchain = workchain
+        self.node_cls = node_cls
+        self.filters = filters or {}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def put(self, event: Dict[str, Any]) -> None:
+        """Queue an event from any thread; events are dropped if the client lags."""
+
+        def put_nowait():
+            if not self.queue.full():
+                self.queue.put_nowait(event)
+
+        self.loop.call_soon_threadsafe(put_nowait)
+
+
+class ProcessEventHub:
+    """
+    Receive process state-change broadcasts and fan them out to subscriptions.
+
+    The broker callback only queues the raw (pk, state) pair; a dispatcher
+    thread looks up the details once per event and checks the filters of
+    each subscription, so the broker connection is never blocked by queries.
+    """
+
+    def __init__(self):
+        self._subscriptions: set = set()
+        self._lock = threading.Lock()
+        self._pending: queue.Queue = queue.Queue()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._communicator = None
+        self._identifier = None
+
+    def attach(self, communicator=None) -> None:
+        """Subscribe to the state-change broadcasts of `communicator`, by
+        default the communicator of the loaded profile. Only the first call
+        has an effect."""
+        with self._lock:
+            if self._communicator is not None:
+                return
+            if communicator is None:
+                from aiida.manage import get_manager
+
+                communicator = get_manager().get_communicator()
+            self._identifier = communicator.add_broadcast_subscriber(self._on_broadcast)
+            self._communicator = communicator
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_forever, name="aiida-gui-events", daemon=True
+                )
+                self._dispatcher.start()
+
+    def detach(self) -> None:
+        with self._lock:
+            if self._communicator is not None:
+                self._communicator.remove_broadcast_subscriber(self._identifier)
+            self._communicator = None
+            self._identifier = None
+
+    def subscribe(self, *args, **kwargs) -> Subscription:
+        subscription = Subscription(*args, **kwargs)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _on_broadcast(self, _communicator, body, sender, subject, correlation_id=None):
+        # plumpy broadcasts `state_changed.<from>.<to>` with the pk as sender
+        if not subject or not str(subject).startswith("state_changed."):
+            return
+        try:
+            pk = int(sender)
+        except (TypeError, ValueError):
+            return
+        self._pending.put((pk, str(subject).rsplit(".", 1)[-1]))
+
+    def _dispatch_forever(self) -> None:
+        while True:
+            pk, state = self._pending.get()
+            try:
+                self.publish(pk, state)
+            except Exception:
+                print(traceback.format_exc())
+
+    def publish(self, pk: int, state: str) -> None:
+        """Send the state change of process `pk` to the matching subscriptions."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        if not subscriptions:
+            return
+        event = get_process_event(pk, state)
+        if any(sub.workchain is not None for sub in subscriptions):
+            event["ancestors"] = get_process_ancestors(pk)
+        in_table: Dict[Any, bool] = {}
+        for sub in subscriptions:
+            if sub.pks and pk not in sub.pks:
+                continue
+            if sub.workchain is not None and sub.workchain not in event["ancestors"]:
+                continue
+            if sub.node_cls is not None:
+                key = (sub.node_cls, json.dumps(sub.filters, sort_keys=True))
+                if key not in in_table:
+                    in_table[key] = is_in_table(pk, sub.node_cls, sub.filters)
+                if not in_table[key]:
+                    continue
+            sub.put(event)
+
+
+def get_process_event(pk: int, state: str) -> Dict[str, Any]:
+    """Return the state/mtime delta sent to the clients for process `pk`."""
+    qb = orm.QueryBuilder()
+    qb.append(
+        orm.ProcessNode,
+        filters={"id": pk},
+        project=["mtime", "attributes.process_label", "attributes.paused"],
+    )
+    row = qb.first()
+    mtime, process_label, paused = row if row else (None, None, None)
+    return {
+        "pk": pk,
+        "state": state,
+        "mtime": mtime.isoformat() if mtime else None,
+        "process_label": process_label,
+        "paused": bool(paused),
+    }
+
+
+def get_process_ancestors(pk: int) -> List[int]:
+    """Return the pks of the workflows that (indirectly) called process `pk`."""
+    from aiida_gui.app.utils import get_parent_processes
+
+    try:
+        return [parent["pk"] for parent in get_parent_processes(pk)[1:]]
+    except Exception:
+        return []
+
+
+def is_in_table(pk: int, node_cls: type, filters: dict) -> bool:
+    """Whether node `pk` is one of the rows of the table query."""
+    qb = orm.QueryBuilder()
+    qb.append(
+        node_cls, filters={"and": [{"id": pk}, filters]} if filters else {"id": pk}
+    )
+    return qb.count() > 0
+
+
+hub = ProcessEventHub()
+
+
+@router.get("/api/events")
+async def read_events(
+    request: Request,
+    pk: List[int] = Query([]),
+    workchain: Optional[int] = Query(None),
+    table: Optional[str] = Query(None),
+    filterModel: Optional[str] = Query(None),
+):
+    """
+    Stream process state changes as server-sent events. Clients can narrow the
+    stream to a list of `pk`s, to the subtree called by `workchain` and/or to
+    the rows of a `table` (process table prefix plus optional `filterModel`).
+    """
+    from aiida_gui.app.executor import run_in_executor
+    from aiida_gui.app.node_table import process_project
+    from aiida_gui.app.utils import translate_datagrid_filter_json
+
+    node_cls = None
+    filters = {}
+    if table is not None:
+        if table not in event_tables:
+            raise HTTPException(status_code=400, detail=f"Unknown table {table}")
+        node_cls = event_tables[table]
+        if filterModel:
+            try:
+                filters = translate_datagrid_filter_json(
+                    filterModel, project=process_project
+                )
+            except (AttributeError, TypeError, ValueError) as e:
+                raise HTTPException(status_code=400, detail=f"Invalid filterModel: {e}")
+
+    try:
+        await run_in_executor("events", hub.attach)
+    except Exception as e:
+        # without a broker only locally published events are delivered
+        print(f"Could not subscribe to the process broadcasts: {e}")
+
+    subscription = hub.subscribe(
+        asyncio.get_running_loop(),
+        pks=pk,
+        workchain=workchain,
+        node_cls=node_cls,
+        filters=filters,
+    )
+
+    async def stream():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=KEEP_ALIVE_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: state\ndata: {json.dumps(event)}\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
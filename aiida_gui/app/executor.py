@@ -0,0 +1,165 @@
+"""Bounded thread pool for the blocking storage and daemon calls of the routes.
+
+The routes are served from a single event loop, so a route that runs a slow
+query directly stalls every other request. Routes decorated with `offload`
+run in a shared thread pool instead. Every endpoint group may only occupy a
+limited number of workers at once, so e.g. a heavy workchain graph cannot
+hold up the daemon status poll.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import os
+import threading
+import time
+import typing
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+EXECUTOR_WORKERS = int(os.getenv("AIIDA_GUI_EXECUTOR_WORKERS", "8"))
+# default number of calls of one endpoint group that may run at the same time
+EXECUTOR_GROUP_LIMIT = int(os.getenv("AIIDA_GUI_EXECUTOR_GROUP_LIMIT", "4"))
+# per-group overrides, e.g. "workchain=2,daemon=1"
+EXECUTOR_GROUP_LIMITS = {
+    group.strip(): int(limit)
+    for group, limit in (
+        item.split("=")
+        for item in os.getenv("AIIDA_GUI_EXECUTOR_GROUP_LIMITS", "").split(",")
+        if "=" in item
+    )
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=EXECUTOR_WORKERS, thread_name_prefix="aiida-gui-storage"
+)
+# asyncio semaphores belong to one event loop: loop → {group: semaphore}
+_semaphores = weakref.WeakKeyDictionary()
+_stats: Dict[str, Dict[str, Any]] = {}
+_stats_lock = threading.Lock()
+
+
+def get_group_limit(group: str) -> int:
+    return EXECUTOR_GROUP_LIMITS.get(group, EXECUTOR_GROUP_LIMIT)
+
+
+def _get_semaphore(group: str) -> asyncio.Semaphore:
+    semaphores = _semaphores.setdefault(asyncio.get_running_loop(), {})
+    if group not in semaphores:
+        semaphores[group] = asyncio.Semaphore(get_group_limit(group))
+    return semaphores[group]
+
+
+def _group_stats(group: str) -> Dict[str, Any]:
+    return _stats.setdefault(
+        group,
+        {
+            "calls": 0,
+            "waiting": 0,
+            "running": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+        },
+    )
+
+
+def _adjust(group: str, key: str, delta: int) -> None:
+    with _stats_lock:
+        _group_stats(group)[key] += delta
+
+
+def _record_wait(group: str, wait: float) -> None:
+    with _stats_lock:
+        stats = _group_stats(group)
+        stats["calls"] += 1
+        stats["queue_wait_total"] += wait
+        stats["queue_wait_max"] = max(stats["queue_wait_max"], wait)
+
+
+def _call_in_thread(
+    group: str, submitted: float, func: Callable, args: tuple, kwargs: dict
+) -> Any:
+    from aiida.manage import get_manager
+
+    _record_wait(group, time.monotonic() - submitted)
+    _adjust(group, "running", 1)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _adjust(group, "running", -1)
+        # each worker thread has its own storage session; close it so no
+        # transaction or connection is held while the thread is idle
+        try:
+            get_manager().get_profile_storage().get_session().close()
+        except Exception:
+            pass
+
+
+async def run_in_executor(group: str, func: Callable, *args, **kwargs) -> Any:
+    """
+    Run the blocking `func(*args, **kwargs)` in the storage thread pool.
+
+    The call first waits for a free slot of its endpoint `group`; the time
+    from submission until it starts running is recorded as queue wait.
+    """
+    submitted = time.monotonic()
+    _adjust(group, "waiting", 1)
+    async with _get_semaphore(group):
+        _adjust(group, "waiting", -1)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _executor,
+            _call_in_thread,
+            group,
+            submitted,
+            func,
+            args,
+            kwargs,
+        )
+
+
+def offload(group: str):
+    """
+    Decorate a blocking (plain `def`) route so it runs in the thread pool
+    under the concurrency limit of `group`. Put it below the router decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await run_in_executor(group, func, *args, **kwargs)
+
+        # FastAPI resolves string annotations in the globals of the route
+        # function, which are those of this module for the wrapper, so hand
+        # it the resolved signature of the wrapped route
+        signature = inspect.signature(func)
+        try:
+            hints = typing.get_type_hints(inspect.unwrap(func))
+        except Exception:
+            hints = {}
+        wrapper.__signature__ = signature.replace(
+            parameters=[
+                param.replace(annotation=hints.get(name, param.annotation))
+                for name, param in signature.parameters.items()
+            ],
+            return_annotation=hints.get("return", signature.return_annotation),
+        )
+        return wrapper
+
+    return decorator
+
+
+def executor_stats() -> Dict[str, Any]:
+    """Return the concurrency limits and queue-wait metrics per endpoint group."""
+    with _stats_lock:
+        groups = {}
+        for group, stats in _stats.items():
+            calls = stats["calls"]
+            groups[group] = {
+                **stats,
+                "limit": get_group_limit(group),
+                "queue_wait_avg": stats["queue_wait_total"] / calls if calls else 0.0,
+            }
+    return {"workers": EXECUTOR_WORKERS, "groups": groups}
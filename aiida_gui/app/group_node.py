@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import Dict, Optional, Union, List
 from fastapi import HTTPException, Query
 from aiida_gui.app.node_table import make_node_router
+from aiida_gui.app.executor import offload
 from aiida import orm
 import traceback
 
@@ -54,7 +55,8 @@ router = make_node_router(
 
 
 @router.get("/api/groupnode/{id}")
-async def read_group_summary(id: int) -> Dict[str, Union[str, int]]:
+@offload("groupnode")
+def read_group_summary(id: int) -> Dict[str, Union[str, int]]:
     try:
         g = orm.load_group(id)
         summary = {
@@ -75,7 +77,8 @@ async def read_group_summary(id: int) -> Dict[str, Union[str, int]]:
 #      GET /api/groupnode/{id}/members-data   (same contract as -data)
 # ---------------------------------------------------------------------------
 @router.get("/api/groupnode/{id}/members-data")
-async def read_group_members(
+@offload("groupnode")
+def read_group_members(
     id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(15, gt=0, le=500),
@@ -83,6 +86,7 @@ async def read_group_members(
     sortOrder: str = Query("desc", pattern="^(asc|desc)$"),
     filterModel: Optional[str] = Query(None),
 ):
+    from aiida_gui.app.utils import count_query, get_group_fingerprint
 
     project = ["id", "ctime", "node_type", "label", "description"]
 
@@ -102,29 +106,47 @@ async def read_group_members(
     )
 
     # server‑side filters coming from the DataGrid
+    filters = {}
     if filterModel:
         from aiida_gui.app.utils import (
             translate_datagrid_filter_json,
         )
 
-        qb.add_filter(
-            "node", translate_datagrid_filter_json(filterModel, project=project)
-        )
+        filters = translate_datagrid_filter_json(filterModel, project=project)
+        qb.add_filter("node", filters)
 
     qb.order_by({"node": {sortField: sortOrder}})
-    total = qb.count()
+    # membership changes move neither max(id) nor max(mtime) of the node
+    # table, so the cached total is keyed on the members of the group
+    total, _ = count_query(
+        qb,
+        ("group-members", id),
+        filters,
+        orm.Node,
+        fingerprint=get_group_fingerprint(id),
+    )
     qb.offset(skip).limit(limit)
 
     results = projected_data_to_dict(qb, project)
-    return {"total": total, "data": results}
+    return {"total": total, "approximate": False, "data": results}
 
 
 @router.delete("/api/groupnode/delete" + "/{id}")
-async def delete(
-    id: int, dry_run: bool = False, delete_nodes: bool = False
+@offload("groupnode")
+def delete(
+    id: int, dry_run: bool = False, delete_nodes: bool = False, background: bool = False
 ) -> Dict[str, Union[bool, str, List[int]]]:
     from aiida.tools import delete_group_nodes
+    from aiida_gui.app.cache import count_cache
 
+    if background:
+        # purging the nodes of a large group takes long, run it as a job
+        from aiida_gui.app.background import submit_job
+
+        job = submit_job(
+            "delete_group", group_id=id, delete_nodes=delete_nodes, dry_run=dry_run
+        )
+        return {"job_id": job["id"]}
     try:
         if dry_run:
             return {
@@ -140,6 +162,7 @@ async def delete(
         else:
             orm.Group.collection.delete(id)
             ok = True
+        count_cache.clear()
         return {
             "deleted": ok,
             "message": (
@@ -153,14 +176,17 @@ async def delete(
 
 
 @router.delete("/api/groupnode/{group_id}/members/remove/{node_id}")
-async def delete_node(
+@offload("groupnode")
+def delete_node(
     group_id: int,
     node_id: int,
 ) -> Dict[str, Union[bool, str, List[int]]]:
+    from aiida_gui.app.cache import count_cache
 
     try:
         group = orm.load_group(group_id)
         group.remove_nodes([orm.load_node(node_id)])
+        count_cache.clear()
         return {
             "removed": True,
             "message": f"Removed node {node_id} from the group",
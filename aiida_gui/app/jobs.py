@@ -0,0 +1,382 @@
+"""Jobs that track the outcome of batch actions started through the API.
+
+A batch action, e.g. killing two thousand processes, is answered right
+away with the id of a job. The job records the outcome of every item as it
+arrives, and clients poll ``/api/jobs/{id}`` or stream its changes from
+``/api/jobs/{id}/stream`` as server-sent events.
+
+The same routes serve the persistent background jobs of
+`aiida_gui.app.background`, e.g. deletes, whose version is the number of
+events they logged.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+router = APIRouter()
+
+# finished jobs kept for polling; the oldest are dropped first
+JOB_STORE_SIZE = int(os.getenv("AIIDA_GUI_JOB_STORE_SIZE", "100"))
+# seconds after which unanswered process actions are given up
+PROCESS_ACTION_TIMEOUT = float(os.getenv("AIIDA_GUI_PROCESS_ACTION_TIMEOUT", "60"))
+JOB_STREAM_INTERVAL = 0.5  # seconds
+
+PROCESS_ACTIONS = ("pause", "play", "kill")
+TERMINATED_STATES = ("finished", "excepted", "killed")
+
+
+class Job:
+    """
+    The outcome per item (e.g. process pk) of one batch action. Items start
+    as `pending` and are set once to `ok`, `failed`, `skipped` or
+    `timeout`. Every change is appended to a log, so clients can ask for
+    the changes since the `version` they saw last.
+    """
+
+    def __init__(self, kind: str, items: List[Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.results: Dict[Any, Dict[str, Any]] = {
+            item: {"status": "pending", "message": None} for item in items
+        }
+        self._pending = len(self.results)
+        self._changes: List[Any] = []
+        self._cancel: List[Callable[[], Any]] = []
+        self._lock = threading.Lock()
+        if not self._pending:
+            self.finished = self.created
+
+    @property
+    def version(self) -> int:
+        return len(self._changes)
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    def set_result(self, item: Any, status: str, message: Optional[str] = None):
+        """Record the outcome of `item`, unless it already has one."""
+        with self._lock:
+            result = self.results.get(item)
+            if result is None or result["status"] != "pending":
+                return
+            self.results[item] = {"status": status, "message": message}
+            self._changes.append(item)
+            self._pending -= 1
+            if not self._pending:
+                self.finished = time.time()
+
+    def on_cancel(self, cancel: Callable[[], Any]) -> None:
+        """Register a callback that gives up on an item, e.g. `future.cancel`."""
+        self._cancel.append(cancel)
+
+    def expire(self, message: str = "No response in time") -> None:
+        """Give up on the items that are still pending."""
+        for cancel in self._cancel:
+            try:
+                cancel()
+            except Exception:
+                pass
+        for item, result in list(self.results.items()):
+            if result["status"] == "pending":
+                self.set_result(item, "timeout", message)
+
+    def changes_since(self, version: int = 0) -> Tuple[int, Dict[Any, Dict]]:
+        """Return the current version and the results changed after `version`."""
+        with self._lock:
+            changed = self._changes[version:]
+            return len(self._changes), {item: self.results[item] for item in changed}
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = Counter(result["status"] for result in self.results.values())
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "created": self.created,
+                "finished": self.finished,
+                "done": self.finished is not None,
+                "total": len(self.results),
+                "counts": dict(counts),
+                "version": len(self._changes),
+            }
+
+    def to_dict(self, since: Optional[int] = None) -> Dict[str, Any]:
+        """Return the summary and the results, all of them or those changed
+        after version `since`."""
+        if since is None:
+            with self._lock:
+                results = dict(self.results)
+        else:
+            _, results = self.changes_since(since)
+        return {**self.summary(), "results": results}
+
+
+class JobStore:
+    """The jobs of this server process, keeping at most `maxsize` finished
+    jobs."""
+
+    def __init__(self, maxsize: int = JOB_STORE_SIZE):
+        self.maxsize = maxsize
+        self._jobs: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, job: Job) -> Job:
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = [key for key, other in self._jobs.items() if other.done]
+            for key in finished[: max(len(finished) - self.maxsize, 0)]:
+                del self._jobs[key]
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+
+jobs = JobStore()
+
+
+def get_process_controller():
+    """Return the process controller of the broker of the loaded profile."""
+    from aiida.manage import get_manager
+
+    return get_manager().get_process_controller()
+
+
+def watch_future(job: Job, item: Any, future, action: str) -> None:
+    """Record the outcome of the process action `future` for `item` once it
+    resolves. Replies come in on the broker thread, no thread waits."""
+    from plumpy.futures import unwrap_kiwi_future
+
+    unwrapped = unwrap_kiwi_future(future)
+
+    def done(resolved):
+        if resolved.cancelled():
+            job.set_result(item, "timeout", "No response in time")
+            return
+        try:
+            result = resolved.result()
+        except Exception as e:
+            job.set_result(item, "failed", str(e))
+            return
+        if result is True:
+            job.set_result(item, "ok")
+        elif result is False:
+            job.set_result(item, "failed", f"The process refused to {action}")
+        else:
+            job.set_result(item, "failed", f"Unexpected response: {result}")
+
+    job.on_cancel(unwrapped.cancel)
+    unwrapped.add_done_callback(done)
+
+
+def send_process_action(controller, action: str, pk: int):
+    """Send `action` to process `pk` and return the future of the reply."""
+    if action == "pause":
+        return controller.pause_process(pk)
+    if action == "play":
+        return controller.play_process(pk)
+    if action == "kill":
+        return controller.kill_process(pk)
+    raise ValueError(f"Unknown action {action}")
+
+
+def dispatch_process_action(
+    action: str,
+    pks: List[int],
+    timeout: float = PROCESS_ACTION_TIMEOUT,
+    rejected: Optional[Dict[int, str]] = None,
+) -> Job:
+    """
+    Send `action` (pause, play or kill) to all processes `pks` at once,
+    without waiting for the replies, and return the job that collects them.
+    This is what `pause_processes` and friends do, but with the outcome of
+    every process recorded instead of logged. Terminated processes are
+    skipped. The items of `rejected` are recorded as failed with their
+    message, without sending them anything.
+    """
+    from aiida import orm
+    from kiwipy import communications
+
+    if action not in PROCESS_ACTIONS:
+        raise ValueError(f"Unknown action {action}")
+    controller = get_process_controller()
+    rejected = rejected or {}
+    pks = [pk for pk in dict.fromkeys(pks) if pk not in rejected]
+    states = {}
+    if pks:
+        qb = orm.QueryBuilder()
+        qb.append(
+            orm.ProcessNode,
+            filters={"id": {"in": pks}},
+            project=["id", "attributes.process_state"],
+        )
+        states = dict(qb.all())
+
+    job = jobs.add(Job(action, pks + list(rejected)))
+    for pk, message in rejected.items():
+        job.set_result(pk, "failed", message)
+    for pk in pks:
+        if pk not in states:
+            job.set_result(pk, "failed", "Not a process")
+            continue
+        if states[pk] in TERMINATED_STATES:
+            job.set_result(pk, "skipped", "Already terminated")
+            continue
+        try:
+            future = send_process_action(controller, action, pk)
+        except communications.UnroutableError:
+            job.set_result(pk, "failed", "The process is unreachable")
+        except Exception as e:
+            job.set_result(pk, "failed", str(e))
+        else:
+            watch_future(job, pk, future, action)
+    if not job.done:
+        timer = threading.Timer(timeout, job.expire)
+        timer.daemon = True
+        timer.start()
+    return job
+
+
+def get_job_or_404(job_id: str) -> Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+def get_background_job(job_id: str, since: Optional[int] = None) -> Optional[Dict]:
+    """Return a background job with its events, all of them or those after
+    version `since`, or None if there is no such job."""
+    from aiida_gui.app.background import get_job_table
+
+    table = get_job_table()
+    job = table.get(job_id)
+    if job is None:
+        return None
+    version = job.pop("events")
+    events = table.events_since(job_id, since or 0)
+    return {**job, "version": version, "events": [data for _, data in events]}
+
+
+def read_job_dict(job_id: str, since: Optional[int] = None) -> Dict[str, Any]:
+    job = jobs.get(job_id)
+    if job is not None:
+        return job.to_dict(since)
+    background_job = get_background_job(job_id, since)
+    if background_job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return background_job
+
+
+@router.get("/api/jobs")
+async def read_jobs() -> List[Dict[str, Any]]:
+    """Return the summaries of the jobs, newest first."""
+    from aiida.manage import get_manager
+
+    from aiida_gui.app.background import get_job_table
+
+    profile = get_manager().get_profile().name
+    background_jobs = await asyncio.to_thread(get_job_table().list, profile)
+    summaries = [job.summary() for job in jobs.list()]
+    summaries.extend(
+        {key: value for key, value in job.items() if key != "events"}
+        for job in background_jobs
+    )
+    return sorted(summaries, key=lambda job: job["created"], reverse=True)
+
+
+@router.get("/api/jobs/{job_id}")
+async def read_job(job_id: str, since: Optional[int] = None) -> Dict[str, Any]:
+    """Return a job with the results of all items, or only of those that
+    changed after version `since`. A background job comes with its result
+    and its events."""
+    return await asyncio.to_thread(read_job_dict, job_id, since)
+
+
+@router.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str) -> Dict[str, Any]:
+    """Cancel a job: give up on its pending items, or ask the worker of a
+    background job to stop at its next check. A background job that already
+    started deleting runs to its end."""
+    from aiida_gui.app.background import get_job_table
+
+    job = jobs.get(job_id)
+    if job is not None:
+        job.expire("Cancelled")
+        return job.summary()
+    table = await asyncio.to_thread(get_job_table)
+    await asyncio.to_thread(table.request_cancel, job_id)
+    background_job = await asyncio.to_thread(table.get, job_id)
+    if background_job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    background_job["version"] = background_job.pop("events")
+    return background_job
+
+
+@router.get("/api/jobs/{job_id}/stream")
+async def stream_job(request: Request, job_id: str):
+    """Stream the changed results of a job as server-sent `progress` events,
+    followed by an `end` event once every item has its outcome. For a
+    background job, every `progress` event has the events logged since the
+    previous one."""
+    job = jobs.get(job_id)
+    if job is None:
+        data = await asyncio.to_thread(read_job_dict, job_id, 0)
+        return event_stream(stream_background_job(request, data))
+
+    async def stream():
+        version = 0
+        while not await request.is_disconnected():
+            done = job.done
+            if job.version > version or version == 0:
+                data = job.to_dict(version)
+                version = data["version"]
+                yield f"event: progress\ndata: {json.dumps(data)}\n\n"
+            if done:
+                yield f"event: end\ndata: {json.dumps(job.summary())}\n\n"
+                return
+            await asyncio.sleep(JOB_STREAM_INTERVAL)
+
+    return event_stream(stream())
+
+
+async def stream_background_job(request: Request, data: Dict[str, Any]):
+    job_id = data["id"]
+    seen = None
+    while not await request.is_disconnected():
+        state = (data["status"], data["stage"], data["progress"], data["version"])
+        if state != seen:
+            seen = state
+            yield f"event: progress\ndata: {json.dumps(data)}\n\n"
+        if data["done"]:
+            data.pop("events")
+            yield f"event: end\ndata: {json.dumps(data)}\n\n"
+            return
+        await asyncio.sleep(JOB_STREAM_INTERVAL)
+        data = await asyncio.to_thread(read_job_dict, job_id, data["version"])
+
+
+def event_stream(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
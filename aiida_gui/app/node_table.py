@@ -1,7 +1,10 @@
 from __future__ import annotations
-from fastapi import APIRouter, Query, Body, HTTPException
+from fastapi import APIRouter, Query, Body, HTTPException, Path, Request, Response
 from aiida import orm
-from typing import Type, Dict, List, Union, Optional
+from datetime import datetime
+import time
+from typing import Any, Type, Dict, List, Tuple, Union, Optional
+from pydantic import BaseModel
 
 
 process_project = [
@@ -20,6 +23,67 @@ process_project = [
 ]
 
 
+class BatchActionModel(BaseModel):
+    """Request body of a batch process action: the processes by pk, or the
+    DataGrid filter model (object or JSON string) selecting them."""
+
+    pks: Optional[List[int]] = None
+    filterModel: Optional[Union[Dict[str, Any], str]] = None
+
+
+# DataGrid sort field → QB column, for the fields that can be used as keyset
+# (cursor) pagination keys. JSON attribute fields can only be paged by offset.
+cursor_sort_columns = {
+    "pk": "id",
+    "ctime": "ctime",
+    "label": "label",
+    "description": "description",
+}
+
+
+def encode_cursor(value: Any, pk: int) -> str:
+    """Encode the (sort value, pk) pair of a boundary row into an opaque token."""
+    import base64
+    import json
+
+    if isinstance(value, datetime):
+        value = {"datetime": value.isoformat()}
+    raw = json.dumps([value, pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(token: str) -> Tuple[Any, int]:
+    """Decode a token created by `encode_cursor` back into (sort value, pk)."""
+    import base64
+    import binascii
+    import json
+
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(token.encode()))
+        pk = int(pk)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if isinstance(value, dict) and "datetime" in value:
+        value = datetime.fromisoformat(value["datetime"])
+    return value, pk
+
+
+def keyset_filter(column: str, value: Any, pk: int, descending: bool) -> dict:
+    """
+    Return the QB filter selecting the rows that come strictly after the
+    (value, pk) cursor when walking in the given direction.
+    """
+    op = "<" if descending else ">"
+    if column == "id":
+        return {"id": {op: pk}}
+    return {
+        "or": [
+            {column: {op: value}},
+            {"and": [{column: {"==": value}}, {"id": {op: pk}}]},
+        ]
+    }
+
+
 def projected_data_to_dict_process(qb, project):
     """
     Convert the projected data from a QueryBuilder to a list of dictionaries.
@@ -82,13 +146,22 @@ def make_node_router(
     from aiida.tools import delete_nodes
     from aiida_gui.app.utils import (
         translate_datagrid_filter_json,
+        count_query,
+        get_table_fingerprint,
+        make_etag,
+        check_etag,
     )
+    from aiida_gui.app.cache import ancestor_cache, count_cache, single_flight
+    from aiida_gui.app.executor import offload
 
     router = APIRouter()
 
     # -------------------- GET /…-data --------------------
     @router.get(f"/api/{prefix}-data")
-    async def read_node_data(
+    @offload(prefix)
+    def read_node_data(
+        request: Request,
+        response: Response,
         skip: int = Query(0, ge=0),
         limit: int = Query(15, gt=0, le=500),
         sortField: str = Query(
@@ -96,7 +169,33 @@ def make_node_router(
         ),
         sortOrder: str = Query("desc", pattern="^(asc|desc)$"),
         filterModel: Optional[str] = Query(None),
+        after: Optional[str] = Query(None),
+        before: Optional[str] = Query(None),
+        estimate: bool = Query(False),
     ):
+        """
+        Return one page of nodes. Pages are addressed either by `skip` (offset)
+        or by an `after`/`before` cursor taken from the `next_cursor` /
+        `prev_cursor` of a previous response. Cursor pages cost the same at
+        any depth, offset pages allow jumping to an arbitrary page.
+
+        The total is cached until nodes are added or modified. With `estimate`,
+        unfiltered tables report the planner's estimate and flag the total
+        as `approximate`. The page carries an ETag and is answered with 304
+        while neither the table nor the total changed.
+        """
+        if after and before:
+            raise HTTPException(
+                status_code=400, detail="Use either `after` or `before`, not both"
+            )
+        cursor = after or before
+        sort_column = cursor_sort_columns.get(sortField)
+        if cursor and sort_column is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cursor pagination is not supported when sorting by {sortField}",
+            )
+
         qb = QueryBuilder()
         filters = (
             translate_datagrid_filter_json(filterModel, project=project)
@@ -109,17 +208,166 @@ def make_node_router(
             project=project or ["id", "uuid", "ctime", "label", "description"],
             tag="data",
         )
+        fingerprint = get_table_fingerprint(node_cls)
+        total, approximate = count_query(
+            qb,
+            (prefix, node_cls.__name__),
+            filters,
+            node_cls,
+            estimate=estimate,
+            fingerprint=fingerprint,
+        )
+        # the rows show `ctime` relative to now, so let the tag age by the minute
+        etag = make_etag(
+            prefix,
+            sorted(request.query_params.multi_items()),
+            fingerprint,
+            total,
+            int(time.time() // 60),
+        )
+        not_modified = check_etag(request, response, etag)
+        if not_modified is not None:
+            return not_modified
+
+        # identical requests of all open tabs share one page query
+        return single_flight.do(
+            ("table", prefix, etag),
+            read_page,
+            qb,
+            sortField,
+            sortOrder,
+            limit,
+            skip,
+            after,
+            before,
+            total,
+            approximate,
+        )
+
+    if issubclass(node_cls, orm.ProcessNode):
+
+        @router.get(f"/api/{prefix}-data/facets")
+        @offload(prefix)
+        def read_facets(
+            request: Request,
+            response: Response,
+            filterModel: Optional[str] = Query(None),
+        ):
+            """
+            Return the number of rows matching `filterModel` per process
+            state, process label, exit status and computer, each as a list of
+            `{value, count}` ordered by count, plus the counts per
+            combination in `groups`. The counts are cached, and answered with
+            304, until nodes are added or modified.
+            """
+            import json
+
+            from aiida_gui.app.utils import PROCESS_FACETS, get_process_facets
+
+            filters = (
+                translate_datagrid_filter_json(filterModel, project=project)
+                if filterModel
+                else {}
+            )
+            fingerprint = get_table_fingerprint(node_cls)
+            etag = make_etag(prefix, "facets", filterModel, fingerprint)
+            not_modified = check_etag(request, response, etag)
+            if not_modified is not None:
+                return not_modified
+
+            key = (
+                "facets",
+                prefix,
+                node_cls.__name__,
+                json.dumps(filters, sort_keys=True, default=str),
+            )
+            groups = count_cache.get_or_count(
+                key,
+                fingerprint,
+                lambda: single_flight.do(key, get_process_facets, node_cls, filters),
+            )
+            facets = {}
+            for field in PROCESS_FACETS:
+                counts: Dict[Any, int] = {}
+                for group in groups:
+                    counts[group[field]] = counts.get(group[field], 0) + group["count"]
+                facets[field] = [
+                    {"value": value, "count": count}
+                    for value, count in sorted(
+                        counts.items(), key=lambda item: (-item[1], str(item[0]))
+                    )
+                ]
+            return {
+                "total": sum(group["count"] for group in groups),
+                "facets": facets,
+                "groups": sorted(groups, key=lambda group: -group["count"]),
+            }
 
-        qb.order_by({"data": {sortField: sortOrder}})
-        total = qb.count()
-        qb.offset(skip).limit(limit)
+    def read_page(
+        qb,
+        sortField: str,
+        sortOrder: str,
+        limit: int,
+        skip: int,
+        after: Optional[str],
+        before: Optional[str],
+        total: int,
+        approximate: bool,
+    ) -> Dict[str, Any]:
+        cursor = after or before
+        sort_column = cursor_sort_columns.get(sortField)
+        descending = sortOrder == "desc"
+        if cursor:
+            # walk backwards from a `before` cursor and flip the page afterwards
+            if before:
+                descending = not descending
+            value, pk = decode_cursor(cursor)
+            qb.add_filter("data", keyset_filter(sort_column, value, pk, descending))
+        order = "desc" if descending else "asc"
+        if sortField == "pk":
+            qb.order_by({"data": {"id": order}})
+        else:
+            qb.order_by({"data": [{sortField: order}, {"id": order}]})
+        if not cursor:
+            qb.offset(skip)
+        qb.limit(limit)
 
         results = get_data_func(qb, project)
-        return {"total": total, "data": results}
+        if before:
+            results.reverse()
+        content = {"total": total, "approximate": approximate, "data": results}
+        if sort_column is not None:
+            content.update(page_cursors(results, sort_column))
+        return content
+
+    def page_cursors(
+        results: List[Dict[str, Any]], sort_column: str
+    ) -> Dict[str, Optional[str]]:
+        """Return the cursors pointing to the pages before and after `results`."""
+        if not results:
+            return {"prev_cursor": None, "next_cursor": None}
+        first, last = results[0]["pk"], results[-1]["pk"]
+        if sort_column == "id":
+            values = {first: first, last: last}
+        else:
+            # the rows were already formatted for display, so look up the raw
+            # sort values of the two boundary rows by primary key
+            qb = QueryBuilder()
+            qb.append(
+                node_cls,
+                filters={"id": {"in": [first, last]}},
+                project=["id", sort_column],
+            )
+            values = dict(qb.all())
+        return {
+            "prev_cursor": encode_cursor(values.get(first), first),
+            "next_cursor": encode_cursor(values.get(last), last),
+        }
 
     # -------------------- PUT /…-data/{id} --------------------
     @router.put(f"/api/{prefix}-data" + "/{id}")
-    async def update_node(
+    @offload(prefix)
+    def update_node(
         id: int,
         payload: Dict[str, str] = Body(...),
     ):
@@ -141,7 +389,8 @@ def make_node_router(
 
     # -------------------- pause / play / delete -------------
     @router.post(f"/api/{prefix}/pause" + "/{id}")
-    async def pause(id: int):
+    @offload(prefix)
+    def pause(id: int):
         try:
             pause_processes([orm.load_node(id)])
             return {"message": f"Paused {node_cls.__name__} {id}"}
@@ -149,7 +398,8 @@ def make_node_router(
             raise HTTPException(status_code=500, detail=str(e))
 
     @router.post(f"/api/{prefix}/play" + "/{id}")
-    async def play(id: int):
+    @offload(prefix)
+    def play(id: int):
         try:
             play_processes([orm.load_node(id)])
             return {"message": f"Resumed {node_cls.__name__} {id}"}
@@ -157,21 +407,90 @@ def make_node_router(
             raise HTTPException(status_code=500, detail=str(e))
 
     @router.post(f"/api/{prefix}/kill" + "/{id}")
-    async def kill(id: int):
+    @offload(prefix)
+    def kill(id: int):
         try:
             kill_processes([orm.load_node(id)])
             return {"message": f"Resumed {node_cls.__name__} {id}"}
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    if issubclass(node_cls, orm.ProcessNode):
+
+        @router.post(f"/api/{prefix}" + "/{action}", status_code=202)
+        @offload(prefix)
+        def batch_action(
+            payload: BatchActionModel,
+            action: str = Path(..., pattern="^(pause|play|kill)$"),
+        ) -> Dict[str, Any]:
+            """
+            Pause, play or kill the processes with the `pks` of the payload, or
+            the active ones matching its `filterModel`, in one batch. Return the
+            id of the job that collects the outcome per process, see /api/jobs.
+            """
+            import json
+
+            from aiida_gui.app.jobs import TERMINATED_STATES, dispatch_process_action
+
+            pks = payload.pks
+            filter_model = payload.filterModel
+            if pks is None and filter_model is None:
+                raise HTTPException(
+                    status_code=400, detail="Provide either `pks` or `filterModel`"
+                )
+            if pks is None:
+                if not isinstance(filter_model, str):
+                    filter_model = json.dumps(filter_model)
+                try:
+                    filters = translate_datagrid_filter_json(
+                        filter_model, project=project
+                    )
+                except (AttributeError, TypeError, ValueError) as e:
+                    raise HTTPException(
+                        status_code=400, detail=f"Invalid filterModel: {e}"
+                    )
+                active = {
+                    "attributes.process_state": {"!in": list(TERMINATED_STATES)},
+                }
+                qb = QueryBuilder()
+                qb.append(
+                    node_cls,
+                    filters={"and": [filters, active]} if filters else active,
+                    project="id",
+                )
+                pks = qb.all(flat=True)
+            try:
+                job = dispatch_process_action(action, pks)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(
+                    status_code=503, detail=f"Could not reach the processes: {e}"
+                )
+            return {"job_id": job.id, "total": len(job.results)}
+
     if inclue_delete_route:
 
         @router.delete(f"/api/{prefix}/delete" + "/{id}")
-        async def delete(
-            id: int, dry_run: bool = False
+        @offload(prefix)
+        def delete(
+            id: int, dry_run: bool = False, background: bool = False
         ) -> Dict[str, Union[bool, str, List[int]]]:
+            """
+            Delete a node and the nodes depending on it, or with `dry_run`
+            only list them. With `background`, queue the deletion as a job
+            and return its id instead, see /api/jobs.
+            """
+            if background:
+                from aiida_gui.app.background import submit_job
+
+                job = submit_job("delete_nodes", pks=[id], dry_run=dry_run)
+                return {"job_id": job["id"]}
             try:
                 deleted, ok = delete_nodes([id], dry_run=dry_run)
+                if ok and not dry_run:
+                    count_cache.clear()
+                    ancestor_cache.clear()
                 return {
                     "deleted": ok,
                     "message": (
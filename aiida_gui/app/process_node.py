@@ -3,10 +3,28 @@ from aiida_gui.app.node_table import (
     process_project,
     projected_data_to_dict_process,
 )
+import asyncio
+import json
 import traceback
-from fastapi import HTTPException
+from typing import Optional
+from fastapi import HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from aiida import orm
-from .utils import get_node_summary
+from .cache import sealed_cache, single_flight
+from .executor import offload, run_in_executor
+from .utils import (
+    LINK_KINDS,
+    SUMMARY_LINK_LIMIT,
+    get_link_namespace,
+    get_log_range,
+    get_log_records,
+    get_node_summary,
+    get_node_fingerprint,
+    get_table_fingerprint,
+    make_etag,
+    check_etag,
+)
 
 router = make_node_router(
     node_cls=orm.ProcessNode,
@@ -17,26 +35,215 @@ router = make_node_router(
 
 
 @router.get("/api/process/{id}")
-async def read_process(id: int):
-    try:
-        node = orm.load_node(id)
-    except Exception:
+@offload("process")
+def read_process(id: int, request: Request, response: Response):
+    fingerprint = get_node_fingerprint(id)
+    if not fingerprint:
         raise HTTPException(status_code=404, detail=f"Process {id} not found")
+    not_modified = check_etag(request, response, make_etag("process", fingerprint))
+    if not_modified is not None:
+        return not_modified
+
+    def compute():
+        try:
+            node = orm.load_node(id)
+        except Exception:
+            raise HTTPException(status_code=404, detail=f"Process {id} not found")
+        return single_flight.do(
+            ("summary", id, fingerprint),
+            get_node_summary,
+            node,
+            link_limit=SUMMARY_LINK_LIMIT,
+        )
 
-    data = get_node_summary(node)
+    uuid, mtime, sealed, _ = fingerprint
+    data = sealed_cache.get_or_compute(("summary", uuid), mtime, bool(sealed), compute)
     return data
 
 
+@router.get("/api/process/{id}/links")
+@offload("process")
+def read_process_links(
+    id: int,
+    request: Request,
+    response: Response,
+    kind: str = "outputs",
+    namespace: str = "",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, gt=0, le=1000),
+):
+    """
+    Return one page of the inputs, outputs, called or caller processes
+    (`kind`) of a node in the port `namespace` (dotted path). Sub-namespaces
+    are collapsed to their number of links and can be loaded the same way.
+    """
+    if kind not in LINK_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown link kind {kind}")
+    fingerprint = get_node_fingerprint(id)
+    if not fingerprint:
+        raise HTTPException(status_code=404, detail=f"Process {id} not found")
+    not_modified = check_etag(
+        request,
+        response,
+        make_etag("process-links", fingerprint, kind, namespace, skip, limit),
+    )
+    if not_modified is not None:
+        return not_modified
+    return get_link_namespace(id, kind, namespace, skip, limit)
+
+
 @router.get("/api/process-logs/{id}")
-async def read_workgraph_logs(id: int):
+@offload("process")
+def read_workgraph_logs(id: int, request: Request, response: Response):
     from aiida.cmdline.utils.common import get_workchain_report
 
-    try:
+    fingerprint = get_node_fingerprint(id)
+    if not fingerprint:
+        raise HTTPException(status_code=404, detail=f"Workgraph {id} not found")
+    uuid, mtime, sealed, _ = fingerprint
+    # the logs of the call tree are final once the process is sealed; until
+    # then any new log record may belong to it
+    log_version = None if sealed else get_table_fingerprint(orm.Log)
+    etag = make_etag("process-logs", fingerprint, log_version)
+    not_modified = check_etag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
+    def compute():
         node = orm.load_node(id)
         report = get_workchain_report(node, "REPORT")
-        logs = report.splitlines()
+        return report.splitlines()
+
+    try:
+        logs = sealed_cache.get_or_compute(("logs", uuid), mtime, bool(sealed), compute)
         return logs
     except KeyError as e:
         error_traceback = traceback.format_exc()  # Capture the full traceback
         print(error_traceback)
         raise HTTPException(status_code=404, detail=f"Workgraph {id} not found, {e}")
+
+
+LOG_STREAM_INTERVAL = 1  # seconds between polls of the log table while streaming
+
+
+def validate_levelname(levelname: str) -> str:
+    from aiida.common.log import LOG_LEVELS
+
+    if levelname.upper() not in LOG_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown log level {levelname}")
+    return levelname.upper()
+
+
+@router.get("/api/process-logs/{id}/records")
+@offload("process")
+def read_log_records(
+    id: int,
+    after: int = Query(0, ge=0),
+    levelname: str = "REPORT",
+    text: Optional[str] = None,
+    subtree: bool = True,
+    limit: int = Query(1000, gt=0, le=10000),
+):
+    """
+    Return the log records of the process (and of the workflows it called
+    with `subtree`) with an id above the cursor `after`. Pass the returned
+    `cursor` as `after` to only fetch newer records.
+    """
+    levelname = validate_levelname(levelname)
+    if not get_node_fingerprint(id):
+        raise HTTPException(status_code=404, detail=f"Process {id} not found")
+    records = get_log_records(id, after, levelname, text, subtree, limit)
+    return {
+        "records": records,
+        "cursor": records[-1]["id"] if records else after,
+        "has_more": len(records) == limit,
+    }
+
+
+@router.get("/api/process-logs/{id}/range")
+@offload("process")
+def read_log_range(
+    id: int,
+    start: int = 0,
+    stop: Optional[int] = None,
+    levelname: str = "REPORT",
+    text: Optional[str] = None,
+    subtree: bool = True,
+):
+    """
+    Return the log records with index `start` to `stop` (exclusive) of the
+    process report and the total number of records, so a viewer only
+    fetches the lines in view. Negative indices count from the end, e.g.
+    `start=-200` returns the last 200 records. At most 10000 records are
+    returned, 200 if `stop` is omitted.
+    """
+    levelname = validate_levelname(levelname)
+    if not get_node_fingerprint(id):
+        raise HTTPException(status_code=404, detail=f"Process {id} not found")
+    if stop is None and start >= 0:
+        stop = start + 200
+    return get_log_range(id, start, stop, levelname, text, subtree)
+
+
+@router.get("/api/process-logs/{id}/stream")
+async def stream_log_records(
+    id: int,
+    request: Request,
+    after: int = Query(0, ge=0),
+    levelname: str = "REPORT",
+    text: Optional[str] = None,
+    subtree: bool = True,
+    format: str = "sse",
+):
+    """
+    Stream the log records of the process as they are written, as
+    server-sent events (`format=sse`, one `log` event per batch with the
+    last record id as event id) or as one JSON record per line
+    (`format=ndjson`). The stream ends once the process is sealed and all
+    its records were sent. A reconnecting event source resumes after its
+    `Last-Event-ID`.
+    """
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail=f"Unknown format {format}")
+    levelname = validate_levelname(levelname)
+    if not await run_in_executor("process", get_node_fingerprint, id):
+        raise HTTPException(status_code=404, detail=f"Process {id} not found")
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+
+    async def stream():
+        cursor = after
+        sealed = False
+        while not await request.is_disconnected():
+            records = await run_in_executor(
+                "process", get_log_records, id, cursor, levelname, text, subtree
+            )
+            if records:
+                cursor = records[-1]["id"]
+                records = jsonable_encoder(records)
+                if format == "sse":
+                    yield f"id: {cursor}\nevent: log\ndata: {json.dumps(records)}\n\n"
+                else:
+                    yield "".join(json.dumps(record) + "\n" for record in records)
+                continue
+            if sealed:
+                if format == "sse":
+                    yield "event: end\ndata: {}\n\n"
+                return
+            fingerprint = await run_in_executor("process", get_node_fingerprint, id)
+            if not fingerprint or fingerprint[2]:
+                # sealed: no record can be added anymore, but the last ones
+                # may have been written since the query above
+                sealed = True
+                continue
+            if format == "sse":
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(LOG_STREAM_INTERVAL)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,226 @@
+"""Browse and download the files in the repository of a node.
+
+Directories are listed one level at a time from the repository metadata.
+Files are streamed in chunks, honoring `Range` requests, optionally
+gzip-compressed on the fly, and the last lines of large outputs can be read
+by seeking from the end, so multi-gigabyte files are never read whole.
+"""
+from __future__ import annotations
+
+import contextlib
+import mimetypes
+import zlib
+from pathlib import PurePosixPath
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from aiida import orm
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
+from aiida_gui.app.executor import offload
+
+router = APIRouter()
+
+REPOSITORY_CHUNK_SIZE = 64 * 1024
+REPOSITORY_LIST_LIMIT = 500
+MAX_TAIL_LINES = 10000
+
+
+def load_repository_node(id: int) -> orm.Node:
+    from aiida.common.exceptions import NotExistent
+
+    try:
+        return orm.load_node(id)
+    except NotExistent:
+        raise HTTPException(status_code=404, detail=f"Node {id} not found")
+
+
+def get_file_size(handle: BinaryIO) -> int:
+    """Return the size of an open repository file by seeking to its end, which
+    reads nothing, also for objects packed by the object store."""
+    position = handle.tell()
+    size = handle.seek(0, 2)
+    handle.seek(position)
+    return size
+
+
+def parse_range(header: str, size: int) -> Tuple[int, int]:
+    """Return the byte range [start, stop) of a `Range: bytes=a-b` header.
+    Only single ranges are supported."""
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec or "-" not in spec:
+        raise HTTPException(status_code=416, detail=f"Unsupported range {header}")
+    first, _, last = (part.strip() for part in spec.partition("-"))
+    try:
+        if first:
+            start = int(first)
+            stop = min(int(last) + 1, size) if last else size
+        else:
+            # `bytes=-n`: the last n bytes
+            start, stop = max(size - int(last), 0), size
+    except ValueError:
+        raise HTTPException(status_code=416, detail=f"Invalid range {header}")
+    if start >= size or start >= stop:
+        raise HTTPException(
+            status_code=416,
+            detail=f"Range {header} not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, stop
+
+
+def iter_chunks(
+    handle: BinaryIO, stack: contextlib.ExitStack, start: int, stop: int
+) -> Iterator[bytes]:
+    """Yield the bytes [start, stop) of `handle`, then close `stack`."""
+    with stack:
+        handle.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = handle.read(min(REPOSITORY_CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+
+def iter_gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def read_tail(handle: BinaryIO, size: int, lines: int) -> bytes:
+    """Return the last `lines` lines of `handle`, reading blocks backwards
+    from the end."""
+    end = size
+    # a trailing newline terminates the last line, it does not start one
+    needed = lines + 1
+    blocks: List[bytes] = []
+    count = 0
+    while end > 0 and count < needed:
+        start = max(end - REPOSITORY_CHUNK_SIZE, 0)
+        handle.seek(start)
+        block = handle.read(end - start)
+        blocks.append(block)
+        count += block.count(b"\n")
+        end = start
+    data = b"".join(reversed(blocks))
+    trailing = data.endswith(b"\n")
+    last = (data[:-1] if trailing else data).split(b"\n")[-lines:]
+    return b"\n".join(last) + (b"\n" if trailing else b"")
+
+
+@router.get("/api/node/{id}/repository")
+@offload("repository")
+def read_repository_listing(
+    id: int,
+    path: str = "",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(REPOSITORY_LIST_LIMIT, ge=1, le=10000),
+) -> Dict[str, Any]:
+    """
+    List the directory `path` in the repository of a node: directories
+    first, then files, each by name, with the size of the files on the page.
+    """
+    from aiida.repository import FileType
+
+    node = load_repository_node(id)
+    try:
+        objects = node.base.repository.list_objects(path or None)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"{path} not found in node {id}")
+    except NotADirectoryError:
+        raise HTTPException(status_code=400, detail=f"{path} is not a directory")
+    objects.sort(key=lambda obj: (obj.file_type != FileType.DIRECTORY, obj.name))
+    page = objects[skip : skip + limit]
+    sizes = {}
+    for obj in page:
+        if obj.file_type == FileType.FILE:
+            with node.base.repository.open(
+                str(PurePosixPath(path) / obj.name), mode="rb"
+            ) as handle:
+                sizes[obj.name] = get_file_size(handle)
+    return {
+        "path": path,
+        "total": len(objects),
+        "skip": skip,
+        "entries": [
+            {
+                "name": obj.name,
+                "type": "directory" if obj.file_type == FileType.DIRECTORY else "file",
+                "size": sizes.get(obj.name),
+            }
+            for obj in page
+        ],
+    }
+
+
+@router.get("/api/node/{id}/repository/file")
+@offload("repository")
+def read_repository_file(
+    id: int,
+    path: str,
+    tail: Optional[int] = Query(None, ge=1, le=MAX_TAIL_LINES),
+    compress: Optional[str] = None,
+    range_header: Optional[str] = Header(None, alias="Range"),
+):
+    """
+    Stream the file `path` in the repository of a node. A `Range` header
+    selects a byte range (206 Partial Content), `compress=gzip` compresses
+    the whole file on the fly and `tail=n` returns only its last n lines.
+    """
+    if compress not in (None, "gzip"):
+        raise HTTPException(status_code=400, detail=f"Unknown compression {compress}")
+    if compress and range_header:
+        raise HTTPException(
+            status_code=400, detail="Ranges of compressed content are not supported"
+        )
+    node = load_repository_node(id)
+    try:
+        obj = node.base.repository.get_object(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"{path} not found in node {id}")
+    if obj.key is None:
+        raise HTTPException(status_code=400, detail=f"{path} is a directory")
+
+    # open the file while the storage session of this thread is still open,
+    # the response is streamed after the route returned
+    stack = contextlib.ExitStack()
+    handle = stack.enter_context(node.base.repository.open(path, mode="rb"))
+    try:
+        size = get_file_size(handle)
+        headers = {"Accept-Ranges": "bytes", "X-File-Size": str(size)}
+        if tail is not None:
+            with stack:
+                content = read_tail(handle, size, tail)
+            return Response(
+                content=content, media_type="text/plain; charset=utf-8", headers=headers
+            )
+
+        media_type = mimetypes.guess_type(obj.name)[0] or "application/octet-stream"
+        headers["Content-Disposition"] = f'inline; filename="{obj.name}"'
+        if range_header:
+            start, stop = parse_range(range_header, size)
+            headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+            headers["Content-Length"] = str(stop - start)
+            return StreamingResponse(
+                iter_chunks(handle, stack, start, stop),
+                status_code=206,
+                media_type=media_type,
+                headers=headers,
+            )
+        chunks = iter_chunks(handle, stack, 0, size)
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+            return StreamingResponse(
+                iter_gzip(chunks), media_type=media_type, headers=headers
+            )
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(chunks, media_type=media_type, headers=headers)
+    except BaseException:
+        stack.close()
+        raise
@@ -0,0 +1,310 @@
+"""Progress rollup of the whole subtree of processes called by a workflow.
+
+The rollup counts all descendants of a workflow by process state, with the
+earliest ctime and the latest mtime among them. It is built with one
+recursive query and then kept up to date incrementally: a poll first
+compares the (max id, max mtime) fingerprint of the node table, and only
+when that moved looks at the process nodes modified since the previous
+poll. Terminated descendants are only counted; the others are tracked one
+by one, since their state still changes. Descendants that are deleted are
+only noticed by the full rebuild, which is repeated every
+`ROLLUP_REFRESH_INTERVAL` seconds.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiida_gui.app.utils import (
+    CALL_LINK_TYPES,
+    TRAVERSAL_CHUNK_SIZE,
+    execute_sql,
+    get_descendants,
+    get_storage_session,
+    get_table_fingerprint,
+    supports_raw_sql,
+)
+
+ROLLUP_CACHE_SIZE = int(os.getenv("AIIDA_GUI_ROLLUP_CACHE_SIZE", "32"))
+ROLLUP_REFRESH_INTERVAL = float(os.getenv("AIIDA_GUI_ROLLUP_REFRESH_INTERVAL", "300"))
+# nodes modified this long before the previous poll are looked at again,
+# for clocks of daemon workers that are slightly behind
+ROLLUP_MTIME_MARGIN = timedelta(seconds=5)
+
+TERMINATED_STATES = ("finished", "excepted", "killed")
+
+
+def _state_sql() -> str:
+    if get_storage_session().get_bind().dialect.name == "postgresql":
+        return "node.attributes->>'process_state'"
+    return "json_extract(node.attributes, '$.process_state')"
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    """Return a raw SQL timestamp as an aware datetime; SQLite returns
+    naive UTC strings."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _earliest(*values: Optional[datetime]) -> Optional[datetime]:
+    return min((value for value in values if value is not None), default=None)
+
+
+def _latest(*values: Optional[datetime]) -> Optional[datetime]:
+    return max((value for value in values if value is not None), default=None)
+
+
+def get_descendants_of(pk: int, pks: List[int]) -> Set[int]:
+    """Return those of `pks` that are called, directly or not, by `pk`,
+    walking up the call links from them."""
+    if not supports_raw_sql():
+        return _get_descendants_of_qb(pk, pks)
+    found: Set[int] = set()
+    for start in range(0, len(pks), TRAVERSAL_CHUNK_SIZE):
+        found.update(
+            row[0]
+            for row in execute_sql(
+                """
+                WITH RECURSIVE ancestors(start, id) AS (
+                    SELECT id, id FROM db_dbnode WHERE id IN :pks
+                    UNION
+                    SELECT ancestors.start, link.input_id
+                    FROM db_dblink AS link
+                    JOIN ancestors ON link.output_id = ancestors.id
+                    WHERE link.type IN :link_types
+                )
+                SELECT DISTINCT start FROM ancestors
+                WHERE id = :pk AND start != :pk
+                """,
+                pks=pks[start : start + TRAVERSAL_CHUNK_SIZE],
+                pk=pk,
+                link_types=list(CALL_LINK_TYPES),
+            )
+        )
+    return found
+
+
+def _get_descendants_of_qb(pk: int, pks: List[int]) -> Set[int]:
+    """`get_descendants_of` with the QueryBuilder, for storage backends
+    without SQL access; one query per level and chunk of callers."""
+    from aiida import orm
+
+    # the nodes reached so far and the given pks they were reached from
+    starts = {start: {start} for start in pks if start != pk}
+    found: Set[int] = set()
+    while starts:
+        callers: Dict[int, Set[int]] = {}
+        nodes = list(starts)
+        for start in range(0, len(nodes), TRAVERSAL_CHUNK_SIZE):
+            qb = orm.QueryBuilder()
+            qb.append(
+                orm.Node,
+                filters={"id": {"in": nodes[start : start + TRAVERSAL_CHUNK_SIZE]}},
+                project="id",
+                tag="called",
+            )
+            qb.append(
+                orm.Node,
+                with_outgoing="called",
+                edge_filters={"type": {"in": list(CALL_LINK_TYPES)}},
+                project="id",
+            )
+            for called, caller in qb.iterall():
+                if caller == pk:
+                    found.update(starts[called])
+                else:
+                    callers.setdefault(caller, set()).update(starts[called])
+        starts = callers
+    return found
+
+
+class SubtreeRollup:
+    """The rollup of the descendants of one workflow, see the module."""
+
+    def __init__(self, pk: int):
+        self.pk = pk
+        self.lock = threading.Lock()
+        self.refreshed = 0.0
+
+    def rebuild(self) -> None:
+        """Count the descendants by state, with one recursive query where the
+        storage allows it."""
+        from aiida import orm
+
+        fingerprint = get_table_fingerprint(orm.Node)
+        if not supports_raw_sql():
+            rows = self._rebuild_rows(fingerprint[0] if fingerprint else 0)
+        else:
+            rows = self._rebuild_query()
+        self.terminated: Counter = Counter()
+        self.live: Dict[int, Optional[str]] = {}
+        # terminated descendants found since the rebuild, counted already
+        self.added: Set[int] = set()
+        self.ctime: Optional[datetime] = None
+        self.mtime: Optional[datetime] = None
+        # the descendants counted here are those up to the max id seen by the
+        # same query; one created after the fingerprint was read is not new
+        self.max_id = fingerprint[0] if fingerprint else 0
+        for state, live_id, count, ctime, mtime, max_id in rows:
+            self.max_id = max(self.max_id or 0, max_id)
+            if live_id is None:
+                self.terminated[state] += count
+            else:
+                self.live[live_id] = state
+            self.ctime = _earliest(self.ctime, _to_datetime(ctime))
+            self.mtime = _latest(self.mtime, _to_datetime(mtime))
+        self.fingerprint = fingerprint
+        self.refreshed = time.monotonic()
+
+    def _rebuild_query(self) -> List[Tuple[Any, ...]]:
+        """Return (state, id unless terminated, count, min ctime, max mtime,
+        max id of the node table) of the descendants, grouped by the first two."""
+        return execute_sql(
+            f"""
+            WITH RECURSIVE descendants(id) AS (
+                SELECT output_id FROM db_dblink
+                WHERE input_id = :pk AND type IN :link_types
+                UNION
+                SELECT link.output_id FROM db_dblink AS link
+                JOIN descendants ON link.input_id = descendants.id
+                WHERE link.type IN :link_types
+            ),
+            states(id, state, ctime, mtime) AS (
+                SELECT node.id, {_state_sql()}, node.ctime, node.mtime
+                FROM db_dbnode AS node JOIN descendants ON node.id = descendants.id
+            )
+            SELECT state,
+                CASE WHEN state IN :terminated THEN NULL ELSE id END,
+                COUNT(*), MIN(ctime), MAX(mtime),
+                (SELECT MAX(id) FROM db_dbnode)
+            FROM states
+            GROUP BY state, CASE WHEN state IN :terminated THEN NULL ELSE id END
+            """,
+            pk=self.pk,
+            link_types=list(CALL_LINK_TYPES),
+            terminated=list(TERMINATED_STATES),
+        )
+
+    def _rebuild_rows(self, max_id: int) -> List[Tuple[Any, ...]]:
+        """The rows of `_rebuild_query` with the QueryBuilder, for storage
+        backends without SQL access. Only descendants up to `max_id` are
+        counted; those created meanwhile are left to `update`."""
+        from aiida import orm
+
+        pks = sorted(
+            {pk for pk, depth in get_descendants(self.pk) if depth and pk <= max_id}
+        )
+        groups: Dict[Tuple[Any, Any], List[Any]] = {}
+        for start in range(0, len(pks), TRAVERSAL_CHUNK_SIZE):
+            qb = orm.QueryBuilder()
+            qb.append(
+                orm.Node,
+                filters={"id": {"in": pks[start : start + TRAVERSAL_CHUNK_SIZE]}},
+                project=["id", "attributes.process_state", "ctime", "mtime"],
+            )
+            for pk, state, ctime, mtime in qb.iterall():
+                key = (state, None if state in TERMINATED_STATES else pk)
+                group = groups.setdefault(key, [0, None, None])
+                group[0] += 1
+                group[1] = _earliest(group[1], ctime)
+                group[2] = _latest(group[2], mtime)
+        return [(*key, *group, max_id) for key, group in groups.items()]
+
+    def update(self) -> None:
+        """Apply the changes since the previous update or rebuild."""
+        from aiida import orm
+
+        fingerprint = get_table_fingerprint(orm.Node)
+        if fingerprint == self.fingerprint:
+            return
+        if not self.fingerprint or self.fingerprint[1] is None:
+            self.rebuild()
+            return
+        qb = orm.QueryBuilder()
+        qb.append(
+            orm.ProcessNode,
+            filters={"mtime": {">=": self.fingerprint[1] - ROLLUP_MTIME_MARGIN}},
+            project=["id", "attributes.process_state", "ctime", "mtime"],
+        )
+        changed = {row[0]: row[1:] for row in qb.all()}
+        unknown = [pk for pk in changed if pk not in self.live and pk not in self.added]
+        descendants = get_descendants_of(self.pk, unknown) if unknown else set()
+        for pk, (state, ctime, mtime) in changed.items():
+            if pk in self.live:
+                self.live[pk] = state
+            elif pk in descendants:
+                if pk > self.max_id:
+                    # a descendant created after the rebuild
+                    self.live[pk] = state
+                # otherwise a terminated descendant the rebuild counted
+            elif pk not in self.added:
+                continue
+            if pk in self.live and state in TERMINATED_STATES:
+                del self.live[pk]
+                self.terminated[state] += 1
+                self.added.add(pk)
+            self.ctime = _earliest(self.ctime, ctime)
+            self.mtime = _latest(self.mtime, mtime)
+        self.fingerprint = fingerprint
+
+    def to_dict(self) -> Dict[str, Any]:
+        states = Counter(self.terminated)
+        states.update(self.live.values())
+        return {
+            "pk": self.pk,
+            "total": sum(states.values()),
+            "states": {
+                (state or "unknown"): count
+                for state, count in sorted(states.items(), key=lambda x: str(x[0]))
+                if count
+            },
+            "active": len(self.live),
+            "ctime": self.ctime,
+            "mtime": self.mtime,
+        }
+
+
+class RollupCache:
+    """The rollups of the recently polled workflows."""
+
+    def __init__(
+        self,
+        maxsize: int = ROLLUP_CACHE_SIZE,
+        refresh_interval: float = ROLLUP_REFRESH_INTERVAL,
+    ):
+        self.maxsize = maxsize
+        self.refresh_interval = refresh_interval
+        self._rollups: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, pk: int) -> Dict[str, Any]:
+        """Return the up-to-date rollup of workflow `pk`."""
+        with self._lock:
+            rollup = self._rollups.get(pk)
+            if rollup is None:
+                rollup = self._rollups[pk] = SubtreeRollup(pk)
+            self._rollups.move_to_end(pk)
+            while len(self._rollups) > self.maxsize:
+                self._rollups.popitem(last=False)
+        # concurrent pollers of the same workflow wait for one update
+        with rollup.lock:
+            if time.monotonic() - rollup.refreshed > self.refresh_interval:
+                rollup.rebuild()
+            else:
+                rollup.update()
+            return rollup.to_dict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rollups.clear()
+
+
+rollup_cache = RollupCache()
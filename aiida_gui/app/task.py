@@ -1,15 +1,16 @@
-from .utils import get_node_summary_table, get_node_inputs, get_node_outputs
+from .utils import SUMMARY_LINK_LIMIT, get_node_summary
 from aiida import orm
 from fastapi import APIRouter, HTTPException
 import traceback
-from typing import List
-from aiida.engine.processes import control
+from typing import List, Optional, Tuple, Union
+from aiida_gui.app.executor import offload
 
 router = APIRouter()
 
 
 @router.get("/api/task/{id}/{path:path}")
-async def read_task(id: int, path: str):
+@offload("task")
+def read_task(id: int, path: str):
     from aiida.orm import load_node
 
     try:
@@ -32,12 +33,14 @@ async def read_task(id: int, path: str):
             #     executor = f"{task_node.process_class.__module__}.{task_node.process_class.__name__}"
             executor = f"{task_node.process_class.__module__}.{task_node.process_class.__name__}"
 
+            summary = get_node_summary(task_node, link_limit=SUMMARY_LINK_LIMIT)
             content = {
                 "node_type": task_node.node_type,
                 "label": segments[0].split("_")[0],
-                "metadata": get_node_summary_table(task_node),
-                "inputs": get_node_inputs(task_node),
-                "outputs": get_node_outputs(task_node),
+                "metadata": summary["table"],
+                "inputs": summary["inputs"],
+                "outputs": summary["outputs"],
+                "truncated": summary["truncated"],
                 "executor": executor,
                 "process": {"pk": pk},
             }
@@ -52,75 +55,83 @@ async def read_task(id: int, path: str):
         )
 
 
+def parse_task(task: Union[dict, str]) -> Tuple[str, Optional[int]]:
+    """Return the name and process pk of a task, given as `{"name", "pk"}`
+    or as `"name-pk"`. The pk is None if the task has no process yet."""
+    if isinstance(task, dict):
+        pk = task.get("pk")
+        return str(task.get("name")), None if pk is None else int(pk)
+    name, _, pk = task.rpartition("-")
+    return (name, int(pk)) if pk.isdigit() else (task, None)
+
+
 # General function to manage task actions
-async def manage_task_action(action: str, id: int, tasks: List[str]):
+def manage_task_action(action: str, id: int, tasks: List[Union[dict, str]]):
+    """
+    Send `action` to the processes of `tasks` of workchain `id` at once and
+    return the id of the job that collects the outcome per task, see
+    /api/jobs. Processes that are not part of the workchain are rejected.
+    """
+    from aiida.common.exceptions import NotExistent
+
+    from aiida_gui.app.jobs import dispatch_process_action
+    from aiida_gui.app.utils import get_descendants
 
-    node = orm.load_node(id)
-    if node.is_finished:
-        msg = "Process is finished. Cannot pause tasks."
+    try:
+        node = orm.load_node(id)
+    except NotExistent:
+        raise HTTPException(status_code=404, detail=f"Process {id} not found")
+    if not isinstance(node, orm.WorkChainNode):
+        raise HTTPException(status_code=400, detail=f"Node {id} is not a workchain")
+    if node.is_terminated:
+        msg = f"Process is terminated. Cannot {action} tasks."
         raise HTTPException(status_code=400, detail=msg)
-    if isinstance(node, orm.WorkChainNode):
-        print(f"Performing {action} action on tasks {tasks} in workchain {id}")
-        pks = [task.split("-")[-1] for task in tasks]
-        try:
-            if action == "pause":
-                print(f"Pausing tasks {tasks}")
-                try:
-                    control.pause_processes(
-                        pks,
-                        all_entries=None,
-                        timeout=5,
-                        wait=False,
-                    )
-                    msg = "Paused tasks"
-                except Exception as e:
-                    print(f"Pause processes: {pks} failed: {e}")
-            elif action == "play":
-                print(f"Playing tasks {tasks}")
-                try:
-                    control.pause_processes(
-                        pks,
-                        all_entries=None,
-                        timeout=5,
-                        wait=False,
-                    )
-                    msg = "Played tasks"
-                except Exception as e:
-                    print(f"Play processes: {pks} failed: {e}")
-            elif action == "kill":
-                print(f"Killing tasks {tasks}")
-                try:
-                    control.pause_processes(
-                        pks,
-                        all_entries=None,
-                        timeout=5,
-                        wait=False,
-                    )
-                    msg = "Killed tasks"
-                except Exception as e:
-                    print(f"Kill processes: {pks} failed: {e}")
-            else:
-                raise HTTPException(status_code=400, detail="Unsupported action")
-
-            return {"message": msg}
-
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        parsed = [parse_task(task) for task in tasks or []]
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid task: {e}")
+    processes = {name: pk for name, pk in parsed if pk is not None}
+    not_started = [name for name, pk in parsed if pk is None]
+    descendants = {pk for pk, _ in get_descendants(id)}
+    rejected = {
+        pk: f"Not a task of process {id}"
+        for pk in processes.values()
+        if pk not in descendants
+    }
+    try:
+        job = dispatch_process_action(
+            action, list(processes.values()), rejected=rejected
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=503, detail=f"Could not reach the processes: {e}"
+        )
+    return {
+        "job_id": job.id,
+        "total": len(job.results),
+        "tasks": processes,
+        "not_started": not_started,
+        "message": f"Sent {action} to {len(processes) - len(rejected)} tasks",
+    }
 
 
 # Endpoint for pausing tasks in a process
-@router.post("/api/process/tasks/pause/{id}")
-async def pause_process_tasks(id: int, tasks: List[dict] = None):
-    return await manage_task_action("pause", id, tasks)
+@router.post("/api/process/tasks/pause/{id}", status_code=202)
+@offload("task")
+def pause_process_tasks(id: int, tasks: List[Union[dict, str]] = None):
+    return manage_task_action("pause", id, tasks)
 
 
 # Endpoint for playing tasks in a process
-@router.post("/api/process/tasks/play/{id}")
-async def play_process_tasks(id: int, tasks: List[dict] = None):
-    return await manage_task_action("play", id, tasks)
+@router.post("/api/process/tasks/play/{id}", status_code=202)
+@offload("task")
+def play_process_tasks(id: int, tasks: List[Union[dict, str]] = None):
+    return manage_task_action("play", id, tasks)
 
 
 # Endpoint for killing tasks in a process
-@router.post("/api/process/tasks/kill/{id}")
-async def kill_workgraph_tasks(id: int, tasks: List[dict] = None):
-    return await manage_task_action("kill", id, tasks)
+@router.post("/api/process/tasks/kill/{id}", status_code=202)
+@offload("task")
+def kill_workgraph_tasks(id: int, tasks: List[Union[dict, str]] = None):
+    return manage_task_action("kill", id, tasks)
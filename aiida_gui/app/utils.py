@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from typing import Dict, Optional, Union, Tuple, List, Any
 from aiida.orm import load_node, Node
 from datetime import datetime
@@ -25,93 +26,430 @@ def get_executor_source(tdata: Any) -> Tuple[bool, Optional[str]]:
         return str(executor)
 
 
-def get_node_recursive(links: Dict) -> Dict[str, Union[List[int], str]]:
-    """Recursively get a dictionary of nodess."""
-    from collections.abc import Mapping
+INPUT_LINK_TYPES = ("input_calc", "input_work")
+OUTPUT_LINK_TYPES = ("create", "return")
+CALL_LINK_TYPES = ("call_calc", "call_work")
 
+
+def get_node_links(
+    pk: int,
+    incoming: Tuple[str, ...] = (),
+    outgoing: Tuple[str, ...] = (),
+    label_prefix: str = "",
+) -> List[Tuple[str, str, str, int, str, int]]:
+    """
+    Return (direction, link type, label, pk, node type, link id) of the
+    `incoming` and `outgoing` links of the given types of node `pk`, in
+    creation order, with one query and without loading the linked nodes.
+    Direction is "incoming" or "outgoing". With `label_prefix`, only the
+    links whose label starts with it are returned.
+    """
+    if not supports_raw_sql():
+        return _get_node_links_qb(pk, incoming, outgoing, label_prefix)
+    label_filter = ""
+    params = {}
+    if label_prefix:
+        label_filter = "AND link.label LIKE :prefix ESCAPE '!'"
+        escaped = "".join(f"!{c}" if c in "!%_" else c for c in label_prefix)
+        params["prefix"] = f"{escaped}%"
+    return execute_sql(
+        f"""
+        SELECT 'incoming', link.type, link.label, node.id, node.node_type, link.id
+        FROM db_dblink AS link JOIN db_dbnode AS node ON node.id = link.input_id
+        WHERE link.output_id = :pk AND link.type IN :incoming {label_filter}
+        UNION ALL
+        SELECT 'outgoing', link.type, link.label, node.id, node.node_type, link.id
+        FROM db_dblink AS link JOIN db_dbnode AS node ON node.id = link.output_id
+        WHERE link.input_id = :pk AND link.type IN :outgoing {label_filter}
+        ORDER BY 6
+        """,
+        pk=pk,
+        incoming=list(incoming),
+        outgoing=list(outgoing),
+        **params,
+    )
+
+
+def _get_node_links_qb(
+    pk: int,
+    incoming: Tuple[str, ...],
+    outgoing: Tuple[str, ...],
+    label_prefix: str,
+) -> List[Tuple[str, str, str, int, str, int]]:
+    """`get_node_links` with the QueryBuilder, for storage backends without
+    SQL access; one query per direction."""
+    from aiida import orm
+
+    links = []
+    for direction, link_types, relation in (
+        ("incoming", incoming, "with_outgoing"),
+        ("outgoing", outgoing, "with_incoming"),
+    ):
+        if not link_types:
+            continue
+        qb = orm.QueryBuilder()
+        qb.append(orm.Node, filters={"id": pk}, tag="node")
+        qb.append(
+            orm.Node,
+            tag="linked",
+            edge_tag="link",
+            edge_filters={"type": {"in": list(link_types)}},
+            project=["id", "node_type"],
+            edge_project=["type", "label", "id"],
+            **{relation: "node"},
+        )
+        links.extend(
+            (
+                direction,
+                row["link"]["type"],
+                row["link"]["label"],
+                row["linked"]["id"],
+                row["linked"]["node_type"],
+                row["link"]["id"],
+            )
+            for row in qb.dict()
+            if row["link"]["label"].startswith(label_prefix)
+        )
+    return sorted(links, key=lambda link: link[5])
+
+
+def node_class_name(node_type: str) -> str:
+    """Return the class name encoded in a node type, e.g. `Int` for `data.core.int.Int.`."""
+    return node_type.rstrip(".").split(".")[-1] if node_type else "Node"
+
+
+def nest_links(links: List[Tuple[Any, ...]]) -> Dict[str, Any]:
+    """Group link rows of `get_node_links` by the namespaces of their labels
+    (separated by double underscores) into a dictionary of nodes."""
     data = {}
-    for label, value in links.items():
-        if isinstance(value, Mapping):
-            data.update({label: get_node_recursive(value)})
+    for _, _, label, pk, node_type, *_ in links:
+        *namespaces, name = label.split("__")
+        namespace = data
+        for key in namespaces:
+            namespace = namespace.setdefault(key, {})
+            if not isinstance(namespace, dict):
+                break
         else:
-            data[label] = [value.pk, value.__class__.__name__, value.node_type]
+            namespace[name] = [pk, node_class_name(node_type), node_type]
     return data
 
 
-def get_node_inputs(pk: int | Node) -> Union[str, Dict[str, Union[List[int], str]]]:
-    from aiida.common.links import LinkType
+def flat_links(links: List[Tuple[Any, ...]]) -> Dict[str, Any]:
+    """Return the link rows of `get_node_links` as a dictionary of nodes by label."""
+    return {
+        label: [pk, node_class_name(node_type), node_type]
+        for _, _, label, pk, node_type, *_ in links
+    }
+
 
+# link sections of a summary with more links are loaded page by page
+SUMMARY_LINK_LIMIT = int(os.getenv("AIIDA_GUI_SUMMARY_LINK_LIMIT", "100"))
+# link listing kind → (direction, link types, whether labels are namespaced)
+LINK_KINDS = {
+    "inputs": ("incoming", INPUT_LINK_TYPES, True),
+    "outputs": ("outgoing", OUTPUT_LINK_TYPES, True),
+    "called": ("outgoing", CALL_LINK_TYPES, False),
+    "caller": ("incoming", CALL_LINK_TYPES, False),
+}
+
+
+def page_links(
+    links: List[Tuple[Any, ...]],
+    namespace: str = "",
+    nested: bool = True,
+    skip: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Return one page of the entries directly in the port `namespace` (dotted,
+    e.g. `a.b`) of the link rows of `get_node_links`, and the total number
+    of entries. Sub-namespaces are not expanded but returned as
+    `{"__namespace__": path, "__count__": number of links}`.
+    """
+    prefix = namespace.replace(".", "__") + "__" if namespace else ""
+    entries = {}
+    for _, _, label, pk, node_type, *_ in links:
+        if not label.startswith(prefix):
+            continue
+        name, separator, _ = label[len(prefix) :].partition("__")
+        if nested and separator:
+            marker = entries.get(name)
+            if not isinstance(marker, dict):
+                path = f"{namespace}.{name}" if namespace else name
+                marker = entries[name] = {"__namespace__": path, "__count__": 0}
+            marker["__count__"] += 1
+        else:
+            entries[label[len(prefix) :]] = [pk, node_class_name(node_type), node_type]
+    names = list(entries)[skip : None if limit is None else skip + limit]
+    return {name: entries[name] for name in names}, len(entries)
+
+
+def get_link_namespace(
+    pk: int, kind: str, namespace: str = "", skip: int = 0, limit: int = 100
+) -> Dict[str, Any]:
+    """
+    Return one page of the `kind` links (see `LINK_KINDS`) of node `pk` in
+    the port `namespace`, querying only the links below that namespace.
+    """
+    direction, link_types, nested = LINK_KINDS[kind]
+    label_prefix = namespace.replace(".", "__") + "__" if namespace else ""
+    links = get_node_links(pk, **{direction: link_types}, label_prefix=label_prefix)
+    items, total = page_links(links, namespace, nested, skip, limit)
+    return {
+        "kind": kind,
+        "namespace": namespace,
+        "skip": skip,
+        "limit": limit,
+        "total": total,
+        "links": items,
+    }
+
+
+def get_node_inputs(pk: int | Node) -> Union[str, Dict[str, Union[List[int], str]]]:
     if pk is None:
         return {}
 
-    node = load_node(pk) if isinstance(pk, int) else pk
-    nodes_input = node.base.links.get_incoming(
-        link_type=(LinkType.INPUT_CALC, LinkType.INPUT_WORK)
-    )
-    if nodes_input:
-        result = get_node_recursive(nodes_input.nested())
-    else:
-        result = {}
-
-    return result
+    pk = pk if isinstance(pk, int) else pk.pk
+    return nest_links(get_node_links(pk, incoming=INPUT_LINK_TYPES))
 
 
 def get_nodes_called(pk: int | Node) -> Union[str, Dict[str, Union[List[int], str]]]:
+    pk = pk if isinstance(pk, int) else pk.pk
+    return flat_links(get_node_links(pk, outgoing=CALL_LINK_TYPES))
+
+
+def get_nodes_caller(pk: int | Node) -> Union[str, Dict[str, Union[List[int], str]]]:
+    pk = pk if isinstance(pk, int) else pk.pk
+    return flat_links(get_node_links(pk, incoming=CALL_LINK_TYPES))
+
+
+def get_node_outputs(pk: int | Node) -> Union[str, Dict[str, Union[List[int], str]]]:
+    if pk is None:
+        return ""
+
+    pk = pk if isinstance(pk, int) else pk.pk
+    return nest_links(get_node_links(pk, outgoing=OUTPUT_LINK_TYPES))
+
+
+def process_graph_node(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the graph node of a called process row of `get_called_processes`."""
+    return {
+        "label": f"{row['link_label']}-{row['pk']}",
+        "node_type": row["node_type"],
+        "pk": row["pk"],
+        "processPk": row["pk"],
+        "inputs": [],
+        "properties": [],
+        "outputs": [],
+        "position": [0, 0],
+        "children": [],
+    }
+
+
+def collapsed_graph_node(parent: int, skip: int, hidden: int) -> Dict[str, Any]:
+    """
+    Return the graph node standing in for the `hidden` processes called by
+    `parent` from position `skip` on. They are loaded with the expand endpoint.
+    """
+    return {
+        "label": f"{hidden} more-{parent}",
+        "node_type": "COLLAPSED",
+        "pk": None,
+        "processPk": None,
+        "inputs": [],
+        "properties": [],
+        "outputs": [],
+        "position": [0, 0],
+        "children": [],
+        "collapsed": True,
+        "child_count": hidden,
+        "expand": {"parent": parent, "skip": skip},
+    }
+
+
+def get_called_processes(
+    parent_pks: List[int], skip: int = 0, limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Return the processes called by the workflows `parent_pks`, ordered by pk,
+    as projected rows with the caller, link label, pk and node type.
+    """
+    from aiida import orm
     from aiida.common.links import LinkType
 
-    node = load_node(pk) if isinstance(pk, int) else pk
-    links_called = node.base.links.get_outgoing(
-        link_type=(LinkType.CALL_CALC, LinkType.CALL_WORK)
+    qb = orm.QueryBuilder()
+    qb.append(
+        orm.WorkflowNode,
+        filters={"id": {"in": list(parent_pks)}},
+        project="id",
+        tag="caller",
     )
-    nodes_called = {}
-    for link in links_called:
-        nodes_called[link.link_label] = [
-            link.node.pk,
-            link.node.__class__.__name__,
-            link.node.node_type,
-        ]
-    return nodes_called
+    qb.append(
+        orm.ProcessNode,
+        with_incoming="caller",
+        edge_filters={
+            "type": {"in": [LinkType.CALL_CALC.value, LinkType.CALL_WORK.value]}
+        },
+        edge_project="label",
+        edge_tag="call",
+        project=["id", "node_type"],
+        tag="child",
+    )
+    qb.order_by({"child": {"id": "asc"}})
+    if skip:
+        qb.offset(skip)
+    if limit is not None:
+        qb.limit(limit)
+    return [
+        {
+            "caller": row["caller"]["id"],
+            "link_label": row["call"]["label"],
+            "pk": row["child"]["id"],
+            "node_type": row["child"]["node_type"],
+        }
+        for row in qb.dict()
+    ]
 
 
-def get_nodes_caller(pk: int | Node) -> Union[str, Dict[str, Union[List[int], str]]]:
-    from aiida.common.links import LinkType
+def count_called_processes(pks: List[int]) -> Dict[int, int]:
+    """Return the number of processes called by each of the workflows `pks`."""
+    if not pks:
+        return {}
+    if not supports_raw_sql():
+        from collections import Counter
 
-    node = load_node(pk) if isinstance(pk, int) else pk
-    links_caller = node.base.links.get_incoming(
-        link_type=(LinkType.CALL_CALC, LinkType.CALL_WORK)
+        from aiida import orm
+
+        qb = orm.QueryBuilder()
+        qb.append(
+            orm.Node, filters={"id": {"in": list(pks)}}, project="id", tag="caller"
+        )
+        qb.append(
+            orm.ProcessNode,
+            with_incoming="caller",
+            edge_filters={"type": {"in": list(CALL_LINK_TYPES)}},
+        )
+        return dict(Counter(pk for (pk,) in qb.iterall()))
+    rows = execute_sql(
+        "SELECT input_id, COUNT(*) FROM db_dblink "
+        "WHERE input_id IN :pks AND type IN ('call_calc', 'call_work') "
+        "GROUP BY input_id",
+        pks=pks,
     )
-    nodes_caller = {}
-    for link in links_caller:
-        nodes_caller[link.link_label] = [
-            link.node.pk,
-            link.node.__class__.__name__,
-            link.node.node_type,
-        ]
-    return nodes_caller
+    return {pk: count for pk, count in rows}
 
 
-def get_node_outputs(pk: int | Node) -> Union[str, Dict[str, Union[List[int], str]]]:
+def get_process_links(
+    child_pks: Optional[List[int]] = None,
+    creator_pks: Optional[List[int]] = None,
+    caller: Optional[int] = None,
+) -> List[Tuple[int, str, int, str]]:
+    """
+    Return (creator, output label, child, input label) for every input of the
+    processes `child_pks` that was created or returned by a process, or for
+    every such output of the processes `creator_pks`, in one join query.
+    With `caller`, both processes must be called by that workflow.
+    """
+    from aiida import orm
     from aiida.common.links import LinkType
 
-    if pk is None:
-        return ""
-
-    node = load_node(pk) if isinstance(pk, int) else pk
-    result = ""
-    nodes_output = node.base.links.get_outgoing(
-        link_type=(LinkType.CREATE, LinkType.RETURN)
+    call_link_filters = {"type": {"in": list(CALL_LINK_TYPES)}}
+    qb = orm.QueryBuilder()
+    called = {}
+    if caller is not None:
+        qb.append(orm.WorkflowNode, filters={"id": caller}, tag="caller")
+        called = {"with_incoming": "caller", "edge_filters": call_link_filters}
+    qb.append(
+        orm.ProcessNode,
+        filters={"id": {"in": list(child_pks)}} if child_pks is not None else None,
+        project="id",
+        tag="child",
+        **called,
     )
-    if nodes_output.all():
-        result = get_node_recursive(nodes_output.nested())
-    else:
-        result = {}
+    qb.append(
+        orm.Data,
+        with_outgoing="child",
+        edge_filters={
+            "type": {"in": [LinkType.INPUT_CALC.value, LinkType.INPUT_WORK.value]}
+        },
+        edge_project="label",
+        edge_tag="input_link",
+        tag="input",
+    )
+    qb.append(
+        orm.ProcessNode,
+        with_outgoing="input",
+        filters=(
+            {"id": {"in": list(creator_pks)}} if creator_pks is not None else None
+        ),
+        edge_filters={"type": {"in": [LinkType.CREATE.value, LinkType.RETURN.value]}},
+        edge_project="label",
+        edge_tag="create_link",
+        project="id",
+        tag="creator",
+    )
+    if caller is not None:
+        qb.append(
+            orm.WorkflowNode,
+            filters={"id": caller},
+            with_outgoing="creator",
+            edge_filters=call_link_filters,
+        )
+    qb.order_by({"child": {"id": "asc"}})
+    return [
+        (
+            row["creator"]["id"],
+            row["create_link"]["label"],
+            row["child"]["id"],
+            row["input_link"]["label"],
+        )
+        for row in qb.dict()
+    ]
 
-    return result
 
+def add_graph_links(
+    graph_data: dict, links: List[Tuple[int, str, int, str]], partial: bool = False
+) -> None:
+    """
+    Add the `links` between nodes of the graph, with their sockets. With
+    `partial`, the graph is a part of one the client already shows, and the
+    links to nodes outside it are kept too.
+    """
+    nodes = graph_data["nodes"]
+    for from_node, from_socket, to_node, to_socket in links:
+        if not partial and (from_node not in nodes or to_node not in nodes):
+            continue
+        graph_data["links"].append(
+            {
+                "from_node": from_node,
+                "to_node": to_node,
+                "from_socket": from_socket,
+                "to_socket": to_socket,
+            }
+        )
+        if to_node in nodes:
+            inputs = nodes[to_node]["inputs"]
+            if not any(socket["name"] == to_socket for socket in inputs):
+                inputs.append({"name": to_socket, "identifier": "any"})
+        if from_node in nodes:
+            outputs = nodes[from_node]["outputs"]
+            if not any(socket["name"] == from_socket for socket in outputs):
+                outputs.append({"name": from_socket, "identifier": "any"})
 
-def get_workchain_data(node: Node) -> dict:
-    from aiida.common.links import LinkType
 
+def get_workchain_data(
+    node: Node, depth: int = 1, max_nodes: Optional[int] = None
+) -> dict:
+    """
+    Return the graph of the processes called by a workchain, with a link
+    wherever an output of one called process is an input of another.
+
+    Sub-workflows are expanded inline down to `depth` levels; the graph
+    holds at most `max_nodes` processes. Workflows carry the number of
+    processes they called as `child_count`, and the called processes that
+    did not fit are represented by one collapsed node per caller, which can
+    be expanded on demand. All queries are projections; no node is loaded.
+    """
     graph_data = {
         "name": node.process_label,
         "uuid": node.uuid,
@@ -119,74 +457,116 @@ def get_workchain_data(node: Node) -> dict:
         "nodes": {},
         "links": [],
     }
+    nodes = graph_data["nodes"]
+    budget = max_nodes
+    parents = [node.pk]
+    child_counts = count_called_processes(parents)
+    for _ in range(depth):
+        if not parents or budget == 0:
+            break
+        rows = get_called_processes(parents, limit=budget)
+        shown = {}
+        for row in rows:
+            nodes[row["pk"]] = process_graph_node(row)
+            if row["caller"] in nodes:
+                nodes[row["caller"]]["children"].append(row["pk"])
+            shown[row["caller"]] = shown.get(row["caller"], 0) + 1
+        if budget is not None:
+            budget -= len(rows)
+        for parent in parents:
+            hidden = child_counts.get(parent, 0) - shown.get(parent, 0)
+            if hidden > 0:
+                nodes[f"collapsed-{parent}"] = collapsed_graph_node(
+                    parent, shown.get(parent, 0), hidden
+                )
+        parents = [
+            row["pk"] for row in rows if row["node_type"].startswith("process.workflow")
+        ]
+        child_counts = count_called_processes(parents)
+        for pk, count in child_counts.items():
+            nodes[pk]["child_count"] = count
 
-    links_called = node.base.links.get_outgoing(
-        link_type=(LinkType.CALL_CALC, LinkType.CALL_WORK)
-    )
-    links_input = node.base.links.get_incoming(
-        link_type=(LinkType.INPUT_CALC, LinkType.INPUT_WORK)
+    add_graph_links(
+        graph_data, get_process_links([pk for pk in nodes if isinstance(pk, int)])
     )
-    nodes_called = []
-    for link in links_called:
-        graph_data["nodes"][link.node.pk] = {
-            "label": f"{link.link_label}-{link.node.pk}",
-            "node_type": link.node.node_type,
-            "pk": link.node.pk,
-            "processPk": link.node.pk,
-            "inputs": [],
-            "properties": [],
-            "outputs": [],
-            "position": [0, 0],
-            "children": [],
-        }
-        nodes_called.append(link.node)
-    for node in nodes_called:
-        links_input = node.base.links.get_incoming(
-            link_type=(LinkType.INPUT_CALC, LinkType.INPUT_WORK)
+    return graph_data
+
+
+def expand_workchain_node(parent: int, skip: int, limit: int) -> dict:
+    """
+    Return the graph nodes of the processes called by `parent` from position
+    `skip` on, and the links touching them, for a collapsed node of
+    `get_workchain_data`. The links may point to nodes the client does not
+    show, which it ignores.
+    """
+    rows = get_called_processes([parent], skip=skip, limit=limit)
+    graph_data = {"nodes": {}, "links": []}
+    nodes = graph_data["nodes"]
+    for row in rows:
+        nodes[row["pk"]] = process_graph_node(row)
+    pks = list(nodes)
+    for pk, count in count_called_processes(
+        [row["pk"] for row in rows if row["node_type"].startswith("process.workflow")]
+    ).items():
+        nodes[pk]["child_count"] = count
+    hidden = count_called_processes([parent]).get(parent, 0) - skip - len(rows)
+    if hidden > 0:
+        nodes[f"collapsed-{parent}"] = collapsed_graph_node(
+            parent, skip + len(rows), hidden
         )
-        for link in links_input:
-            input_node_links_create = link.node.base.links.get_incoming(
-                link_type=(LinkType.CREATE, LinkType.RETURN)
-            )
-            for link_create in input_node_links_create:
-                if link_create.node in nodes_called:
-                    graph_data["links"].append(
-                        {
-                            "from_node": link_create.node.pk,
-                            "to_node": node.pk,
-                            "from_socket": link_create.link_label,
-                            "to_socket": link.link_label,
-                        }
-                    )
-                    input = {"name": link.link_label, "identifier": "any"}
-                    output = {"name": link_create.link_label, "identifier": "any"}
-                    graph_data["nodes"][node.pk]["inputs"].append(input)
-                    graph_data["nodes"][link_create.node.pk]["outputs"].append(output)
 
+    # links between the siblings only, found from either end
+    links = get_process_links(child_pks=pks, caller=parent) + get_process_links(
+        creator_pks=pks, caller=parent
+    )
+    add_graph_links(graph_data, sorted(set(links)), partial=True)
     return graph_data
 
 
 def get_processes_latest(
-    pk: int, item_type: str = "called_process"
+    pk: int, item_type: str = "called_process", since: Optional[datetime] = None
 ) -> Dict[str, Dict[str, Union[int, str]]]:
-    """Get the latest info of all tasks from the process."""
-    import aiida
+    """Get the latest info of all tasks from the process.
+
+    With `since`, only the tasks modified at or after that time are returned.
+    """
+    from aiida import orm
+    from aiida.common.links import LinkType
 
     tasks = {}
     if pk is None:
         return tasks
-    node = aiida.orm.load_node(pk)
     if item_type == "called_process":
         # fetch the process that called by the workgraph
-        for link in node.base.links.get_outgoing().all():
-            if isinstance(link.node, aiida.orm.ProcessNode):
-                tasks[f"{link.link_label}-{link.node.pk}"] = {
-                    "pk": link.node.pk,
-                    "process_type": link.node.process_type,
-                    "state": link.node.process_state.value,
-                    "ctime": link.node.ctime,
-                    "mtime": link.node.mtime,
-                }
+        qb = orm.QueryBuilder()
+        qb.append(orm.Node, filters={"id": pk}, tag="process")
+        qb.append(
+            orm.ProcessNode,
+            with_incoming="process",
+            filters={"mtime": {">=": since}} if since is not None else None,
+            edge_filters={
+                "type": {"in": [LinkType.CALL_CALC.value, LinkType.CALL_WORK.value]}
+            },
+            edge_project="label",
+            edge_tag="call",
+            project=[
+                "id",
+                "process_type",
+                "attributes.process_state",
+                "ctime",
+                "mtime",
+            ],
+            tag="child",
+        )
+        for row in qb.dict():
+            child = row["child"]
+            tasks[f"{row['call']['label']}-{child['id']}"] = {
+                "pk": child["id"],
+                "process_type": child["process_type"],
+                "state": child["attributes.process_state"],
+                "ctime": child["ctime"],
+                "mtime": child["mtime"],
+            }
     return tasks
 
 
@@ -222,14 +602,35 @@ def node_to_short_json(workgraph_pk: int, tdata: Dict[str, Any]) -> Dict[str, An
     return tdata_short
 
 
-def get_node_summary(node: Node) -> List[List[str]]:
-    summary = {
-        "table": get_node_summary_table(node),
-        "inputs": get_node_inputs(node),
-        "outputs": get_node_outputs(node),
-        "called": get_nodes_called(node),
-        "caller": get_nodes_caller(node),
-    }
+def get_node_summary(node: Node, link_limit: Optional[int] = None) -> List[List[str]]:
+    """
+    Return the summary table and the links of a node. A link section with
+    more than `link_limit` links only holds the first `link_limit` entries
+    of its top-level namespace, with the sub-namespaces collapsed (see
+    `page_links`); its number of entries is listed under `truncated` and the
+    rest is loaded with `get_link_namespace`.
+    """
+    links = get_node_links(
+        node.pk,
+        incoming=INPUT_LINK_TYPES + CALL_LINK_TYPES,
+        outgoing=OUTPUT_LINK_TYPES + CALL_LINK_TYPES,
+    )
+    summary = {"table": get_node_summary_table(node)}
+    link_counts = {}
+    truncated = {}
+    for kind, (direction, link_types, nested) in LINK_KINDS.items():
+        section = [
+            link for link in links if link[0] == direction and link[1] in link_types
+        ]
+        link_counts[kind] = len(section)
+        if link_limit is not None and len(section) > link_limit:
+            summary[kind], truncated[kind] = page_links(
+                section, nested=nested, limit=link_limit
+            )
+        else:
+            summary[kind] = nest_links(section) if nested else flat_links(section)
+    summary["link_counts"] = link_counts
+    summary["truncated"] = truncated
     return summary
 
 
@@ -349,6 +750,9 @@ def translate_datagrid_filter_json(raw: str, project) -> dict:
         else:
             if operator in ("contains", "equals", "is"):
                 filters[col] = {"like": f"%{value}%"}
+            elif operator == "exactly":
+                # the facet chips of the process table narrow it to one value
+                filters[col] = value
 
     # quick filter (space‑separated)
     qf_values = fm.get("quickFilterValues", [])
@@ -368,7 +772,51 @@ def get_parent_processes(pk: int) -> List[Dict[str, Union[str, int]]]:
     """Get the list of parent processes.
     Use aiida incoming links to find the parent processes.
     the parent process is the process that has a link (type CALL_WORK) to the current process.
+
+    The chain is resolved in one recursive query on the link table, and the
+    chains starting at sealed processes are memoized.
     """
+    from aiida.common.exceptions import NotExistent
+    from .cache import ancestor_cache
+
+    parent_processes = ancestor_cache.get(("ancestors", pk))
+    if parent_processes is not None:
+        return [dict(parent) for parent in parent_processes]
+    if not supports_raw_sql():
+        return get_parent_processes_recursive(pk)
+    dialect = get_storage_session().get_bind().dialect.name
+
+    rows = execute_sql(
+        f"""
+        WITH RECURSIVE ancestors(id, depth) AS (
+            SELECT id, 0 FROM db_dbnode WHERE id = :pk
+            UNION ALL
+            SELECT link.input_id, ancestors.depth + 1
+            FROM db_dblink AS link JOIN ancestors ON link.output_id = ancestors.id
+            WHERE link.type = 'call_work'
+        )
+        SELECT node.id, {json_attribute(dialect, "node.attributes", "process_label")},
+            node.node_type, {json_attribute(dialect, "node.attributes", "sealed")}
+        FROM ancestors JOIN db_dbnode AS node ON node.id = ancestors.id
+        ORDER BY ancestors.depth
+        """,
+        pk=pk,
+    )
+    if not rows:
+        raise NotExistent(f"No node with pk {pk}")
+    parent_processes = [
+        {"label": label, "pk": node_pk, "node_type": node_type}
+        for node_pk, label, node_type, _ in rows
+    ]
+    for index, (node_pk, _, _, sealed) in enumerate(rows):
+        if sealed in (True, 1, "true", "1"):
+            ancestor_cache.put(("ancestors", node_pk), parent_processes[index:])
+    return parent_processes
+
+
+def get_parent_processes_recursive(pk: int) -> List[Dict[str, Union[str, int]]]:
+    """Get the list of parent processes by following the incoming CALL_WORK
+    links node by node; used for storage backends without SQL access."""
     from aiida import orm
     from aiida.common.links import LinkType
 
@@ -378,5 +826,440 @@ def get_parent_processes(pk: int) -> List[Dict[str, Union[str, int]]]:
     ]
     links = node.base.links.get_incoming(link_type=LinkType.CALL_WORK).all()
     if len(links) > 0:
-        parent_processes.extend(get_parent_processes(links[0].node.pk))
+        parent_processes.extend(get_parent_processes_recursive(links[0].node.pk))
     return parent_processes
+
+
+def json_attribute(dialect: str, column: str, key: str) -> str:
+    """Return the SQL expression reading the top-level `key` of a JSON column
+    as text (PostgreSQL) or as its SQL value (SQLite)."""
+    if dialect == "postgresql":
+        return f"{column} ->> '{key}'"
+    return f"json_extract({column}, '$.{key}')"
+
+
+def get_storage_session():
+    """Return the SQLAlchemy session of the loaded profile's storage."""
+    from aiida.manage import get_manager
+
+    return get_manager().get_profile_storage().get_session()
+
+
+def supports_raw_sql() -> bool:
+    """
+    Whether the storage of the loaded profile is a `core.psql_dos` or
+    `core.sqlite_dos` one, whose tables `execute_sql` is written for. Other
+    backends, e.g. an archive, take the QueryBuilder paths.
+    """
+    from aiida.manage import get_manager
+    from aiida.storage.psql_dos.backend import PsqlDosBackend
+
+    return isinstance(get_manager().get_profile_storage(), PsqlDosBackend)
+
+
+def execute_sql(sql: str, **params: Any) -> List[Tuple[Any, ...]]:
+    """
+    Run a raw SQL statement on the storage and return all rows. Used for the
+    few queries the QueryBuilder cannot express (GROUP BY, recursive CTEs);
+    they only use the `db_dbnode`/`db_dblink`/`db_dblog`/`db_dbcomputer`
+    tables, which have the same layout on PostgreSQL and SQLite, and are
+    only run where `supports_raw_sql` holds. List parameters are expanded
+    for `IN :param` clauses.
+    """
+    from sqlalchemy import bindparam, text
+
+    statement = text(sql)
+    expanding = [
+        bindparam(key, expanding=True)
+        for key, value in params.items()
+        if isinstance(value, (list, tuple, set))
+    ]
+    if expanding:
+        statement = statement.bindparams(*expanding)
+    params = {
+        key: list(value) if isinstance(value, (tuple, set)) else value
+        for key, value in params.items()
+    }
+    return get_storage_session().execute(statement, params).fetchall()
+
+
+def get_table_fingerprint(entity_cls) -> Tuple[Any, ...]:
+    """
+    Return a cheap fingerprint of the table of `entity_cls`: (max id, max mtime)
+    for nodes and (max id,) for other entities. It moves whenever a row is
+    added or a node is modified.
+    """
+    from aiida import orm
+
+    project = [{"id": {"func": "max"}}]
+    if issubclass(entity_cls, orm.Node):
+        project.append({"mtime": {"func": "max"}})
+    qb = orm.QueryBuilder()
+    qb.append(entity_cls, project=project)
+    return tuple(qb.first() or ())
+
+
+def get_group_fingerprint(pk: int) -> Tuple[Any, ...]:
+    """
+    Return (number, max id, max mtime) of the members of group `pk`. Unlike
+    the fingerprint of the node table, it moves when existing nodes are
+    added to or removed from the group, by any client.
+    """
+    from aiida import orm
+
+    qb = orm.QueryBuilder()
+    qb.append(orm.Group, filters={"id": pk}, tag="group")
+    qb.append(
+        orm.Node,
+        with_group="group",
+        project=[
+            {"uuid": {"func": "count"}},
+            {"id": {"func": "max"}},
+            {"mtime": {"func": "max"}},
+        ],
+    )
+    return tuple(qb.first() or ())
+
+
+# the columns the process tables can be faceted by
+PROCESS_FACETS = ("process_state", "process_label", "exit_status", "computer")
+
+
+def get_process_facets(node_cls, filters: dict) -> List[Dict[str, Any]]:
+    """
+    Return the number of processes of `node_cls` matching the QueryBuilder
+    `filters` per combination of process state, process label, exit status
+    and computer label, with a single GROUP BY query. The QueryBuilder
+    cannot group, so the matching processes are selected by the SQL of a
+    QueryBuilder (`as_sql`, with the values inlined) within the grouping
+    raw SQL. Storage backends without SQL access count the projected rows
+    in Python instead.
+    """
+    from aiida import orm
+
+    qb = orm.QueryBuilder()
+    if not supports_raw_sql():
+        from collections import Counter
+
+        qb.append(
+            node_cls,
+            filters=filters,
+            project=[f"attributes.{key}" for key in PROCESS_FACETS[:3]],
+            tag="process",
+        )
+        qb.append(orm.Computer, with_node="process", outerjoin=True, project="label")
+        rows = Counter(tuple(row) for row in qb.iterall()).items()
+        return [
+            {**dict(zip(PROCESS_FACETS, values)), "count": count}
+            for values, count in rows
+        ]
+
+    qb.append(node_cls, filters=filters, project="id")
+    # a colon in an inlined value must not be read as a bound parameter
+    matching = qb.as_sql(inline=True).replace(":", "\\:")
+    if get_storage_session().get_bind().dialect.name == "postgresql":
+        # as JSON, so that exit statuses stay numbers
+        columns = [f"node.attributes -> '{key}'" for key in PROCESS_FACETS[:3]]
+    else:
+        columns = [
+            f"json_extract(node.attributes, '$.{key}')" for key in PROCESS_FACETS[:3]
+        ]
+    rows = execute_sql(
+        f"""
+        SELECT {", ".join(columns)}, computer.label, COUNT(*)
+        FROM db_dbnode AS node
+        LEFT JOIN db_dbcomputer AS computer ON computer.id = node.dbcomputer_id
+        WHERE node.id IN ({matching})
+        GROUP BY {", ".join(columns)}, computer.label
+        """
+    )
+    return [{**dict(zip(PROCESS_FACETS, row[:-1])), "count": row[-1]} for row in rows]
+
+
+def estimate_count(qb) -> Optional[int]:
+    """
+    Return the PostgreSQL planner's row estimate for the query, which comes
+    from the table statistics and does not scan any rows. Return None if the
+    storage is not PostgreSQL.
+    """
+    import json
+    from sqlalchemy import text
+
+    session = get_storage_session()
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    plan = session.execute(
+        text(f"EXPLAIN (FORMAT JSON) {qb.as_sql(inline=True)}")
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_query(
+    qb,
+    key: Tuple[Any, ...],
+    filters: dict,
+    entity_cls,
+    estimate: bool = False,
+    fingerprint: Optional[Tuple[Any, ...]] = None,
+) -> Tuple[int, bool]:
+    """
+    Return (total, approximate) for the rows of `qb`.
+
+    The exact count is cached under (`key`, normalized `filters`) until the
+    fingerprint of the `entity_cls` table moves. With `estimate`, the planner
+    statistics are used instead. This is only done for unfiltered queries,
+    since the estimate for arbitrary filters can be far off.
+    """
+    import json
+    from aiida_gui.app.cache import count_cache
+
+    if estimate and not filters:
+        total = estimate_count(qb)
+        if total is not None:
+            return total, True
+    key = (*key, json.dumps(filters, sort_keys=True, default=str))
+    if fingerprint is None:
+        fingerprint = get_table_fingerprint(entity_cls)
+    total = count_cache.get_or_count(key, fingerprint, qb.count)
+    return total, False
+
+
+def get_node_fingerprint(pk: int) -> Tuple[Any, ...]:
+    """
+    Return (uuid, mtime, sealed, number of outgoing links) of a node, which
+    changes whenever its summary changes. Outputs and called processes are
+    attached through new links, which do not necessarily touch the mtime.
+    """
+    from aiida import orm
+
+    qb = orm.QueryBuilder()
+    qb.append(
+        orm.Node,
+        filters={"id": pk},
+        project=["uuid", "mtime", "attributes.sealed"],
+        tag="node",
+    )
+    row = qb.first()
+    if row is None:
+        return ()
+    qb = orm.QueryBuilder()
+    qb.append(orm.Node, filters={"id": pk}, tag="node")
+    qb.append(orm.Node, with_incoming="node")
+    return (*row, qb.count())
+
+
+def get_called_fingerprint(pk: int) -> Tuple[Any, ...]:
+    """Return (count, max mtime) of the processes called by a process."""
+    from aiida import orm
+
+    qb = orm.QueryBuilder()
+    qb.append(orm.ProcessNode, filters={"id": pk}, tag="process")
+    qb.append(
+        orm.ProcessNode,
+        with_incoming="process",
+        project=[{"id": {"func": "count"}}, {"mtime": {"func": "max"}}],
+    )
+    return tuple(qb.first() or ())
+
+
+def make_etag(*parts: Any) -> str:
+    """Return a weak ETag for the version fingerprint made of `parts`."""
+    import hashlib
+
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'W/"{digest[:24]}"'
+
+
+def check_etag(request, response, etag: str):
+    """
+    Attach `etag` to the response. Return a bare 304 response if the client's
+    `If-None-Match` header matches it, so the route can skip building the body.
+    """
+    from fastapi import Response
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    header = request.headers.get("if-none-match")
+    if header and (
+        header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+    ):
+        return Response(
+            status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"}
+        )
+    return None
+
+
+def get_descendants(
+    pk: int, link_types: Tuple[str, ...] = CALL_LINK_TYPES
+) -> List[Tuple[int, int]]:
+    """
+    Return (pk, depth) of node `pk` (depth 0) and of all nodes reached from
+    it over outgoing links of `link_types`, with one recursive query.
+    """
+    if not supports_raw_sql():
+        return _get_descendants_qb(pk, link_types)
+    return [
+        (node_pk, depth)
+        for node_pk, depth in execute_sql(
+            """
+            WITH RECURSIVE descendants(id, depth) AS (
+                SELECT id, 0 FROM db_dbnode WHERE id = :pk
+                UNION ALL
+                SELECT link.output_id, descendants.depth + 1
+                FROM db_dblink AS link
+                JOIN descendants ON link.input_id = descendants.id
+                WHERE link.type IN :link_types
+            )
+            SELECT id, depth FROM descendants
+            """,
+            pk=pk,
+            link_types=list(link_types),
+        )
+    ]
+
+
+def _get_descendants_qb(pk: int, link_types: Tuple[str, ...]) -> List[Tuple[int, int]]:
+    """`get_descendants` with the QueryBuilder, for storage backends without
+    SQL access; one query per level and chunk of nodes."""
+    from aiida import orm
+
+    if not orm.QueryBuilder().append(orm.Node, filters={"id": pk}).count():
+        return []
+    depths = {pk: 0}
+    frontier = [pk]
+    while frontier:
+        next_frontier = []
+        for start in range(0, len(frontier), TRAVERSAL_CHUNK_SIZE):
+            qb = orm.QueryBuilder()
+            qb.append(
+                orm.Node,
+                filters={"id": {"in": frontier[start : start + TRAVERSAL_CHUNK_SIZE]}},
+                tag="parent",
+            )
+            qb.append(
+                orm.Node,
+                with_incoming="parent",
+                edge_filters={"type": {"in": list(link_types)}},
+                project="id",
+            )
+            for (child,) in qb.iterall():
+                if child not in depths:
+                    depths[child] = depths[frontier[0]] + 1
+                    next_frontier.append(child)
+        frontier = next_frontier
+    return list(depths.items())
+
+
+# nodes per query of the traversal, well below the bound parameter limit of SQLite
+TRAVERSAL_CHUNK_SIZE = 500
+
+
+LOG_INDENT_SIZE = 4
+
+
+def build_log_query(
+    pk: int,
+    after: int = 0,
+    levelname: str = "REPORT",
+    text: Optional[str] = None,
+    subtree: bool = True,
+) -> Tuple[Any, Dict[int, int], List[str]]:
+    """
+    Return the query of the log records of process `pk` with an id above
+    `after`, in id order, together with the depth of every process of the
+    subtree and the level names let through. See `get_log_records`.
+    """
+    from aiida import orm
+    from aiida.common.log import LOG_LEVELS
+
+    if subtree:
+        depths = dict(get_descendants(pk, link_types=("call_work",)))
+    else:
+        depths = {pk: 0}
+    threshold = LOG_LEVELS[levelname.upper()]
+    levelnames = [name for name, level in LOG_LEVELS.items() if level >= threshold]
+    filters = {
+        "dbnode_id": {"in": list(depths)},
+        "levelname": {"in": levelnames},
+    }
+    if after:
+        filters["id"] = {">": after}
+    if text:
+        filters["message"] = {"ilike": f"%{text}%"}
+    qb = orm.QueryBuilder()
+    qb.append(
+        orm.Log,
+        filters=filters,
+        project=["id", "time", "levelname", "loggername", "message", "dbnode_id"],
+    )
+    qb.order_by({orm.Log: {"id": "asc"}})
+    return qb, depths, levelnames
+
+
+def get_log_records(
+    pk: int,
+    after: int = 0,
+    levelname: str = "REPORT",
+    text: Optional[str] = None,
+    subtree: bool = True,
+    limit: int = 1000,
+    skip: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Return the log records of process `pk` with an id above `after`, in id
+    order. Only records of at least `levelname` containing `text` (a
+    case-insensitive LIKE pattern) are returned. With `subtree`, records of
+    the workflows it called, directly or not, are included, as in
+    `verdi process report`. Each record carries its report `line`.
+    """
+    qb, depths, levelnames = build_log_query(pk, after, levelname, text, subtree)
+    if skip:
+        qb.offset(skip)
+    qb.limit(limit)
+    width_levelname = max(len(name) for name in levelnames)
+    records = []
+    for log_id, time, log_levelname, loggername, message, node_pk in qb.all():
+        depth = depths.get(node_pk, 0)
+        records.append(
+            {
+                "id": log_id,
+                "time": time,
+                "levelname": log_levelname,
+                "loggername": loggername,
+                "message": message,
+                "pk": node_pk,
+                "depth": depth,
+                "line": f"{time:%Y-%m-%d %H:%M:%S} [{log_id} | "
+                f"{log_levelname:>{width_levelname}}]:"
+                f"{' ' * (depth * LOG_INDENT_SIZE)} {message}",
+            }
+        )
+    return records
+
+
+def get_log_range(
+    pk: int,
+    start: int,
+    stop: Optional[int],
+    levelname: str = "REPORT",
+    text: Optional[str] = None,
+    subtree: bool = True,
+    max_records: int = 10000,
+) -> Dict[str, Any]:
+    """
+    Return the log records with index `start` to `stop` (exclusive, at most
+    `max_records`) of the report of process `pk`, and the total number of
+    records. Indices work as for Python slices.
+    """
+    qb, _, _ = build_log_query(pk, 0, levelname, text, subtree)
+    total = qb.count()
+    start, stop, _ = slice(start, stop).indices(total)
+    stop = min(stop, start + max_records)
+    records = (
+        get_log_records(pk, 0, levelname, text, subtree, limit=stop - start, skip=start)
+        if stop > start
+        else []
+    )
+    return {"total": total, "start": start, "records": records}
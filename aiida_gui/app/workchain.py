@@ -1,7 +1,9 @@
 from __future__ import annotations
-from fastapi import HTTPException
+from fastapi import HTTPException, Query, Request, Response
 from aiida import orm
 import traceback
+from datetime import datetime
+from typing import Optional
 from aiida_gui.app.node_table import (
     make_node_router,
     process_project,
@@ -9,6 +11,7 @@ from aiida_gui.app.node_table import (
 )
 from aiida.orm import WorkChainNode
 from .utils import get_parent_processes
+from .executor import offload
 
 
 router = make_node_router(
@@ -20,22 +23,65 @@ router = make_node_router(
 
 
 @router.get("/api/workchain/{id}")
-async def read_workchain(id: int):
-    from .utils import get_node_summary, get_workchain_data
+@offload("workchain")
+def read_workchain(
+    id: int,
+    depth: int = Query(1, ge=1, le=10),
+    max_nodes: int = Query(500, gt=0, le=10000),
+):
+    """
+    Return the graph of the processes called by the workchain. Sub-workflows
+    are expanded inline down to `depth` levels and at most `max_nodes`
+    processes are shown; the rest are collapsed, see `/expand`.
+    """
+    from .cache import sealed_cache, single_flight
+    from .utils import (
+        SUMMARY_LINK_LIMIT,
+        get_node_summary,
+        get_workchain_data,
+        get_node_fingerprint,
+    )
 
     try:
 
         node = orm.load_node(id)
+        fingerprint = get_node_fingerprint(id)
+        uuid, mtime, sealed, _ = fingerprint
+        sealed = bool(sealed)
 
-        content = get_workchain_data(node)
+        content = sealed_cache.get_or_compute(
+            ("workchain", uuid, depth, max_nodes),
+            mtime,
+            sealed,
+            lambda: single_flight.do(
+                ("workchain", id, depth, max_nodes, fingerprint),
+                get_workchain_data,
+                node,
+                depth=depth,
+                max_nodes=max_nodes,
+            ),
+        )
         if content is None:
             print("No workchain data found in the node.")
             return
-        summary = get_node_summary(node)
-        parent_workflows = get_parent_processes(id)
-        parent_workflows.reverse()
+        # the graph may be shared with other requests, so do not modify it
+        content = dict(content)
+        summary = sealed_cache.get_or_compute(
+            ("summary", uuid),
+            mtime,
+            sealed,
+            lambda: single_flight.do(
+                ("summary", id, fingerprint),
+                get_node_summary,
+                node,
+                link_limit=SUMMARY_LINK_LIMIT,
+            ),
+        )
+        parent_workflows = sealed_cache.get_or_compute(
+            ("parents", uuid), mtime, sealed, lambda: get_parent_processes(id)
+        )
         content["summary"] = summary
-        content["parent_workflows"] = parent_workflows
+        content["parent_workflows"] = list(reversed(parent_workflows))
         content["processes_info"] = {}
         return content
     except KeyError as e:
@@ -44,14 +90,83 @@ async def read_workchain(id: int):
         raise HTTPException(status_code=404, detail=f"Workchain {id} not found, {e}")
 
 
+@router.get("/api/workchain/{id}/expand")
+@offload("workchain")
+def expand_workchain(
+    id: int,
+    parent: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(500, gt=0, le=10000),
+):
+    """
+    Return the nodes and links of the processes called by `parent` (by
+    default the workchain itself) from position `skip` on, to replace a
+    collapsed node of the workchain graph.
+    """
+    from .utils import expand_workchain_node
+
+    parent = id if parent is None else parent
+    if not orm.QueryBuilder().append(orm.WorkflowNode, filters={"id": parent}).count():
+        raise HTTPException(status_code=404, detail=f"Workflow {parent} not found")
+    return expand_workchain_node(parent, skip, limit)
+
+
 @router.get("/api/workchain-state/{id}")
-async def read_tasks_state(id: int, item_type: str = "called_process"):
-    from aiida_gui.app.utils import get_processes_latest
+@offload("workchain")
+def read_tasks_state(
+    id: int,
+    request: Request,
+    response: Response,
+    item_type: str = "called_process",
+    since: Optional[datetime] = None,
+):
+    """
+    Return the state, ctime and mtime of the called processes. With `since`,
+    only the processes modified at or after that time are returned, so
+    pollers can merge the deltas into the state they already have.
+    """
+    from aiida_gui.app.utils import (
+        get_processes_latest,
+        get_called_fingerprint,
+        make_etag,
+        check_etag,
+    )
+
+    etag = make_etag(
+        "workchain-state", id, item_type, since, get_called_fingerprint(id)
+    )
+    not_modified = check_etag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
 
     try:
-        processes_info = get_processes_latest(id, item_type=item_type)
+        processes_info = get_processes_latest(id, item_type=item_type, since=since)
         return processes_info
     except KeyError as e:
         error_traceback = traceback.format_exc()  # Capture the full traceback
         print(error_traceback)
         raise HTTPException(status_code=404, detail=f"Workchain {id} not found, {e}")
+
+
+@router.get("/api/workchain/{id}/rollup")
+@offload("workchain")
+def read_workchain_rollup(id: int, request: Request, response: Response):
+    """
+    Return the number of all processes called, directly or not, by the
+    workflow per process state, with their earliest ctime and latest mtime.
+    The rollup is updated incrementally and answered with 304 until it
+    changes, so it can be polled cheaply for huge trees.
+    """
+    from .rollup import rollup_cache
+    from .utils import make_etag, check_etag
+
+    if not orm.QueryBuilder().append(orm.WorkflowNode, filters={"id": id}).count():
+        raise HTTPException(status_code=404, detail=f"Workflow {id} not found")
+    rollup = rollup_cache.get(id)
+    etag = make_etag(
+        "rollup", id, rollup["total"], sorted(rollup["states"].items()), rollup["mtime"]
+    )
+    not_modified = check_etag(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    return rollup
@@ -0,0 +1,114 @@
+// ArrayPlot.js
+import React, { useEffect, useState } from 'react';
+import {
+  Chart as ChartJS,
+  Filler,
+  Legend,
+  LinearScale,
+  LineElement,
+  PointElement,
+  Tooltip,
+} from 'chart.js';
+import { Line } from 'react-chartjs-2';
+
+ChartJS.register(LinearScale, PointElement, LineElement, Filler, Tooltip, Legend);
+
+// points requested per series, about the width of the plot in pixels
+const PLOT_WIDTH = 1000;
+// columns of a 2-D array drawn at most, e.g. the bands of a band structure
+const MAX_SERIES = 50;
+
+const toPoints = (xs, ys) => xs.map((x, i) => ({ x, y: ys[i] }));
+
+// Chart.js datasets of the downsampled series of /downsample
+const toDatasets = (data) => {
+  const datasets = [];
+  data.series.slice(0, MAX_SERIES).forEach((series, i) => {
+    if (data.mode === 'minmax') {
+      datasets.push({ label: `${i} max`, data: toPoints(series.x, series.max), fill: '+1' });
+      datasets.push({ label: `${i} min`, data: toPoints(series.x, series.min), fill: false });
+    } else {
+      datasets.push({ label: `${i}`, data: toPoints(series.x, series.y) });
+    }
+  });
+  return datasets;
+};
+
+/**
+ * Plot the 1-D and 2-D arrays of an `ArrayData` node. The arrays are
+ * downsampled on the server to about the width of the plot, so even
+ * millions of points render at once.
+ */
+function ArrayPlot({ pk, data }) {
+  const [arrays, setArrays] = useState({});
+  const [name, setName] = useState(null);
+  const [mode, setMode] = useState('lttb');
+  const [plot, setPlot] = useState(null);
+
+  // the x array of an XyData node is not plotted on its own
+  const xName = data && data.x_name;
+  const xArray = xName ? 'x_array' : null;
+
+  useEffect(() => {
+    fetch(`/api/datanode/${pk}/arrays`)
+      .then((response) => response.json())
+      .then((info) => {
+        const plottable = Object.fromEntries(
+          Object.entries(info).filter(
+            ([key, value]) => key !== xArray && [1, 2].includes(value.shape.length) && value.shape[0] > 1,
+          ),
+        );
+        setArrays(plottable);
+        setName(Object.keys(plottable)[0] || null);
+      })
+      .catch((error) => console.error('Error fetching arrays:', error));
+  }, [pk, xArray]);
+
+  useEffect(() => {
+    if (!name) {
+      return;
+    }
+    const params = new URLSearchParams({ name, width: PLOT_WIDTH, mode });
+    fetch(`/api/datanode/${pk}/downsample?${params}`)
+      .then((response) => response.json())
+      .then((result) => setPlot(result))
+      .catch((error) => console.error('Error fetching the plot data:', error));
+  }, [pk, name, mode]);
+
+  if (!name) {
+    return null;
+  }
+
+  return (
+    <div style={{ margin: 10 }}>
+      <select value={name} onChange={(e) => setName(e.target.value)}>
+        {Object.keys(arrays).map((key) => (
+          <option key={key} value={key}>
+            {key} ({arrays[key].shape.join(' × ')})
+          </option>
+        ))}
+      </select>
+      <select value={mode} onChange={(e) => setMode(e.target.value)} style={{ marginLeft: 10 }}>
+        <option value="lttb">Line</option>
+        <option value="minmax">Envelope</option>
+      </select>
+      {plot && plot.series && (
+        <Line
+          data={{ datasets: toDatasets(plot) }}
+          options={{
+            animation: false,
+            parsing: false,
+            elements: { point: { radius: 0 }, line: { borderWidth: 1 } },
+            plugins: { legend: { display: !(plot.series.length === 1 && plot.mode === 'lttb') } },
+            scales: { x: { type: 'linear', title: { display: true, text: xName || 'index' } } },
+          }}
+        />
+      )}
+      {plot && plot.length > PLOT_WIDTH && (
+        <p>{plot.length} points, downsampled to {PLOT_WIDTH}</p>
+      )}
+    </div>
+  );
+}
+
+export default ArrayPlot;
@@ -1,7 +1,37 @@
 import React, { useEffect, useRef } from 'react';
 import { Atoms, WEAS } from 'weas';
 
-function AtomsItem({ data }) {
+// Trajectories longer than this are decimated with a stride
+const MAX_TRAJECTORY_FRAMES = 2000;
+
+// Fetch the frames start:stop:stride of a trajectory in the binary format
+async function fetchFrames(pk, start, stop, stride, info) {
+  const response = await fetch(`/api/datanode/${pk}/frames?start=${start}&stop=${stop}&stride=${stride}&format=binary`);
+  if (!response.ok) {
+    throw new Error('Failed to fetch trajectory frames');
+  }
+  const count = Number(response.headers.get('X-Frame-Count'));
+  const hasCell = response.headers.get('X-Has-Cell') === '1';
+  const values = new Float32Array(await response.arrayBuffer());
+  const frameSize = (hasCell ? 9 : 0) + info.numatoms * 3;
+  const frames = [];
+  for (let frame = 0; frame < count; frame++) {
+    let offset = frame * frameSize;
+    let cell = null;
+    if (hasCell) {
+      cell = [0, 1, 2].map((row) => Array.from(values.subarray(offset + row * 3, offset + row * 3 + 3)));
+      offset += 9;
+    }
+    const positions = [];
+    for (let atom = 0; atom < info.numatoms; atom++) {
+      positions.push(Array.from(values.subarray(offset + atom * 3, offset + atom * 3 + 3)));
+    }
+    frames.push(new Atoms({ symbols: info.symbols, positions, cell, pbc: info.pbc }));
+  }
+  return { frames, stop: Number(response.headers.get('X-Frame-Stop')) };
+}
+
+function AtomsItem({ data, pk }) {
   const weasContainerRef = useRef(null);
 
 
@@ -51,10 +81,7 @@ function AtomsItem({ data }) {
       atomsData = structureToAtomsData(data)
       atoms = new Atoms(atomsData);
     } else if (data.node_type === 'data.core.array.trajectory.TrajectoryData.') {
-      atoms = [];
-      data["extras"].forEach((atomsData) => {
-        atoms.push(new Atoms(atomsData));
-      });
+      return streamTrajectory();
     } else if (data.node_type === 'data.workgraph.ase.atoms.Atoms.AtomsData.') {
       atomsData = aseAtomsToAtomsData(data)
       atoms = new Atoms(atomsData);
@@ -72,6 +99,33 @@ function AtomsItem({ data }) {
     }
   }, [data]); // Include data in the dependency array
 
+  // Load the frames of a trajectory chunk by chunk and show them as they arrive
+  function streamTrajectory() {
+    let cancelled = false;
+    const load = async () => {
+      const response = await fetch(`/api/datanode/${pk}/frames/info`);
+      if (!response.ok) {
+        throw new Error('Failed to fetch trajectory info');
+      }
+      const info = await response.json();
+      const stride = Math.max(1, Math.ceil(info.numsteps / MAX_TRAJECTORY_FRAMES));
+      const chunk = info.max_frames * stride;
+      const editor = new WEAS({ domElement: weasContainerRef.current });
+      let atoms = [];
+      for (let start = 0; start < info.numsteps && !cancelled; start += chunk) {
+        const { frames } = await fetchFrames(pk, start, Math.min(start + chunk, info.numsteps), stride, info);
+        if (cancelled) return;
+        atoms = atoms.concat(frames);
+        editor.avr.atoms = atoms;
+        editor.render();
+      }
+    };
+    load().catch((error) => console.error('Error fetching trajectory:', error));
+    return () => {
+      cancelled = true;
+    };
+  }
+
   return (
     <div>
       <h1>Atoms Viewer</h1>
@@ -0,0 +1,93 @@
+// AttributeValue.js
+import React, { useState } from 'react';
+
+const PAGE_SIZE = 200;
+
+export const isTruncated = (value) =>
+  value !== null && typeof value === 'object' && value.__truncated__ === true;
+
+// Escape a key for a dotted attribute path, where `\` escapes `.` and `\`
+export const escapeKey = (key) => String(key).replace(/[\\.]/g, (char) => `\\${char}`);
+
+const formatSize = (size) => {
+  if (size >= 1024 * 1024) return `${(size / 1024 / 1024).toFixed(1)} MB`;
+  if (size >= 1024) return `${(size / 1024).toFixed(1)} kB`;
+  return `${size} B`;
+};
+
+const describe = (marker) =>
+  marker.length !== null && marker.length !== undefined
+    ? `${marker.type}, ${marker.length} items, ${formatSize(marker.size)}`
+    : `${marker.type}, ${formatSize(marker.size)}`;
+
+// Fetch one page of the children of the attribute at `path` of node `pk`
+const fetchAttribute = async (pk, path, skip) => {
+  const params = new URLSearchParams({ path, skip, limit: PAGE_SIZE });
+  const response = await fetch(`/api/datanode/${pk}?${params}`);
+  if (!response.ok) {
+    throw new Error(`Failed to fetch attribute ${path}`);
+  }
+  return response.json();
+};
+
+/**
+ * Render an attribute value of data node `pk`. Values that were too large
+ * to be sent come as a truncation marker; they are fetched one level at a
+ * time, at `path`, when they are opened.
+ */
+function AttributeValue({ pk, path, value }) {
+  const [open, setOpen] = useState(false);
+  const [children, setChildren] = useState(null);
+
+  if (!isTruncated(value)) {
+    if (value === null) return <span>null</span>;
+    if (typeof value === 'object') return <span>{JSON.stringify(value)}</span>;
+    return <span>{String(value)}</span>;
+  }
+  if (value.type !== 'object' && value.type !== 'array') {
+    return <span>({describe(value)})</span>;
+  }
+
+  const load = async (skip) => {
+    try {
+      const data = await fetchAttribute(pk, path, skip);
+      const entries = Array.isArray(data.value)
+        ? data.value.map((item, i) => [String(skip + i), item])
+        : Object.entries(data.value);
+      setChildren((prev) => [...(skip > 0 && prev ? prev : []), ...entries]);
+    } catch (error) {
+      console.error('Error fetching attribute:', error);
+    }
+  };
+
+  const toggle = () => {
+    if (!open && children === null) {
+      load(0);
+    }
+    setOpen(!open);
+  };
+
+  return (
+    <div>
+      <span style={{ cursor: 'pointer' }} onClick={toggle}>
+        {open ? '▾' : '▸'} ({describe(value)})
+      </span>
+      {open && children && (
+        <ul style={{ textAlign: 'left' }}>
+          {children.map(([key, child]) => (
+            <li key={key}>
+              {key}: <AttributeValue pk={pk} path={`${path}.${escapeKey(key)}`} value={child} />
+            </li>
+          ))}
+          {children.length < value.length && (
+            <li>
+              <button type="button" onClick={() => load(children.length)}>Load more</button>
+            </li>
+          )}
+        </ul>
+      )}
+    </div>
+  );
+}
+
+export default AttributeValue;
@@ -1,23 +1,56 @@
 import React, { useState, useEffect } from 'react';
 import { useParams } from 'react-router-dom';
 import AtomsItem from './AtomsItem.js'; // Adjust the path as necessary
+import ArrayPlot from './ArrayPlot.js';
+import AttributeValue, { escapeKey, isTruncated } from './AttributeValue.js';
+import RepositoryBrowser from './RepositoryBrowser.js';
 
 import './DataNodeItem.css';
 import '../App.css';
 
+const ATOMS_NODE_TYPES = [
+  'data.core.structure.StructureData.',
+  'data.workgraph.ase.atoms.Atoms.AtomsData.',
+];
+
+// attributes listed per request; the server sends `__count__` when there are more
+const PAGE_SIZE = 200;
+
+const countAttributes = (data: Record<string, any>) =>
+  Object.keys(data).filter((key) => key !== 'node_type' && key !== '__count__').length;
+
 function DataNodeItem() {
   const { pk } = useParams();
-  const [NodeData, setNodeData] = useState({ node_type: "" });
+  const [NodeData, setNodeData] = useState<Record<string, any>>({ node_type: "" });
+  const [loaded, setLoaded] = useState(0);
 
   useEffect(() => {
-    fetch(`/api/datanode/${pk}`)
+    fetch(`/api/datanode/${pk}?limit=${PAGE_SIZE}`)
       .then(response => response.json())
+      .then(data => {
+        // the structure viewer needs all attributes, not the overview
+        if (ATOMS_NODE_TYPES.includes(data.node_type) && Object.values(data).some(isTruncated)) {
+          return fetch(`/api/datanode/${pk}?full=true`).then(response => response.json());
+        }
+        return data;
+      })
       .then(data => {
         setNodeData(data);
+        setLoaded(countAttributes(data));
       })
       .catch(error => console.error('Error fetching data:', error));
   }, [pk]); // Only re-run when `pk` changes
 
+  const loadMore = () => {
+    fetch(`/api/datanode/${pk}?skip=${loaded}&limit=${PAGE_SIZE}`)
+      .then(response => response.json())
+      .then(data => {
+        setNodeData(prev => ({ ...prev, ...data, __count__: data.__count__ }));
+        setLoaded(prev => prev + countAttributes(data));
+      })
+      .catch(error => console.error('Error fetching data:', error));
+  };
+
   // Safely convert any value to a string
   const stringifyValue = (value: unknown): string => {
     if (value === null) return 'null';
@@ -37,18 +70,31 @@ function DataNodeItem() {
         </thead>
         <tbody>
           {Object.entries(NodeData).map(([key, value]) => (
-            key !== "extras" && (
+            key !== "extras" && key !== "__count__" && (
               <tr key={key}>
           <td>{key}</td>
-          <td>{stringifyValue(value)}</td>
+          <td>{isTruncated(value) ? <AttributeValue pk={pk} path={escapeKey(key)} value={value} /> : stringifyValue(value)}</td>
               </tr>
             )
           ))}
+          {NodeData.__count__ > loaded && (
+            <tr>
+              <td colSpan={2}>
+                <button type="button" onClick={loadMore}>
+                  Load more ({loaded} of {NodeData.__count__})
+                </button>
+              </td>
+            </tr>
+          )}
         </tbody>
       </table>
       {NodeData.node_type === 'data.core.structure.StructureData.' && <AtomsItem data={NodeData} />}
-      {NodeData.node_type === 'data.core.array.trajectory.TrajectoryData.' && <AtomsItem data={NodeData} />}
+      {NodeData.node_type === 'data.core.array.trajectory.TrajectoryData.' && <AtomsItem data={NodeData} pk={pk} />}
       {NodeData.node_type === 'data.workgraph.ase.atoms.Atoms.AtomsData.' && <AtomsItem data={NodeData} />}
+      {['data.core.array.ArrayData.', 'data.core.array.xy.XyData.', 'data.core.array.bands.BandsData.'].includes(NodeData.node_type) && (
+        <ArrayPlot pk={pk} data={NodeData} />
+      )}
+      <RepositoryBrowser pk={pk} />
     </div>
   );
 }
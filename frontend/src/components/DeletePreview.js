@@ -0,0 +1,44 @@
+// DeletePreview.js
+import React, { useEffect, useRef, useState } from 'react';
+import useJob from '../hooks/useJob';
+
+// dependents listed by pk, the rest are only counted
+const MAX_LISTED = 1000;
+
+/**
+ * Body of the delete confirmation of node `pk`: follows the dry-run job
+ * `jobId` and lists the dependents as the traversal finds them, so the
+ * count grows while the search is still running. A search that is still
+ * running when the dialog closes is cancelled.
+ */
+function DeletePreview({ jobId, pk }) {
+  const [pks, setPks] = useState([]);
+  const done = useRef(false);
+  const summary = useJob(
+    jobId,
+    () => { done.current = true; },
+    (data) => {
+      const found = (data.events || []).flatMap((event) => event.pks || []);
+      if (found.length) setPks((prev) => [...prev, ...found]);
+    },
+  );
+
+  useEffect(() => () => {
+    if (jobId && !done.current) fetch(`/api/jobs/${jobId}`, { method: 'DELETE' });
+  }, [jobId]);
+
+  const deps = pks.filter((other) => other !== pk);
+  const searching = !summary?.done;
+  return (
+    <p>
+      Delete&nbsp;PK&nbsp;{pk}&nbsp;and&nbsp;{deps.length}{searching && '+'}&nbsp;dependents?&nbsp;
+      <b>The deletion is irreversible.</b>
+      {searching && <i> Searching for dependents…</i>}
+      {summary?.status === 'failed' && <i> The search failed: {summary.error}</i>}
+      <br/><br/>{deps.slice(0, MAX_LISTED).join(', ')}
+      {deps.length > MAX_LISTED && ` … and ${deps.length - MAX_LISTED} more`}
+    </p>
+  );
+}
+
+export default DeletePreview;
@@ -0,0 +1,131 @@
+// NodeLinks.js
+import React, { useEffect, useState } from 'react';
+
+const PAGE_SIZE = 100;
+
+const isNamespaceMarker = (value) =>
+  value !== null && typeof value === 'object' && '__namespace__' in value;
+
+// Fetch one page of the links of `pk` in a port namespace
+const fetchLinks = async (pk, kind, namespace, skip) => {
+  const url = `/api/process/${pk}/links?kind=${kind}&namespace=${encodeURIComponent(namespace)}&skip=${skip}&limit=${PAGE_SIZE}`;
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Failed to fetch links from ${url}`);
+  }
+  return response.json();
+};
+
+function LoadMore({ onClick }) {
+  return (
+    <li>
+      <button type="button" onClick={onClick}>Load more</button>
+    </li>
+  );
+}
+
+// A namespace that is only fetched when it is opened
+function LazyNamespace({ pk, kind, name, marker, linkTo }) {
+  const [open, setOpen] = useState(false);
+  return (
+    <li>
+      <span style={{ cursor: 'pointer' }} onClick={() => setOpen(!open)}>
+        {open ? '▾' : '▸'} {name}: ({marker.__count__})
+      </span>
+      {open && (
+        <NamespacePage pk={pk} kind={kind} namespace={marker.__namespace__} linkTo={linkTo} />
+      )}
+    </li>
+  );
+}
+
+function NamespacePage({ pk, kind, namespace, linkTo }) {
+  const [links, setLinks] = useState({});
+  const [total, setTotal] = useState(0);
+
+  const load = async (skip) => {
+    try {
+      const data = await fetchLinks(pk, kind, namespace, skip);
+      setLinks((prev) => ({ ...prev, ...data.links }));
+      setTotal(data.total);
+    } catch (error) {
+      console.error('Error fetching links:', error);
+    }
+  };
+
+  useEffect(() => {
+    setLinks({});
+    load(0);
+  }, [pk, kind, namespace]);
+
+  const shown = Object.keys(links).length;
+  return (
+    <ul>
+      <LinkEntries pk={pk} kind={kind} links={links} linkTo={linkTo} />
+      {shown < total && <LoadMore onClick={() => load(shown)} />}
+    </ul>
+  );
+}
+
+function LinkEntries({ pk, kind, links, linkTo }) {
+  return Object.entries(links).map(([key, value]) => {
+    if (Array.isArray(value)) {
+      // [nodeId, className, nodeType]
+      const nodeId = value[0];
+      return (
+        <li key={key}>
+          <span>
+            {key}: <a href={`${linkTo(value[2])}/${nodeId}`}>{nodeId}</a>
+          </span>
+        </li>
+      );
+    } else if (isNamespaceMarker(value)) {
+      return <LazyNamespace key={key} pk={pk} kind={kind} name={key} marker={value} linkTo={linkTo} />;
+    } else if (value !== null && typeof value === 'object') {
+      // Nested dictionary
+      return (
+        <li key={key}>
+          <span>{key}:</span>
+          <ul>
+            <LinkEntries pk={pk} kind={kind} links={value} linkTo={linkTo} />
+          </ul>
+        </li>
+      );
+    }
+    return null;
+  });
+}
+
+/**
+ * Render the `kind` links of node `pk` as a nested list. `links` are the
+ * entries that came with the summary; if the section was truncated to its
+ * first page (`total` entries in all), the rest is loaded on demand, and
+ * collapsed namespaces are fetched when they are opened.
+ */
+function NodeLinks({ pk, kind, links, total, linkTo }) {
+  const [more, setMore] = useState({});
+
+  useEffect(() => {
+    setMore({});
+  }, [pk, kind]);
+
+  const loadMore = async () => {
+    try {
+      const skip = Object.keys(links || {}).length + Object.keys(more).length;
+      const data = await fetchLinks(pk, kind, '', skip);
+      setMore((prev) => ({ ...prev, ...data.links }));
+    } catch (error) {
+      console.error('Error fetching links:', error);
+    }
+  };
+
+  const shown = Object.keys(links || {}).length + Object.keys(more).length;
+  return (
+    <ul style={{ margin: 10, padding: 5, textAlign: 'left' }}>
+      <LinkEntries pk={pk} kind={kind} links={{ ...(links || {}), ...more }} linkTo={linkTo} />
+      {total > shown && <LoadMore onClick={loadMore} />}
+    </ul>
+  );
+}
+
+export default NodeLinks;
@@ -14,6 +14,7 @@ import 'react-toastify/dist/ReactToastify.css';
 import useNodeTable from '../hooks/useNodeTable';
 import { IconButton, Tooltip } from '@mui/material';
 import { ConfirmDeleteModal } from './Modals';
+import DeletePreview from './DeletePreview';
 import { Delete } from '@mui/icons-material';
 
 /* --------- MUI DataGrid ↔︎ MUI Pagination bridge --------- */
@@ -53,7 +54,7 @@ export default function NodeTable({
   endpointBase,
   linkPrefix,
   actionBase,
-  config, // { columns, buildExtraActions, editableFields, includeDeleteGroupNodesOption? }
+  config, // { columns, buildExtraActions, buildBulkActions?, editableFields, includeDeleteGroupNodesOption? }
 }) {
   const {
     rows, rowCount,
@@ -70,6 +71,8 @@ export default function NodeTable({
   const [modalBody,   setModalBody]   = useState(null);
   const [onConfirm,   setOnConfirm]   = useState(() => () => {});
   const [deleteGroupNodes, setDeleteGroupNodes] = useState(false); // only used by group delete
+  /* selected row ids, for tables with bulk actions */
+  const [selection, setSelection] = useState([]);
 
   /** open any confirm‑modal */
   const openConfirmModal = (title, body, confirmFn) => {
@@ -103,20 +106,38 @@ export default function NodeTable({
   };
 
   /* ───────────────────────── delete‑modal helper ─────────────────────────── */
+  /* deletes run as background jobs; report their progress in a toast */
+  const followDeleteJob = (jobId, refetchLocal) => {
+    const toastId = toast.info('Deleting…', { autoClose:false });
+    const source = new EventSource(`/api/jobs/${jobId}/stream`);
+    source.addEventListener('progress', e => {
+      const { stage, progress, total } = JSON.parse(e.data);
+      toast.update(toastId, {
+        render: stage === 'deleting'
+          ? `Deleting ${total} nodes…`
+          : `Deleting… ${progress} nodes found`,
+      });
+    });
+    source.addEventListener('end', e => {
+      const { status, result, error } = JSON.parse(e.data);
+      source.close();
+      toast.dismiss(toastId);
+      if (status === 'done' && result?.deleted) {
+        toast.success(`Deleted ${result.count} nodes`);
+      } else {
+        toast.error(`Delete ${status}${error ? ` – ${error.split('\n')[0]}` : ''}`);
+      }
+      refetchLocal();
+    });
+    source.onerror = () => { source.close(); toast.dismiss(toastId); };
+  };
+
   const askDelete = (row, refetchLocal) => {
-    fetch(`${endpointBase}/delete/${row.pk}?dry_run=True`, { method:'DELETE' })
+    fetch(`${endpointBase}/delete/${row.pk}?dry_run=True&background=True`, { method:'DELETE' })
       .then(r => r.json())
-      .then(({ deleted_nodes }) => {
-        const deps = deleted_nodes.filter(pk => pk !== row.pk);
-
-        /* default body */
-        let body = (
-          <p>
-            Delete&nbsp;PK&nbsp;{row.pk}&nbsp;and&nbsp;{deps.length}&nbsp;dependents?&nbsp;
-            <b>The deletion is irreversible.</b>
-            <br/><br/>{deps.join(', ')}
-          </p>
-        );
+      .then(({ job_id }) => {
+        /* default body: the dependents, listed as the dry run finds them */
+        let body = <DeletePreview jobId={job_id} pk={row.pk} />;
 
         /* extra checkbox for Group‑nodes (optional flag in config) */
         if (config.includeDeleteGroupNodesOption) {
@@ -138,19 +159,15 @@ export default function NodeTable({
 
         /* confirm handler */
         const confirmFn = () => {
-          const url = `${endpointBase}/delete/${row.pk}` +
+          const url = `${endpointBase}/delete/${row.pk}?background=True` +
                       (config.includeDeleteGroupNodesOption && deleteGroupNodes
-                        ? '?delete_nodes=True'
+                        ? '&delete_nodes=True'
                         : '');
 
           fetch(url, { method:'DELETE' })
             .then(r => r.json())
-            .then(({ deleted, message }) =>
-              deleted ? toast.success(message)
-                      : toast.error('Delete failed'))
-            .finally(() => {
-              refetchLocal();
-            });
+            .then(({ job_id: deleteJobId }) => followDeleteJob(deleteJobId, refetchLocal))
+            .catch(() => toast.error('Delete failed'));
         };
 
         openConfirmModal('Confirm deletion', body, confirmFn);
@@ -188,6 +205,13 @@ export default function NodeTable({
     <div style={{ padding:'1rem' }}>
       <h2>{title}</h2>
 
+      {config.buildSummary?.({ endpointBase, filterModel, setFilter })}
+
+      {config.buildBulkActions?.({
+        selection, filterModel, actionBase, refetch, openConfirmModal,
+        clearSelection: () => setSelection([]),
+      })}
+
       <DataGrid
         /* server‑side stuff */
         rows={rows} rowCount={rowCount}
@@ -205,6 +229,13 @@ export default function NodeTable({
         columnVisibilityModel={columnVisibilityModel}
         onColumnVisibilityModelChange={setColumnVisibilityModel}
 
+        /* row selection for bulk actions */
+        checkboxSelection={!!config.buildBulkActions}
+        rowSelectionModel={selection}
+        onRowSelectionModelChange={setSelection}
+        keepNonExistentRowsSelected
+        disableRowSelectionOnClick
+
         /* inline editing */
         editMode="cell"
         processRowUpdate={processRowUpdate}
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import Timeline from 'react-calendar-timeline';
 import 'react-calendar-timeline/lib/Timeline.css';
 import moment from 'moment';
@@ -11,15 +11,34 @@ const NodeDurationGraph = ({ id }) => {
     const [timeEnd, setTimeEnd] = useState(null);
     const [initialLoad, setInitialLoad] = useState(true);
     const [useItemType, setUseItemType] = useState("called_process");
+    const etagRef = useRef({ url: null, etag: null });
+    // latest mtime seen, so polls only fetch the processes changed since
+    const sinceRef = useRef(null);
 
     const fetchData = async () => {
         try {
-            const response = await fetch(`/api/workchain-state/${id}?item_type=${useItemType}`);
+            let url = `/api/workchain-state/${id}?item_type=${useItemType}`;
+            if (sinceRef.current) {
+                url += `&since=${encodeURIComponent(sinceRef.current)}`;
+            }
+            const headers = etagRef.current.url === url && etagRef.current.etag
+                ? { 'If-None-Match': etagRef.current.etag }
+                : {};
+            const response = await fetch(url, { headers });
+            if (response.status === 304) {
+                return;
+            }
             if (!response.ok) {
                 throw new Error('Network response was not ok');
             }
+            etagRef.current = { url, etag: response.headers.get('ETag') };
             const data = await response.json();
-            setProcessesInfo(data);
+            Object.values(data).forEach(({ mtime }) => {
+                if (mtime && (!sinceRef.current || moment(mtime).isAfter(sinceRef.current))) {
+                    sinceRef.current = mtime;
+                }
+            });
+            setProcessesInfo((prev) => ({ ...prev, ...data }));
         } catch (error) {
             console.error('Error fetching data:', error);
         }
@@ -27,6 +46,8 @@ const NodeDurationGraph = ({ id }) => {
 
     useEffect(() => {
         setInitialLoad(true);
+        sinceRef.current = null;
+        setProcessesInfo({});
         fetchData();
         const interval = setInterval(fetchData, 5000);
         return () => clearInterval(interval);
@@ -4,6 +4,7 @@ import { Button } from 'antd';
 import { PageContainer, TopMenu } from './ProcessItemStyles';
 import ProcessSummary from './ProcessSummary';
 import ProcessLog from './ProcessLog';
+import RepositoryBrowser from './RepositoryBrowser';
 
 export default function Process() {
   const { pk } = useParams();
@@ -22,10 +23,12 @@ export default function Process() {
       <TopMenu>
         <Button onClick={() => setView('Summary')}>Summary</Button>
         <Button onClick={() => setView('Log')}>Log</Button>
+        <Button onClick={() => setView('Files')}>Files</Button>
       </TopMenu>
 
       {view === 'Summary' && summary && <ProcessSummary summary={summary} />}
       {view === 'Log'      && <ProcessLog id={pk} />}
+      {view === 'Files'    && <RepositoryBrowser pk={pk} />}
     </PageContainer>
   );
 }
@@ -1,6 +1,6 @@
 // ProcessLog.js
 import styled from "styled-components";
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 
 
 export const ProcessLogStyle = styled.div`
@@ -25,39 +25,143 @@ export const ProcessLogStyle = styled.div`
 }
 `;
 
+const LINE_HEIGHT = 24; // px, every log line has the same height
+const PAGE_SIZE = 200; // records fetched per range request
+const OVERSCAN = 20; // lines rendered above and below the visible ones
+
 function ProcessLog({ id }) {
-  const [fetchedLogs, setFetchedLogs] = useState([]);
+  // Log lines by index; only the pages scrolled into view are fetched
+  const linesRef = useRef([]);
+  const pagesRef = useRef(new Set());
+  const containerRef = useRef(null);
+  // Keep showing the newest lines while the view is scrolled to the end
+  const followRef = useRef(true);
+  const [total, setTotal] = useState(0);
+  const [, setVersion] = useState(0);
+  const [scrollTop, setScrollTop] = useState(0);
+  const [viewHeight, setViewHeight] = useState(600);
+
+  const storeRecords = (start, records) => {
+    records.forEach((record, index) => {
+      linesRef.current[start + index] = record.line;
+    });
+    setVersion((version) => version + 1);
+  };
+
+  const fetchPage = async (page) => {
+    if (pagesRef.current.has(page)) return;
+    pagesRef.current.add(page);
+    try {
+      const response = await fetch(
+        `/api/process-logs/${id}/range?start=${page * PAGE_SIZE}&stop=${(page + 1) * PAGE_SIZE}`
+      );
+      if (!response.ok) throw new Error("Failed to fetch log range");
+      const data = await response.json();
+      storeRecords(data.start, data.records);
+    } catch (error) {
+      pagesRef.current.delete(page);
+      console.error("Error fetching logs:", error);
+    }
+  };
 
   useEffect(() => {
-    fetchLogs(); // Fetch logs immediately
+    linesRef.current = [];
+    pagesRef.current = new Set();
+    followRef.current = true;
+    setTotal(0);
+    let source = null;
+    let closed = false;
 
-    const interval = setInterval(() => {
-      fetchLogs();
-    }, 4000);
+    const follow = async () => {
+      // Fetch the tail of the report, then append the records written from now on
+      const response = await fetch(`/api/process-logs/${id}/range?start=-${PAGE_SIZE}`);
+      if (!response.ok) throw new Error("Failed to fetch logs");
+      const data = await response.json();
+      if (closed) return;
+      storeRecords(data.start, data.records);
+      let count = data.total;
+      setTotal(count);
+      const after = data.records.length ? data.records[data.records.length - 1].id : 0;
+      // A reconnecting source resumes after the last record it received
+      source = new EventSource(`/api/process-logs/${id}/stream?after=${after}`);
+      source.addEventListener("log", (event) => {
+        const records = JSON.parse(event.data);
+        storeRecords(count, records);
+        count += records.length;
+        setTotal(count);
+      });
+      // The process is sealed, no more records will come
+      source.addEventListener("end", () => source.close());
+    };
+    follow().catch((error) => console.error("Error fetching logs:", error));
 
     return () => {
-      clearInterval(interval);
+      closed = true;
+      source?.close();
     };
+  }, [id]);
+
+  useEffect(() => {
+    const container = containerRef.current;
+    if (!container) return;
+    const measure = () => setViewHeight(container.clientHeight);
+    measure();
+    window.addEventListener("resize", measure);
+    return () => window.removeEventListener("resize", measure);
   }, []);
 
-  const fetchLogs = async () => {
-    try {
-      const response = await fetch(`/api/process-logs/${id}`);
-      const data = await response.json();
-      setFetchedLogs(data);
-    } catch (error) {
-      console.error("Error fetching logs:", error);
+  useEffect(() => {
+    const container = containerRef.current;
+    if (followRef.current && container) {
+      container.scrollTop = container.scrollHeight;
     }
+  }, [total]);
+
+  const handleScroll = (event) => {
+    const container = event.currentTarget;
+    setScrollTop(container.scrollTop);
+    followRef.current =
+      container.scrollTop + container.clientHeight >= container.scrollHeight - LINE_HEIGHT;
   };
 
+  const first = Math.max(0, Math.floor(scrollTop / LINE_HEIGHT) - OVERSCAN);
+  const last = Math.min(total, Math.ceil((scrollTop + viewHeight) / LINE_HEIGHT) + OVERSCAN);
+
+  useEffect(() => {
+    for (let index = first; index < last; index++) {
+      if (linesRef.current[index] === undefined) {
+        const page = Math.floor(index / PAGE_SIZE);
+        fetchPage(page);
+        index = (page + 1) * PAGE_SIZE - 1;
+      }
+    }
+  }, [first, last]);
+
+  const rows = [];
+  for (let index = first; index < last; index++) {
+    rows.push(
+      <div
+        key={index}
+        style={{ position: "absolute", top: index * LINE_HEIGHT, height: LINE_HEIGHT, lineHeight: `${LINE_HEIGHT}px` }}
+      >
+        {linesRef.current[index] ?? ""}
+      </div>
+    );
+  }
+
   return (
     <ProcessLogStyle>
       <div className="log-section">
         <h3>Log Information</h3>
-        <div className="log-content">
-          {fetchedLogs.map((log, index) => (
-            <div key={index}>{log}</div>
-          ))}
+        <div
+          className="log-content"
+          ref={containerRef}
+          onScroll={handleScroll}
+          style={{ height: "70vh", width: "100%", overflowY: "auto" }}
+        >
+          <div style={{ position: "relative", height: total * LINE_HEIGHT }}>
+            {rows}
+          </div>
         </div>
       </div>
     </ProcessLogStyle>
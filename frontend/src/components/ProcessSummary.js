@@ -2,6 +2,7 @@
 import styled from "styled-components";
 import { Prism as SyntaxHighlighter } from 'react-syntax-highlighter';
 import { dark } from 'react-syntax-highlighter/dist/esm/styles/prism'; // Correct import for 'dark' style
+import NodeLinks from './NodeLinks';
 
 export const WorkFlowInfoStyle = styled.div`
   width: 50%;
@@ -64,46 +65,24 @@ export const WorkFlowInfoStyle = styled.div`
 
 function ProcessSummary({ summary }) {
 
-  const renderInputs = (inputs, depth = 0) => {
-    return Object.entries(inputs).map(([key, value]) => {
-      const nodeId = Array.isArray(value) ? value[0] : value;
-      const nodeType = Array.isArray(value) ? value[2] : null;
+  const pk = summary.table?.find(([property]) => property === 'pk')?.[1];
+  const truncated = summary.truncated || {};
 
-      let prefix = '/datanode'; // default
+  const linkTo = (nodeType) => {
+    let prefix = '/datanode'; // default
 
-      if (nodeType) {
-        if (nodeType.startsWith('data')) {
-          prefix = '/datanode';
-        } else if (nodeType.endsWith('WorkGraphNode.')) {
-          prefix = '/workgraph';
-        } else if (nodeType.endsWith('WorkChainNode.')) {
-          prefix = '/workchain';
-        } else {
-          prefix = '/process';
-        }
-      }
-
-      if (Array.isArray(value)) {
-        return (
-          <li key={key}>
-            <span >
-              {key}: <a href={`${prefix}/${nodeId}`}>{nodeId}</a>
-            </span>
-          </li>
-        );
-      } else if (typeof value === 'object') {
-        return (
-          <li key={key}>
-            <span >
-              {key}:
-            </span>
-            <ul>{renderInputs(value, depth + 1)}</ul>
-          </li>
-        );
+    if (nodeType) {
+      if (nodeType.startsWith('data')) {
+        prefix = '/datanode';
+      } else if (nodeType.endsWith('WorkGraphNode.')) {
+        prefix = '/workgraph';
+      } else if (nodeType.endsWith('WorkChainNode.')) {
+        prefix = '/workchain';
       } else {
-        return null; // or handle other types if needed
+        prefix = '/process';
       }
-    });
+    }
+    return prefix;
   };
 
   return (
@@ -122,33 +101,25 @@ function ProcessSummary({ summary }) {
         <TaskDetailsTitle>Inputs:</TaskDetailsTitle>
       </div>
       <TaskDetailsTable>
-        <ul style={{ margin: 10, padding: 5, textAlign: 'left' }}>
-          {renderInputs(summary.inputs)}
-        </ul>
+        <NodeLinks pk={pk} kind="inputs" links={summary.inputs} total={truncated.inputs} linkTo={linkTo} />
       </TaskDetailsTable>
       <div>
         <TaskDetailsTitle>Outputs:</TaskDetailsTitle>
       </div>
       <TaskDetailsTable>
-        <ul style={{ margin: 10, padding: 5, textAlign: 'left' }}>
-          {renderInputs(summary.outputs)}
-        </ul>
+        <NodeLinks pk={pk} kind="outputs" links={summary.outputs} total={truncated.outputs} linkTo={linkTo} />
       </TaskDetailsTable>
       <div>
         <TaskDetailsTitle>Caller Processes:</TaskDetailsTitle>
       </div>
       <TaskDetailsTable>
-        <ul style={{ margin: 10, padding: 5, textAlign: 'left' }}>
-          {renderInputs(summary.caller)}
-        </ul>
+        <NodeLinks pk={pk} kind="caller" links={summary.caller} total={truncated.caller} linkTo={linkTo} />
       </TaskDetailsTable>
       <div>
         <TaskDetailsTitle>Called Processes:</TaskDetailsTitle>
       </div>
       <TaskDetailsTable>
-        <ul style={{ margin: 10, padding: 5, textAlign: 'left' }}>
-          {renderInputs(summary.called)}
-        </ul>
+        <NodeLinks pk={pk} kind="called" links={summary.called} total={truncated.called} linkTo={linkTo} />
       </TaskDetailsTable>
     </div>
     </WorkFlowInfoStyle>
@@ -1,10 +1,23 @@
-import { IconButton, Tooltip } from '@mui/material';
+import { useEffect, useState } from 'react';
+import { Box, Button, Chip, IconButton, Tooltip, Typography } from '@mui/material';
 import { Pause, PlayArrow, HighlightOff } from '@mui/icons-material';
+import { GridFilterInputValue, getGridStringOperators } from '@mui/x-data-grid';
 import { toast } from 'react-toastify';       // NEW
 import NodeTable from './NodeTable';
+import useJob from '../hooks/useJob';
 import { Link } from 'react-router-dom';
 
 
+/* the exact match the facet chips narrow the table with; the server
+   treats the grid's own `equals` as a substring match */
+const exactlyOperator = {
+  label: 'is exactly',
+  value: 'exactly',
+  getApplyFilterFn: () => null,
+  InputComponent: GridFilterInputValue,
+};
+const facetOperators = [...getGridStringOperators(), exactlyOperator];
+
 export const processColumns = linkPrefix => ([
   {
     field: 'pk',
@@ -26,12 +39,14 @@ export const processColumns = linkPrefix => ([
     }
   },
   { field:'ctime', headerName:'Created',     width:150 },
-  { field:'process_label', headerName:'Process label', width:260, sortable:false },
+  { field:'process_label', headerName:'Process label', width:260, sortable:false,
+    filterOperators: facetOperators },
   {
     field: 'process_state',
     headerName: 'State',
     width: 140,
     sortable: false,
+    filterOperators: facetOperators,
     renderCell: ({ row }) => {
       const { process_state, exit_status } = row;
       let color = 'inherit';
@@ -122,6 +137,122 @@ export function extraProcessActions(row, { actionBase, refetch, openConfirmModal
   return <>{buttons}</>;
 }
 
+/* pause / play / kill the selected processes, or all active ones matching
+   the filter, in one request; the outcome is followed through its job */
+function BulkProcessActions({ selection, filterModel, actionBase, refetch, openConfirmModal, clearSelection }) {
+  const [job, setJob] = useState(null);
+  const progress = useJob(job?.id, (summary) => {
+    const { ok = 0, failed = 0, skipped = 0, timeout = 0 } = summary.counts;
+    const text = `${job.action}: ${ok} ok, ${failed} failed, ${skipped} skipped, ${timeout} timed out`;
+    (failed || timeout ? toast.warning : toast.success)(text);
+    setJob(null);
+    clearSelection();
+    refetch();
+  });
+
+  const target = selection.length ? `${selection.length} selected` : 'all matching';
+  const run = (action) => {
+    const body = selection.length ? { pks: selection } : { filterModel };
+    fetch(`${actionBase}/${action}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body),
+    })
+      .then((r) => (r.ok ? r.json() : r.json().then((e) => Promise.reject(new Error(e.detail)))))
+      .then((data) => setJob({ id: data.job_id, action }))
+      .catch((e) => toast.error(`${action} failed: ${e.message}`));
+  };
+
+  return (
+    <Box sx={{ display: 'flex', alignItems: 'center', gap: 1, mb: 1 }}>
+      <Button size="small" startIcon={<Pause/>} disabled={!!job} onClick={() => run('pause')}>
+        Pause {target}
+      </Button>
+      <Button size="small" startIcon={<PlayArrow/>} disabled={!!job} onClick={() => run('play')}>
+        Play {target}
+      </Button>
+      <Button
+        size="small" color="error" startIcon={<HighlightOff/>} disabled={!!job}
+        onClick={() => openConfirmModal(
+          'Kill processes',
+          <p>Kill {target} processes?<br/><b>This action is irreversible.</b></p>,
+          () => run('kill'),
+        )}
+      >
+        Kill {target}
+      </Button>
+      {job && progress && (
+        <Typography variant="body2">
+          {job.action}: {progress.total - (progress.counts.pending || 0)} / {progress.total}
+        </Typography>
+      )}
+    </Box>
+  );
+}
+
+// the facet counts follow the table while it is open
+const FACET_POLL_INTERVAL = 10000;
+// values shown per facet, the rest are summed up as "other"
+const FACET_VALUES = 8;
+const FACET_TITLES = {
+  process_state: 'State',
+  process_label: 'Process label',
+  exit_status: 'Exit status',
+  computer: 'Computer',
+};
+
+/* counts of the processes matching the filter per state, label, exit status
+   and computer; clicking a state or label narrows the filter to it */
+function ProcessFacets({ endpointBase, filterModel, setFilter }) {
+  const [facets, setFacets] = useState(null);
+
+  useEffect(() => {
+    let active = true;
+    const url = `${endpointBase}-data/facets?filterModel=${encodeURIComponent(JSON.stringify(filterModel))}`;
+    const load = () => fetch(url)
+      .then((r) => (r.ok ? r.json() : Promise.reject(new Error(r.statusText))))
+      .then((data) => active && setFacets(data.facets))
+      .catch((e) => console.error('Error fetching facets:', e));
+    load();
+    const timer = setInterval(load, FACET_POLL_INTERVAL);
+    return () => { active = false; clearInterval(timer); };
+  }, [endpointBase, filterModel]);
+
+  if (!facets) return null;
+
+  const narrow = (field, value) => setFilter({
+    ...filterModel,
+    items: [
+      ...(filterModel.items || []).filter((item) => item.field !== field),
+      { id: field, field, operator: 'exactly', value: String(value) },
+    ],
+  });
+
+  return (
+    <Box sx={{ mb: 1 }}>
+      {Object.entries(FACET_TITLES).map(([field, title]) => {
+        const values = facets[field] || [];
+        const other = values.slice(FACET_VALUES).reduce((sum, { count }) => sum + count, 0);
+        const clickable = field === 'process_state' || field === 'process_label';
+        return (
+          <Box key={field} sx={{ display: 'flex', alignItems: 'center', flexWrap: 'wrap', gap: 0.5, mb: 0.5 }}>
+            <Typography variant="body2" sx={{ minWidth: 100 }}>{title}</Typography>
+            {values.slice(0, FACET_VALUES).map(({ value, count }) => (
+              <Chip
+                key={String(value)}
+                size="small"
+                label={`${value ?? '–'}: ${count}`}
+                onClick={clickable && value !== null ? () => narrow(field, value) : undefined}
+              />
+            ))}
+            {other > 0 && <Chip size="small" variant="outlined" label={`other: ${other}`} />}
+          </Box>
+        );
+      })}
+    </Box>
+  );
+}
+
 export function ProcessTable() {
     return (
       <NodeTable
@@ -132,6 +263,8 @@ export function ProcessTable() {
         config={{
           columns       : processColumns,
           buildExtraActions: extraProcessActions,
+          buildSummary: (props) => <ProcessFacets {...props} />,
+          buildBulkActions: (props) => <BulkProcessActions {...props} />,
           editableFields: ['label', 'description'],
         }}
       />
@@ -0,0 +1,131 @@
+// RepositoryBrowser.js
+import React, { useEffect, useState } from 'react';
+
+const PAGE_SIZE = 500;
+// bytes of a file shown in the preview, the rest is downloaded on request
+const PREVIEW_BYTES = 64 * 1024;
+const TAIL_LINES = 200;
+
+const formatSize = (size) => {
+  if (size === null || size === undefined) return '';
+  if (size >= 1024 * 1024 * 1024) return `${(size / 1024 / 1024 / 1024).toFixed(1)} GB`;
+  if (size >= 1024 * 1024) return `${(size / 1024 / 1024).toFixed(1)} MB`;
+  if (size >= 1024) return `${(size / 1024).toFixed(1)} kB`;
+  return `${size} B`;
+};
+
+const joinPath = (dir, name) => (dir ? `${dir}/${name}` : name);
+
+function FilePreview({ pk, path }) {
+  const [text, setText] = useState('');
+  const [size, setSize] = useState(null);
+  const [mode, setMode] = useState('head');
+
+  const fileUrl = `/api/node/${pk}/repository/file?path=${encodeURIComponent(path)}`;
+
+  useEffect(() => {
+    const request = mode === 'tail'
+      ? fetch(`${fileUrl}&tail=${TAIL_LINES}`)
+      : fetch(fileUrl, { headers: { Range: `bytes=0-${PREVIEW_BYTES - 1}` } });
+    request
+      .then((response) => {
+        setSize(Number(response.headers.get('X-File-Size')));
+        return response.text();
+      })
+      .then(setText)
+      .catch((error) => console.error('Error fetching file:', error));
+  }, [fileUrl, mode]);
+
+  const truncated = size !== null && size > PREVIEW_BYTES;
+  return (
+    <div style={{ textAlign: 'left' }}>
+      <div>
+        <strong>{path}</strong> {formatSize(size)}{' '}
+        {truncated && (
+          <button type="button" onClick={() => setMode(mode === 'head' ? 'tail' : 'head')}>
+            {mode === 'head' ? `Last ${TAIL_LINES} lines` : 'Beginning'}
+          </button>
+        )}{' '}
+        <a href={fileUrl} download>Download</a>
+      </div>
+      <pre style={{ maxHeight: 600, overflow: 'auto', background: '#f5f5f5', padding: 10 }}>
+        {text}
+        {truncated && mode === 'head' && '\n…'}
+      </pre>
+    </div>
+  );
+}
+
+/**
+ * Browse the files in the repository of node `pk`. Directories are listed
+ * one level at a time and files are previewed by their first bytes or last
+ * lines, so large outputs are never downloaded whole.
+ */
+function RepositoryBrowser({ pk }) {
+  const [path, setPath] = useState('');
+  const [entries, setEntries] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [file, setFile] = useState(null);
+
+  const load = async (dir, skip) => {
+    const params = new URLSearchParams({ path: dir, skip, limit: PAGE_SIZE });
+    try {
+      const response = await fetch(`/api/node/${pk}/repository?${params}`);
+      const data = await response.json();
+      setEntries((prev) => [...(skip > 0 ? prev : []), ...(data.entries || [])]);
+      setTotal(data.total || 0);
+    } catch (error) {
+      console.error('Error fetching repository:', error);
+    }
+  };
+
+  useEffect(() => {
+    setFile(null);
+    load(path, 0);
+  }, [pk, path]);
+
+  if (!path && total === 0) {
+    return null;
+  }
+
+  const parts = path ? path.split('/') : [];
+  return (
+    <div style={{ margin: 10, textAlign: 'left' }}>
+      <h3>Repository</h3>
+      <div>
+        <span style={{ cursor: 'pointer' }} onClick={() => setPath('')}>/</span>
+        {parts.map((part, i) => (
+          <span key={i}>
+            <span style={{ cursor: 'pointer' }} onClick={() => setPath(parts.slice(0, i + 1).join('/'))}>
+              {part}
+            </span>
+            /
+          </span>
+        ))}
+      </div>
+      <ul>
+        {entries.map((entry) => (
+          <li key={entry.name}>
+            {entry.type === 'directory' ? (
+              <span style={{ cursor: 'pointer' }} onClick={() => setPath(joinPath(path, entry.name))}>
+                📁 {entry.name}/
+              </span>
+            ) : (
+              <span style={{ cursor: 'pointer' }} onClick={() => setFile(joinPath(path, entry.name))}>
+                {entry.name} <small>{formatSize(entry.size)}</small>
+              </span>
+            )}
+          </li>
+        ))}
+        {entries.length < total && (
+          <li>
+            <button type="button" onClick={() => load(path, entries.length)}>Load more</button>
+          </li>
+        )}
+      </ul>
+      {file && <FilePreview pk={pk} path={file} />}
+    </div>
+  );
+}
+
+export default RepositoryBrowser;
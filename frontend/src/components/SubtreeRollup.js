@@ -0,0 +1,54 @@
+// SubtreeRollup.js
+import React, { useEffect, useState } from 'react';
+
+// the rollup answers 304 while nothing changed, so polling is cheap
+const ROLLUP_POLL_INTERVAL = 5000;
+const TERMINATED_STATES = ['finished', 'excepted', 'killed'];
+const STATE_COLORS = {
+  finished: 'green',
+  excepted: 'red',
+  killed: 'red',
+  running: 'blue',
+  waiting: 'orange',
+};
+
+/**
+ * Progress of the whole subtree of processes called by workflow `pk`: the
+ * number of processes per state, with when the first one was created and
+ * when the last change happened.
+ */
+function SubtreeRollup({ pk }) {
+  const [rollup, setRollup] = useState(null);
+
+  useEffect(() => {
+    let active = true;
+    const load = () => fetch(`/api/workchain/${pk}/rollup`)
+      .then((r) => (r.ok ? r.json() : Promise.reject(new Error(r.statusText))))
+      .then((data) => active && setRollup(data))
+      .catch((e) => console.error('Error fetching rollup:', e));
+    load();
+    const timer = setInterval(load, ROLLUP_POLL_INTERVAL);
+    return () => { active = false; clearInterval(timer); };
+  }, [pk]);
+
+  if (!rollup || !rollup.total) return null;
+
+  const done = Object.entries(rollup.states)
+    .filter(([state]) => TERMINATED_STATES.includes(state))
+    .reduce((sum, [, count]) => sum + count, 0);
+  return (
+    <div style={{ margin: '4px 10px', textAlign: 'left', fontSize: '0.9em' }}>
+      <progress value={done} max={rollup.total} style={{ marginRight: 8 }} />
+      {done}/{rollup.total} processes terminated:{' '}
+      {Object.entries(rollup.states).map(([state, count]) => (
+        <span key={state} style={{ color: STATE_COLORS[state] || 'inherit', marginRight: 8 }}>
+          {state} {count}
+        </span>
+      ))}
+      {rollup.ctime && <span>· started {new Date(rollup.ctime).toLocaleString()}</span>}
+      {rollup.mtime && <span> · last change {new Date(rollup.mtime).toLocaleString()}</span>}
+    </div>
+  );
+}
+
+export default SubtreeRollup;
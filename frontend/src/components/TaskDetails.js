@@ -3,6 +3,7 @@ import styled from 'styled-components';
 import { Prism as SyntaxHighlighter } from 'react-syntax-highlighter';
 import { dark } from 'react-syntax-highlighter/dist/esm/styles/prism';
 import { useNavigate } from 'react-router-dom';
+import NodeLinks from './NodeLinks';
 
 const WorkFlowButton = styled.button`
   padding: 10px;
@@ -178,32 +179,6 @@ function TaskDetails({
     isButtonDisabled = !['RUNNING', 'FINISHED', 'FAILED'].includes(nodeState);
   }
 
-  /**
-   * Render a nested list of inputs or outputs.
-   */
-  const renderInputs = (inputs, depth = 0) => {
-    return Object.entries(inputs).map(([key, value]) => {
-      if (Array.isArray(value)) {
-        // e.g. [nodeId, nodeType]
-        const nodeId = value[0];
-        return (
-          <li key={key}>
-            {key}: <a href={`/datanode/${nodeId}`}>{nodeId}</a>
-          </li>
-        );
-      } else if (typeof value === 'object' && value !== null) {
-        // Nested dictionary
-        return (
-          <li key={key}>
-            {key}:
-            <ul>{renderInputs(value, depth + 1)}</ul>
-          </li>
-        );
-      }
-      return null;
-    });
-  };
-
   return (
     <TaskDetailsPanel>
       <CloseButton onClick={handleClose}>Close</CloseButton>
@@ -237,9 +212,13 @@ function TaskDetails({
         <TaskDetailsTitle>Inputs:</TaskDetailsTitle>
       </div>
       <TaskDetailsTable>
-        <ul style={{ margin: 10, padding: 5, textAlign: 'left' }}>
-          {renderInputs(selectedNode.inputs || {})}
-        </ul>
+        <NodeLinks
+          pk={processPk}
+          kind="inputs"
+          links={selectedNode.inputs}
+          total={selectedNode.truncated?.inputs}
+          linkTo={() => '/datanode'}
+        />
       </TaskDetailsTable>
 
       {/* Outputs */}
@@ -247,9 +226,13 @@ function TaskDetails({
         <TaskDetailsTitle>Outputs:</TaskDetailsTitle>
       </div>
       <TaskDetailsTable>
-        <ul style={{ margin: 10, padding: 5, textAlign: 'left' }}>
-          {renderInputs(selectedNode.outputs || {})}
-        </ul>
+        <NodeLinks
+          pk={processPk}
+          kind="outputs"
+          links={selectedNode.outputs}
+          total={selectedNode.truncated?.outputs}
+          linkTo={() => '/datanode'}
+        />
       </TaskDetailsTable>
 
       {/* Executor code */}
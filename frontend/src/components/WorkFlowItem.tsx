@@ -9,6 +9,8 @@ import ProcessSummary from './ProcessSummary';
 import ProcessLog from './ProcessLog';
 import TaskDetails from './TaskDetails';
 import NodeDurationGraph from './ProcessDuration'
+import useJob from '../hooks/useJob';
+import SubtreeRollup from './SubtreeRollup';
 import {
   PageContainer,
   EditorContainer,
@@ -84,6 +86,8 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
   const [selectedView, setSelectedView] = useState('Editor');
   const [realtimeSwitch, setRealtimeSwitch] = useState(false); // State to manage the realtime switch
   const [detailNodeViewSwitch, setDetailNodeViewSwitch] = useState(false); // State to manage the realtime switch
+  const stateEtagRef = useRef<string | null>(null); // ETag of the last state data, to skip unchanged polls
+  const stateSinceRef = useRef<string | null>(null); // latest mtime seen, to only fetch the changed processes
 
   // This is the base path: /process/45082/
   const basePath = `/${pathType}/${pk}/`;
@@ -99,11 +103,24 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
   // Fetch state data from the backend
   const fetchStateData = async () => {
     try {
-      const response = await fetch(`${endPoint}-state/${pk}`);
+      const headers: Record<string, string> = stateEtagRef.current
+        ? { 'If-None-Match': stateEtagRef.current }
+        : {};
+      const since = stateSinceRef.current ? `?since=${encodeURIComponent(stateSinceRef.current)}` : '';
+      const response = await fetch(`${endPoint}-state/${pk}${since}`, { headers });
+      if (response.status === 304) {
+        return;
+      }
       if (!response.ok) {
         throw new Error('Failed to fetch state data');
       }
+      stateEtagRef.current = response.headers.get('ETag');
       const data = await response.json();
+      Object.values(data).forEach((info: any) => {
+        if (info.mtime && (!stateSinceRef.current || Date.parse(info.mtime) > Date.parse(stateSinceRef.current))) {
+          stateSinceRef.current = info.mtime;
+        }
+      });
       // Call changeTitleColor here to update title colors based on the new state data
       changeTitleColor(data);
     } catch (error) {
@@ -153,13 +170,24 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
   // Setup interval for fetching real-time data when the switch is turned on
   useEffect(() => {
     let intervalId: NodeJS.Timeout;
+    let source: EventSource | null = null;
     if (realtimeSwitch) {
-      // Fetch data initially
+      // Fetch data initially, without ETag so the colors are always re-applied
+      stateEtagRef.current = null;
+      stateSinceRef.current = null;
       fetchStateData();
-      // Set up an interval to fetch data every 5 seconds
-      intervalId = setInterval(fetchStateData, 5000);
+      // Refresh whenever a process in this workchain changes state
+      source = new EventSource(`/api/events?workchain=${pk}`);
+      source.addEventListener('state', () => fetchStateData());
+      // Fall back to polling every 5 seconds while the event stream is down
+      intervalId = setInterval(() => {
+        if (source?.readyState !== EventSource.OPEN) {
+          fetchStateData();
+        }
+      }, 5000);
     }
     return () => {
+      source?.close();
       if (intervalId) {
         clearInterval(intervalId); // Clear the interval when the component unmounts or the switch is turned off
       }
@@ -202,6 +230,25 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
       .catch((error) => console.error('Error fetching data:', error));
   }, [pk, subPath]); // Only re-run when `pk` changes
 
+  // Replace a collapsed node by the processes it stands for
+  const expandCollapsedNode = async (key: string, nodeData: any) => {
+    const { parent, skip } = nodeData.expand;
+    try {
+      const response = await fetch(`${endPoint}/${pk}/expand?parent=${parent}&skip=${skip}`);
+      if (!response.ok) {
+        throw new Error('Failed to expand node');
+      }
+      const data = await response.json();
+      setWorkFlowData((prev: any) => {
+        const nodes = { ...prev.nodes };
+        delete nodes[key];
+        return { ...prev, nodes: { ...nodes, ...data.nodes }, links: [...prev.links, ...data.links] };
+      });
+    } catch (error) {
+      console.error('Error expanding node:', error);
+    }
+  };
+
   // Setup editor event listener
   useEffect(() => {
     if (editor) {
@@ -211,6 +258,13 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
         if (context.type === 'nodepicked') {
           const pickedId = context.data.id;
           const node = editor.editor.getNode(pickedId);
+          const collapsed = Object.entries(workFlowData.nodes).find(
+            ([, nodeData]: [string, any]) => nodeData.collapsed && nodeData.label === node.label
+          );
+          if (collapsed) {
+            expandCollapsedNode(collapsed[0], collapsed[1]);
+            return context;
+          }
 
           try {
             // Fetch data from the backend
@@ -262,6 +316,30 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
   ), [workFlowHierarchy, editor, showTaskDetails, selectedNode]); // Specify dependencies
 
 
+  /* the running task action: the job collecting the outcome per task */
+  const [taskOperation, setTaskOperation] = useState<any>(null);
+
+  const handleTaskOperationEnd = async (summary: any) => {
+    const { action, tasks, notStarted } = taskOperation;
+    try {
+      const job = await (await fetch(`/api/jobs/${summary.id}`)).json();
+      const failed = Object.entries(tasks as Record<string, number>)
+        .filter(([, taskPk]) => job.results[taskPk]?.status !== 'ok' && job.results[taskPk]?.status !== 'skipped')
+        .map(([name, taskPk]) => `${name}: ${job.results[taskPk]?.message ?? job.results[taskPk]?.status}`);
+      failed.push(...notStarted.map((name: string) => `${name}: not started`));
+      if (failed.length) {
+        toast.error(`${action} failed for ${failed.length} task(s) – ${failed.join('; ')}`);
+      } else {
+        toast.success(`${action} performed on ${Object.keys(tasks).length} task(s).`);
+      }
+    } catch (error: any) {
+      toast.error(`Error fetching the outcome of ${action}: ${error.message}`);
+    }
+    setTaskOperation(null);
+  };
+
+  const taskOperationSummary = useJob(taskOperation?.id, handleTaskOperationEnd);
+
   const handleTaskAction = async (action: string) => {
     if (editor && editor.editor) {
         const selectedNodes = editor.editor.getNodes().filter((node: any) => node.selected);
@@ -269,7 +347,6 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
           name: node.label,
           pk: node.process?.pk, // use optional chaining in case process is undefined
         }));
-        console.log(nodePayload); // Good for debugging
 
         try {
             const response = await fetch(`/api/process/tasks/${action}/${pk}`, {
@@ -277,7 +354,7 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify(nodePayload), // Correct the body to match expected structure
+                body: JSON.stringify(nodePayload),
             });
 
             const data = await response.json();
@@ -285,8 +362,13 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
               // If response not OK, throw the backend message
               throw new Error(data.detail || `Failed to perform ${action}`);
             }
-            console.log(data.message); // Display backend response message
-            toast.success(`${action} action performed successfully on nodes.`);
+            // the outcome per task arrives through the job, see useJob
+            setTaskOperation({
+              id: data.job_id,
+              action,
+              tasks: data.tasks,
+              notStarted: data.not_started,
+            });
         } catch (error: any) {
             console.error('Error performing node action:', error);
             toast.error(`Error performing ${action}: ${error.message}`);
@@ -314,6 +396,7 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
           {selectedView === 'Time' && <NodeDurationGraph id={pk}/>}
           <EditorWrapper visible={selectedView === 'Editor'}>
           <ProcessBreadcrumbs parentProcesses={workFlowHierarchy} />
+          <SubtreeRollup pk={pk} />
             <EditorContainer>
               <LayoutAction>
               <div style={{ display: 'flex', alignItems: 'center' }}>
@@ -339,6 +422,13 @@ function WorkflowItem({pathType = 'workchain', endPoint = 'workchain'}) {
                 <Button onClick={handlePause}>Pause</Button>
                 <Button onClick={handlePlay}>Play</Button>
                 <Button onClick={handleKill}>Kill</Button>
+                {taskOperation && taskOperationSummary && (
+                  <span style={{ marginLeft: '10px' }}>
+                    {taskOperation.action}:{' '}
+                    {taskOperationSummary.total - (taskOperationSummary.counts?.pending ?? 0)}
+                    /{taskOperationSummary.total}
+                  </span>
+                )}
               </div>
               </LayoutAction>
               {showTaskDetails && (
@@ -0,0 +1,30 @@
+import { useEffect, useState } from 'react';
+
+/* Follow a job of /api/jobs: stream its progress until every item has its
+   outcome, then call `onEnd` with the summary. `onProgress` gets every
+   progress event, e.g. with the events a background job logged since the
+   previous one. Returns the latest summary. */
+export default function useJob(jobId, onEnd, onProgress) {
+  const [summary, setSummary] = useState(null);
+
+  useEffect(() => {
+    if (!jobId) return undefined;
+    const source = new EventSource(`/api/jobs/${jobId}/stream`);
+    source.addEventListener('progress', (event) => {
+      const data = JSON.parse(event.data);
+      const { results, events, ...rest } = data;
+      setSummary(rest);
+      onProgress?.(data);
+    });
+    source.addEventListener('end', (event) => {
+      const data = JSON.parse(event.data);
+      setSummary(data);
+      source.close();
+      onEnd?.(data);
+    });
+    source.onerror = () => source.close();
+    return () => source.close();
+  }, [jobId]);
+
+  return summary;
+}
@@ -1,5 +1,8 @@
 import { useState, useRef, useEffect, useCallback } from 'react';
 
+/* tables for which the server pushes process state changes (/api/events) */
+const EVENT_TABLES = ['process', 'workchain'];
+
 export default function useNodeTable(endpointBase) {
   const [rows, setRows]           = useState([]);
   const [rowCount, setRowCount]   = useState(0);
@@ -7,6 +10,12 @@ export default function useNodeTable(endpointBase) {
   const [sortModel, setSortModel] = useState([{ field: 'pk', sort: 'desc' }]);
   const [filterModel, setFilter]  = useState({ items: [] });
   const isFetchingRef = useRef(false);
+  /* page index → cursor query (`after=…` / `before=…`) for pages next to the
+     last fetched one; pages without a cursor fall back to offset paging.
+     Cursors are only valid for the query (sort / filter / size) they came from. */
+  const cursorsRef = useRef({ key: null, pages: {} });
+  /* ETag of the last page, so an unchanged page is answered with 304 */
+  const etagRef = useRef({ url: null, etag: null });
   /* hide description at first render – users can toggle in column menu */
   const [columnVisibilityModel, setColumnVisibilityModel] = useState({
     description: false,
@@ -23,27 +32,64 @@ export default function useNodeTable(endpointBase) {
     const skip  = page * pageSize;
     const sortField  = sortModel[0]?.field ?? 'pk';
     const sortOrder  = sortModel[0]?.sort  ?? 'desc';
+    const queryKey = JSON.stringify([endpointBase, pageSize, sortModel, filterModel]);
+    const cursor = cursorsRef.current.key === queryKey
+      ? cursorsRef.current.pages[page]
+      : undefined;
     const url =
-      `${endpointBase}-data?skip=${skip}&limit=${pageSize}` +
+      `${endpointBase}-data?limit=${pageSize}` +
+      (cursor ? `&${cursor}` : `&skip=${skip}`) +
       `&sortField=${sortField}&sortOrder=${sortOrder}` +
       `&filterModel=${encodeURIComponent(JSON.stringify(filterModel))}`;
 
-      fetch(url)
-      .then(r => r.json())
-      .then(({ data, total }) => {
+      const headers = etagRef.current.url === url && etagRef.current.etag
+        ? { 'If-None-Match': etagRef.current.etag }
+        : {};
+      fetch(url, { headers })
+      .then(r => {
+        if (r.status === 304) return null;
+        etagRef.current = { url, etag: r.headers.get('ETag') };
+        return r.json();
+      })
+      .then(result => {
+        if (!result) return;
+        const { data, total, prev_cursor, next_cursor } = result;
         setRows(data);
         setRowCount(total);
+        const pages = {};
+        if (cursor) pages[page] = cursor;
+        if (prev_cursor && page > 0) pages[page - 1] = `before=${encodeURIComponent(prev_cursor)}`;
+        if (next_cursor) pages[page + 1] = `after=${encodeURIComponent(next_cursor)}`;
+        cursorsRef.current = { key: queryKey, pages };
       })
       .catch((e) => console.error("Fetch error", e))
       .finally(() => { isFetchingRef.current = false; });
   }, [endpointBase, pagination, sortModel, filterModel]);
 
-  /* fetch on mount & whenever deps change */
+  /* fetch on mount & whenever deps change; process tables refetch when a
+     process changes state and otherwise poll every 30 s instead of every 3 s */
   useEffect(() => {
     fetchData();
-    const interval = setInterval(fetchData, 3000);
-    return () => clearInterval(interval);
-  }, [fetchData]);
+    const table = endpointBase.split('/').pop();
+    let source = null;
+    let pending = null;
+    if (EVENT_TABLES.includes(table)) {
+      source = new EventSource(`/api/events?table=${table}`);
+      source.addEventListener('state', () => {
+        if (!pending) pending = setTimeout(() => { pending = null; fetchData(); }, 500);
+      });
+    }
+    let ticks = 0;
+    const interval = setInterval(() => {
+      ticks += 1;
+      if (!source || source.readyState !== EventSource.OPEN || ticks % 10 === 0) fetchData();
+    }, 3000);
+    return () => {
+      clearInterval(interval);
+      clearTimeout(pending);
+      source?.close();
+    };
+  }, [fetchData, endpointBase]);
   /* reset to page 0 when a filter changes */
   useEffect(() => { setPagination(p => ({ ...p, page: 0 })); }, [filterModel]);
 
@@ -14,3 +14,1209 @@ def test_workgraph_route(client):
     """Sample test case for the root route"""
     response = client.get("/api/workchain-data")
     assert response.status_code == 200
+
+
+@pytest.mark.backend
+def test_node_data_cursor_pagination(client):
+    """Walking the table with cursors returns the same pages as offset paging."""
+    from aiida import orm
+
+    for value in range(5):
+        orm.Int(value).store()
+
+    first = client.get("/api/datanode-data", params={"limit": 2}).json()
+    second = client.get(
+        "/api/datanode-data", params={"limit": 2, "after": first["next_cursor"]}
+    ).json()
+    by_offset = client.get("/api/datanode-data", params={"limit": 2, "skip": 2}).json()
+    assert [row["pk"] for row in second["data"]] == [
+        row["pk"] for row in by_offset["data"]
+    ]
+
+    back = client.get(
+        "/api/datanode-data", params={"limit": 2, "before": second["prev_cursor"]}
+    ).json()
+    assert [row["pk"] for row in back["data"]] == [row["pk"] for row in first["data"]]
+
+
+@pytest.mark.backend
+def test_node_data_total_cache(client):
+    """The cached total follows newly stored nodes."""
+    from aiida import orm
+
+    before = client.get("/api/datanode-data").json()
+    assert before["approximate"] is False
+    orm.Int(1).store()
+    after = client.get("/api/datanode-data").json()
+    assert after["total"] == before["total"] + 1
+
+
+@pytest.mark.backend
+def test_group_members_total(client):
+    """Members added outside the GUI are counted at once."""
+    from aiida import orm
+
+    group = orm.Group(label="test_group_members_total").store()
+    nodes = [orm.Int(i).store() for i in range(3)]
+    group.add_nodes(nodes[:1])
+    url = f"/api/groupnode/{group.pk}/members-data"
+    assert client.get(url).json()["total"] == 1
+    # existing nodes, so the node table fingerprint does not move
+    group.add_nodes(nodes[1:])
+    assert client.get(url).json()["total"] == 3
+    group.remove_nodes(nodes[:1])
+    assert client.get(url).json()["total"] == 2
+
+
+@pytest.mark.backend
+def test_node_data_not_modified(client):
+    """Polling an unchanged table with the ETag returns 304 without a body."""
+    response = client.get("/api/datanode-data")
+    etag = response.headers["ETag"]
+    response = client.get("/api/datanode-data", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+@pytest.mark.backend
+def test_process_events_local_broker(aiida_profile):
+    """State-change broadcasts are fanned out to the matching subscriptions."""
+    import asyncio
+    from aiida import orm
+    from aiida_gui.app.events import LocalBroker, ProcessEventHub
+
+    node = orm.CalcFunctionNode()
+    node.store()
+    other = orm.CalcFunctionNode()
+    other.store()
+
+    async def receive():
+        hub = ProcessEventHub()
+        broker = LocalBroker()
+        hub.attach(broker)
+        subscription = hub.subscribe(asyncio.get_running_loop(), pks=[node.pk])
+        for pk in (other.pk, node.pk):
+            broker.broadcast_send(
+                None, sender=pk, subject="state_changed.running.finished"
+            )
+        return await asyncio.wait_for(subscription.queue.get(), timeout=10)
+
+    event = asyncio.run(receive())
+    assert event["pk"] == node.pk
+    assert event["state"] == "finished"
+
+
+@pytest.mark.backend
+@pytest.mark.parametrize("filter_model", ["{not json", "[1]", '{"items": 1}'])
+def test_events_invalid_filter(client, filter_model):
+    """A malformed filterModel of the event stream is a bad request."""
+    response = client.get(
+        "/api/events", params={"table": "process", "filterModel": filter_model}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.backend
+def test_single_flight_shares_concurrent_calls():
+    """Concurrent calls with the same key run the computation once."""
+    import threading
+    import time
+    from aiida_gui.app.cache import SingleFlight
+
+    flight = SingleFlight(window=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"value": 42}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 5
+    assert flight.do("key", compute) == {"value": 42}
+    assert flight.stats()["misses"] == 1
+
+
+@pytest.mark.backend
+def test_sealed_cache(tmp_path):
+    """Results of sealed nodes are cached and persisted; active nodes bypass it."""
+    from aiida_gui.app.cache import SealedNodeCache
+
+    cache = SealedNodeCache(max_bytes=1024, directory=str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"value": 42}
+
+    assert cache.get_or_compute(("summary", "uuid"), 1, True, compute) == {"value": 42}
+    assert cache.get_or_compute(("summary", "uuid"), 1, True, compute) == {"value": 42}
+    assert len(calls) == 1
+    # a new version, e.g. after editing the extras, is recomputed
+    cache.get_or_compute(("summary", "uuid"), 2, True, compute)
+    assert len(calls) == 2
+    cache.get_or_compute(("summary", "uuid"), 2, False, compute)
+    assert len(calls) == 3
+    # a fresh cache finds the persisted entry
+    restarted = SealedNodeCache(max_bytes=1024, directory=str(tmp_path))
+    assert restarted.get_or_compute(("summary", "uuid"), 2, True, compute) == {
+        "value": 42
+    }
+    assert len(calls) == 3
+    assert restarted.stats()["disk_hits"] == 1
+    # entries beyond the memory budget are evicted
+    small = SealedNodeCache(max_bytes=20, directory=None)
+    small.get_or_compute(("summary", "a"), 1, True, compute)
+    small.get_or_compute(("summary", "b"), 1, True, compute)
+    assert small.stats()["size"] == 1
+    assert small.stats()["evictions"] == 1
+
+
+@pytest.mark.backend
+def test_sealed_cache_disk_budget(tmp_path):
+    """Persisted entries beyond the disk budget are deleted, oldest first."""
+    import os
+    from aiida_gui.app.cache import SealedNodeCache
+
+    cache = SealedNodeCache(directory=str(tmp_path), max_disk_bytes=1000)
+    value = {"value": "x" * 100}
+    for index in range(20):
+        cache.put(("summary", f"uuid-{index}"), value, version=1)
+        # distinct modification times, oldest first
+        os.utime(cache._path(("summary", f"uuid-{index}")), (index, index))
+    files = os.listdir(tmp_path)
+    assert sum(os.path.getsize(tmp_path / name) for name in files) <= 1000
+    assert cache.stats()["disk_evictions"] > 0
+    cache.clear()
+    assert cache.get(("summary", "uuid-19"), 1) == value
+    assert cache.get(("summary", "uuid-0"), 1) is None
+
+
+@pytest.mark.backend
+def test_stats_route(client):
+    """Offloaded routes report their queue-wait metrics per endpoint group."""
+    client.get("/api/process-data")
+    stats = client.get("/api/stats").json()
+    assert stats["executor"]["groups"]["process"]["calls"] >= 1
+    assert "hits" in stats["single_flight"]
+
+
+@pytest.fixture
+def linked_workchain(aiida_profile):
+    """A workchain calling two calculations, where `second` uses the output of `first`."""
+    from aiida import orm
+    from aiida.common.links import LinkType
+
+    workchain = orm.WorkChainNode()
+    workchain.store()
+    first = orm.CalcFunctionNode()
+    first.base.links.add_incoming(workchain, LinkType.CALL_CALC, "first")
+    first.store()
+    result = orm.Int(1)
+    result.base.links.add_incoming(first, LinkType.CREATE, "result")
+    result.store()
+    second = orm.CalcFunctionNode()
+    second.base.links.add_incoming(workchain, LinkType.CALL_CALC, "second")
+    second.base.links.add_incoming(result, LinkType.INPUT_CALC, "x")
+    second.store()
+    return workchain, first, second
+
+
+@pytest.mark.backend
+def test_workchain_graph(linked_workchain):
+    """The graph lists the called processes and the data links between them."""
+    from aiida_gui.app.utils import get_workchain_data
+
+    workchain, first, second = linked_workchain
+    graph = get_workchain_data(workchain)
+    assert set(graph["nodes"]) == {first.pk, second.pk}
+    assert graph["nodes"][first.pk]["label"] == f"first-{first.pk}"
+    assert graph["links"] == [
+        {
+            "from_node": first.pk,
+            "to_node": second.pk,
+            "from_socket": "result",
+            "to_socket": "x",
+        }
+    ]
+    assert graph["nodes"][second.pk]["inputs"] == [{"name": "x", "identifier": "any"}]
+
+
+@pytest.fixture
+def large_workchain(aiida_profile):
+    """A workchain with 10k called calcfunctions chained through their
+    outputs, removed again afterwards so the other tests do not see it."""
+    from aiida import orm
+    from aiida.common.utils import get_new_uuid
+    from aiida.orm.entities import EntityTypes
+
+    workchain = orm.WorkChainNode()
+    workchain.store()
+    # storing 20k nodes one by one takes too long, so insert the rows directly
+    storage = workchain.backend
+    user_id = workchain.user.pk
+
+    def insert_nodes(node_type, count):
+        rows = [
+            {"uuid": get_new_uuid(), "node_type": node_type, "user_id": user_id}
+            for _ in range(count)
+        ]
+        return storage.bulk_insert(EntityTypes.NODE, rows, allow_defaults=True)
+
+    children = insert_nodes("process.calculation.calcfunction.CalcFunctionNode.", 10000)
+    results = insert_nodes("data.core.int.Int.", 10000)
+    links = []
+    for index, (child, result) in enumerate(zip(children, results)):
+        links.append((workchain.pk, child, "call_calc", f"step_{index}"))
+        links.append((child, result, "create", "result"))
+        if index:
+            links.append((results[index - 1], child, "input_calc", "x"))
+    storage.bulk_insert(
+        EntityTypes.LINK,
+        [
+            {"input_id": source, "output_id": target, "type": link_type, "label": label}
+            for source, target, link_type, label in links
+        ],
+    )
+    yield workchain
+    with storage.transaction():
+        storage.delete_nodes_and_connections([workchain.pk, *children, *results])
+
+
+@pytest.mark.slow
+def test_workchain_graph_benchmark(large_workchain):
+    """The graph of a workchain with 10k chained children is built with a
+    fixed number of queries."""
+    from sqlalchemy import event
+    from aiida_gui.app.utils import get_storage_session, get_workchain_data
+
+    statements = []
+    engine = get_storage_session().get_bind()
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().startswith(("SELECT", "WITH")):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        graph = get_workchain_data(large_workchain)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert len(graph["nodes"]) == 10000
+    assert len(graph["links"]) == 9999
+    assert len(statements) < 10
+
+
+@pytest.mark.backend
+def test_workchain_graph_collapsed(linked_workchain):
+    """Processes beyond `max_nodes` are collapsed and can be expanded."""
+    from aiida_gui.app.utils import get_workchain_data, expand_workchain_node
+
+    workchain, first, second = linked_workchain
+    graph = get_workchain_data(workchain, max_nodes=1)
+    assert set(graph["nodes"]) == {first.pk, f"collapsed-{workchain.pk}"}
+    collapsed = graph["nodes"][f"collapsed-{workchain.pk}"]
+    assert collapsed["child_count"] == 1
+    assert collapsed["expand"] == {"parent": workchain.pk, "skip": 1}
+    assert graph["links"] == []
+
+    expanded = expand_workchain_node(workchain.pk, skip=1, limit=10)
+    assert set(expanded["nodes"]) == {second.pk}
+    assert expanded["links"] == [
+        {
+            "from_node": first.pk,
+            "to_node": second.pk,
+            "from_socket": "result",
+            "to_socket": "x",
+        }
+    ]
+
+
+@pytest.mark.backend
+def test_workchain_expand_links(linked_workchain):
+    """Expanding only looks at links between siblings, each socket once."""
+    from aiida import orm
+    from aiida.common.links import LinkType
+    from aiida_gui.app.utils import expand_workchain_node
+
+    workchain, first, second = linked_workchain
+    result = first.base.links.get_outgoing(link_label_filter="result").one().node
+    # a process outside the workchain and a sibling that use the same output
+    outside = orm.CalcFunctionNode()
+    outside.base.links.add_incoming(result, LinkType.INPUT_CALC, "x")
+    outside.store()
+    third = orm.CalcFunctionNode()
+    third.base.links.add_incoming(workchain, LinkType.CALL_CALC, "third")
+    third.base.links.add_incoming(result, LinkType.INPUT_CALC, "x")
+    third.store()
+
+    expanded = expand_workchain_node(workchain.pk, skip=0, limit=10)
+    assert set(expanded["nodes"]) == {first.pk, second.pk, third.pk}
+    assert {link["to_node"] for link in expanded["links"]} == {second.pk, third.pk}
+    assert expanded["nodes"][first.pk]["outputs"] == [
+        {"name": "result", "identifier": "any"}
+    ]
+
+
+@pytest.mark.backend
+def test_parent_processes(aiida_profile):
+    """The ancestor chain is resolved in one query and memoized once sealed."""
+    from aiida import orm
+    from aiida.common.links import LinkType
+    from aiida_gui.app.cache import ancestor_cache
+    from aiida_gui.app.utils import (
+        get_parent_processes,
+        get_parent_processes_recursive,
+    )
+
+    outer = orm.WorkChainNode()
+    outer.set_process_label("Outer")
+    outer.store()
+    inner = orm.WorkChainNode()
+    inner.set_process_label("Inner")
+    inner.base.links.add_incoming(outer, LinkType.CALL_WORK, "inner")
+    inner.store()
+    parents = get_parent_processes(inner.pk)
+    assert [parent["pk"] for parent in parents] == [inner.pk, outer.pk]
+    assert [parent["label"] for parent in parents] == ["Inner", "Outer"]
+    assert parents == get_parent_processes_recursive(inner.pk)
+    assert ancestor_cache.get(("ancestors", inner.pk)) is None
+
+    inner.seal()
+    get_parent_processes(inner.pk)
+    assert ancestor_cache.get(("ancestors", inner.pk)) == parents
+
+
+@pytest.mark.backend
+def test_processes_latest_since(linked_workchain):
+    """The state poll returns all called processes, or only the changed ones."""
+    from aiida_gui.app.utils import get_processes_latest
+
+    workchain, first, second = linked_workchain
+    tasks = get_processes_latest(workchain.pk)
+    assert set(tasks) == {f"first-{first.pk}", f"second-{second.pk}"}
+    assert tasks[f"first-{first.pk}"]["pk"] == first.pk
+
+    second.set_process_state("finished")
+    tasks = get_processes_latest(workchain.pk, since=second.mtime)
+    assert set(tasks) == {f"second-{second.pk}"}
+    assert tasks[f"second-{second.pk}"]["state"] == "finished"
+
+
+@pytest.mark.backend
+def test_node_summary_links(linked_workchain):
+    """The summary groups the links of one query by direction and type."""
+    from aiida_gui.app.utils import get_node_summary, get_node_outputs
+
+    workchain, first, second = linked_workchain
+    result = first.base.links.get_outgoing().one().node
+    summary = get_node_summary(second)
+    assert summary["inputs"] == {"x": [result.pk, "Int", result.node_type]}
+    assert summary["outputs"] == {}
+    assert summary["called"] == {}
+    assert summary["caller"] == {
+        "second": [workchain.pk, "WorkChainNode", workchain.node_type]
+    }
+    assert get_node_summary(workchain)["called"] == {
+        "first": [first.pk, "CalcFunctionNode", first.node_type],
+        "second": [second.pk, "CalcFunctionNode", second.node_type],
+    }
+    assert get_node_outputs(first) == {"result": [result.pk, "Int", result.node_type]}
+
+
+@pytest.mark.backend
+def test_link_namespace_pages(aiida_profile):
+    """Link listings are paged per namespace, with collapsed sub-namespaces."""
+    from aiida import orm
+    from aiida.common.links import LinkType
+    from aiida_gui.app.utils import get_link_namespace, get_node_summary
+
+    process = orm.CalcFunctionNode()
+    process.store()
+    outputs = {}
+    for label in ["a__x", "a__b__y", "a__b__z", "c"]:
+        outputs[label] = orm.Int(1)
+        outputs[label].base.links.add_incoming(process, LinkType.CREATE, label)
+        outputs[label].store()
+
+    page = get_link_namespace(process.pk, "outputs")
+    assert page["total"] == 2
+    assert page["links"]["a"] == {"__namespace__": "a", "__count__": 3}
+    page = get_link_namespace(process.pk, "outputs", namespace="a.b", skip=1)
+    assert page["total"] == 2
+    assert page["links"] == {
+        "z": [outputs["a__b__z"].pk, "Int", outputs["a__b__z"].node_type]
+    }
+
+    summary = get_node_summary(process, link_limit=2)
+    assert summary["outputs"]["c"][0] == outputs["c"].pk
+    assert summary["truncated"] == {"outputs": 2}
+    assert summary["link_counts"]["outputs"] == 4
+    assert get_node_summary(process)["outputs"]["a"]["b"]["y"][0] == (
+        outputs["a__b__y"].pk
+    )
+
+
+@pytest.mark.backend
+def test_log_records(aiida_profile):
+    """Log records are read after a cursor and filtered in the query."""
+    from aiida import orm
+    from aiida.common import timezone
+    from aiida.common.links import LinkType
+    from aiida_gui.app.utils import get_log_range, get_log_records
+
+    outer = orm.WorkChainNode()
+    outer.store()
+    inner = orm.WorkChainNode()
+    inner.base.links.add_incoming(outer, LinkType.CALL_WORK, "inner")
+    inner.store()
+    for node, levelname, message in [
+        (outer, "REPORT", "outer started"),
+        (inner, "REPORT", "inner started"),
+        (inner, "INFO", "inner detail"),
+        (outer, "WARNING", "outer done"),
+    ]:
+        orm.Log(timezone.now(), "test", levelname, node.pk, message).store()
+
+    records = get_log_records(outer.pk)
+    assert [record["message"] for record in records] == [
+        "outer started",
+        "inner started",
+        "outer done",
+    ]
+    assert [record["depth"] for record in records] == [0, 1, 0]
+    assert records[1]["line"].endswith("]:     inner started")
+    assert get_log_records(outer.pk, after=records[0]["id"])[0] == records[1]
+    assert len(get_log_records(outer.pk, levelname="INFO")) == 4
+    assert [r["message"] for r in get_log_records(outer.pk, text="DONE")] == [
+        "outer done"
+    ]
+    assert len(get_log_records(outer.pk, subtree=False)) == 2
+
+    log_range = get_log_range(outer.pk, 1, 3)
+    assert log_range["total"] == 3
+    assert [r["id"] for r in log_range["records"]] == [r["id"] for r in records[1:]]
+    assert get_log_range(outer.pk, -1, None)["start"] == 2
+
+
+@pytest.mark.backend
+def test_log_stream_sealed(client, monkeypatch):
+    """Records written just before the process is seen sealed are still sent."""
+    import json
+    from aiida import orm
+    from aiida.common import timezone
+    from aiida_gui.app import process_node
+
+    node = orm.WorkChainNode()
+    node.store()
+    orm.Log(timezone.now(), "test", "REPORT", node.pk, "started").store()
+    node.seal()
+    get_node_fingerprint = process_node.get_node_fingerprint
+    calls = []
+
+    def fingerprint_after_last_record(pk):
+        calls.append(pk)
+        if len(calls) == 2:
+            # the first call checks that the process exists
+            orm.Log(timezone.now(), "test", "REPORT", node.pk, "failed").store()
+        return get_node_fingerprint(pk)
+
+    monkeypatch.setattr(
+        process_node, "get_node_fingerprint", fingerprint_after_last_record
+    )
+    response = client.get(f"/api/process-logs/{node.pk}/stream?format=ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["message"] for record in records] == ["started", "failed"]
+
+
+@pytest.mark.backend
+def test_trajectory_frames(client):
+    """Frames are sliced from the stored arrays, as JSON or float32 binary."""
+    import numpy as np
+    from aiida import orm
+
+    positions = np.arange(10 * 2 * 3, dtype=float).reshape(10, 2, 3)
+    cells = np.stack([np.eye(3) * (i + 1) for i in range(10)])
+    trajectory = orm.TrajectoryData()
+    trajectory.set_trajectory(["H", "O"], positions, cells=cells)
+    trajectory.store()
+
+    response = client.get(f"/api/datanode/{trajectory.pk}/frames/info")
+    assert response.json()["numsteps"] == 10
+    assert response.json()["symbols"] == ["H", "O"]
+
+    response = client.get(
+        f"/api/datanode/{trajectory.pk}/frames?start=1&stop=8&stride=3"
+    )
+    data = response.json()
+    assert data["positions"] == positions[1:8:3].tolist()
+    assert data["cells"] == cells[1:8:3].tolist()
+
+    response = client.get(
+        f"/api/datanode/{trajectory.pk}/frames?start=2&stop=4&format=binary"
+    )
+    assert response.headers["X-Frame-Count"] == "2"
+    frames = np.frombuffer(response.content, dtype="<f4").reshape(2, 9 + 6)
+    assert np.allclose(frames[:, :9], cells[2:4].reshape(2, 9))
+    assert np.allclose(frames[:, 9:], positions[2:4].reshape(2, 6))
+
+
+@pytest.mark.backend
+def test_array_slices(client):
+    """Arrays are served whole or sliced as npy, with metadata from the header."""
+    import io
+
+    import numpy as np
+    from aiida import orm
+
+    matrix = np.arange(5 * 4 * 3, dtype=np.int32).reshape(5, 4, 3)
+    node = orm.ArrayData()
+    node.set_array("matrix", matrix)
+    node.store()
+
+    response = client.get(f"/api/datanode/{node.pk}/arrays")
+    assert response.json()["matrix"]["shape"] == [5, 4, 3]
+    assert response.json()["matrix"]["dtype"] == matrix.dtype.str
+
+    response = client.get(f"/api/datanode/{node.pk}/array/matrix")
+    assert (np.load(io.BytesIO(response.content)) == matrix).all()
+
+    response = client.get(f"/api/datanode/{node.pk}/array/matrix?index=1:5:2,::2,2")
+    assert (np.load(io.BytesIO(response.content)) == matrix[1:5:2, ::2, 2]).all()
+
+    response = client.get(f"/api/datanode/{node.pk}/array/matrix?index=-1,1")
+    assert (np.load(io.BytesIO(response.content)) == matrix[-1, 1]).all()
+
+    response = client.get(f"/api/datanode/{node.pk}/array/matrix?index=1,2,0")
+    scalar = np.load(io.BytesIO(response.content))
+    assert scalar.shape == ()
+    assert scalar == matrix[1, 2, 0]
+
+    assert (
+        client.get(f"/api/datanode/{node.pk}/array/matrix?index=7").status_code == 400
+    )
+    assert (
+        client.get(f"/api/datanode/{node.pk}/array/matrix?index=::0").status_code == 400
+    )
+
+
+@pytest.mark.backend
+def test_array_downsample(client):
+    """Long series are reduced to the target width, keeping their extrema."""
+    import numpy as np
+    from aiida import orm
+
+    x = np.linspace(0, 10, 10000)
+    y = np.sin(x)
+    y[1234] = 5.0
+    node = orm.XyData()
+    node.set_x(x, "x", "a.u.")
+    node.set_y(y, "y", "a.u.")
+    node.store()
+
+    response = client.get(
+        f"/api/datanode/{node.pk}/downsample?name=y_array_0&width=200"
+    )
+    series = response.json()["series"][0]
+    assert len(series["x"]) == 200
+    assert series["x"][0] == x[0] and series["x"][-1] == x[-1]
+    assert 5.0 in series["y"]
+
+    response = client.get(
+        f"/api/datanode/{node.pk}/downsample?name=y_array_0&width=100&mode=minmax"
+    )
+    series = response.json()["series"][0]
+    assert len(series["min"]) == 100
+    assert max(series["max"]) == 5.0
+    assert min(series["min"]) == y.min()
+
+
+@pytest.mark.backend
+def test_attribute_overview(client):
+    """Large attributes are truncated to markers and opened one level at a time."""
+    from aiida import orm
+
+    node = orm.Dict(
+        {
+            "energy": -1.5,
+            "converged": True,
+            "name": "scf",
+            "forces": [[0.5 * i, 0.0, None] for i in range(2000)],
+            "nested": {"small": {"a": 1}, "large": list(range(5000))},
+        }
+    ).store()
+
+    data = client.get(f"/api/datanode/{node.pk}").json()
+    assert data["node_type"] == node.node_type
+    assert data["energy"] == -1.5 and data["converged"] is True
+    assert data["forces"]["__truncated__"] and data["forces"]["length"] == 2000
+    assert data["nested"]["__truncated__"] and data["nested"]["length"] == 2
+
+    data = client.get(f"/api/datanode/{node.pk}?path=nested").json()
+    assert data["type"] == "object"
+    assert data["value"]["small"] == {"a": 1}
+    assert data["value"]["large"]["length"] == 5000
+
+    data = client.get(f"/api/datanode/{node.pk}?path=forces&skip=10&limit=5").json()
+    assert data["value"] == [[0.5 * i, 0.0, None] for i in range(10, 15)]
+    data = client.get(f"/api/datanode/{node.pk}?path=forces.3.0").json()
+    assert data["value"] == 1.5
+
+    data = client.get(f"/api/datanode/{node.pk}?path=nested.large&full=true").json()
+    assert data["value"] == list(range(5000))
+    data = client.get(f"/api/datanode/{node.pk}?full=true").json()
+    assert data["nested"]["large"] == list(range(5000))
+
+
+@pytest.fixture
+def awkward_keys_node(aiida_profile):
+    """A Dict with keys that a dotted or JSON path cannot take as they are;
+    only nested keys may contain a dot."""
+    from aiida import orm
+
+    return orm.Dict(
+        {
+            "items": [1, 2, {"flag": False}],
+            "nested": {"a.b": {"c": 1}},
+            'say "hi"': [{"n": i} for i in range(1000)] + [True],
+        }
+    ).store()
+
+
+@pytest.mark.backend
+@pytest.mark.parametrize(
+    "path, value",
+    [
+        ("items.-1", {"flag": False}),
+        ("items.-3", 1),
+        ("nested.a\\.b.c", 1),
+        ('say "hi".-1', True),
+        ('say "hi".3.n', 3),
+    ],
+    ids=[
+        "negative index",
+        "negative first index",
+        "dotted key",
+        "quoted key",
+        "below quoted key",
+    ],
+)
+def test_attribute_paths(client, awkward_keys_node, path, value):
+    """Negative indices and keys with dots or quotes are addressed by path."""
+    pk = awkward_keys_node.pk
+    data = client.get(f"/api/datanode/{pk}", params={"path": path}).json()
+    assert data["value"] == value
+    data = client.get(f"/api/datanode/{pk}", params={"path": path, "full": True})
+    assert data.json()["value"] == value
+
+
+@pytest.mark.backend
+def test_attribute_paths_missing(client, awkward_keys_node):
+    """Out-of-range indices and unknown keys are not found."""
+    from aiida_gui.app.attributes import get_attribute_overview
+
+    pk = awkward_keys_node.pk
+    assert get_attribute_overview(pk, "items.-4") is None
+    assert get_attribute_overview(pk, "items.3") is None
+    assert get_attribute_overview(pk, 'say "ho".0') is None
+    data = get_attribute_overview(pk, 'say "hi"', max_size=100, skip=999, limit=5)
+    assert data["length"] == 1001
+    assert data["value"] == [{"n": 999}, True]
+
+
+@pytest.mark.backend
+def test_repository_browser(client):
+    """Repository listings are lazy; files stream with ranges, gzip and tail."""
+    import io
+
+    from aiida import orm
+
+    content = "".join(f"line {i}\n" for i in range(1000)).encode()
+    folder = orm.FolderData()
+    folder.base.repository.put_object_from_filelike(
+        io.BytesIO(content), "out/aiida.out"
+    )
+    folder.base.repository.put_object_from_filelike(io.BytesIO(b"x"), "input.txt")
+    folder.store()
+
+    listing = client.get(f"/api/node/{folder.pk}/repository").json()
+    assert [entry["name"] for entry in listing["entries"]] == ["out", "input.txt"]
+    assert listing["entries"][0]["type"] == "directory"
+    listing = client.get(f"/api/node/{folder.pk}/repository?path=out").json()
+    assert listing["entries"] == [
+        {"name": "aiida.out", "type": "file", "size": len(content)}
+    ]
+
+    url = f"/api/node/{folder.pk}/repository/file?path=out/aiida.out"
+    assert client.get(url).content == content
+    response = client.get(url, headers={"Range": "bytes=7-20"})
+    assert response.status_code == 206
+    assert response.content == content[7:21]
+    assert response.headers["Content-Range"] == f"bytes 7-20/{len(content)}"
+    assert client.get(url, headers={"Range": "bytes=-5"}).content == content[-5:]
+    assert client.get(url, headers={"Range": "bytes=99999-"}).status_code == 416
+
+    response = client.get(f"{url}&compress=gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.content == content
+
+    response = client.get(f"{url}&tail=3")
+    assert response.text == "line 997\nline 998\nline 999\n"
+
+
+@pytest.mark.backend
+def test_batch_process_action(client, monkeypatch):
+    """A batch action returns a job that collects the outcome per process."""
+    from concurrent.futures import Future
+
+    from aiida import orm
+    from aiida.engine import ProcessState
+
+    from aiida_gui.app import jobs
+
+    def make_process(state):
+        node = orm.WorkflowNode()
+        node.set_process_state(state)
+        return node.store()
+
+    running = [make_process(ProcessState.RUNNING) for _ in range(3)]
+    finished = make_process(ProcessState.FINISHED)
+    futures = {}
+
+    class Controller:
+        def pause_process(self, pk):
+            futures[pk] = Future()
+            return futures[pk]
+
+    monkeypatch.setattr(jobs, "get_process_controller", Controller)
+
+    pks = [node.pk for node in running] + [finished.pk]
+    response = client.post("/api/process/pause", json={"pks": pks})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    job = client.get(f"/api/jobs/{job_id}").json()
+    assert job["counts"] == {"pending": 3, "skipped": 1}
+
+    futures[running[0].pk].set_result(True)
+    futures[running[1].pk].set_result(False)
+    job = client.get(f"/api/jobs/{job_id}?since={job['version']}").json()
+    assert set(job["results"]) == {str(running[0].pk), str(running[1].pk)}
+    assert job["results"][str(running[0].pk)]["status"] == "ok"
+    assert job["results"][str(running[1].pk)]["status"] == "failed"
+
+    jobs.jobs.get(job_id).expire()
+    job = client.get(f"/api/jobs/{job_id}").json()
+    assert job["done"] and job["counts"]["timeout"] == 1
+
+    # the filter selects the active processes only
+    response = client.post(
+        "/api/process/pause",
+        json={"filterModel": {"items": [], "quickFilterValues": []}},
+    )
+    job = client.get(f"/api/jobs/{response.json()['job_id']}").json()
+    assert str(finished.pk) not in job["results"]
+    assert all(str(node.pk) in job["results"] for node in running)
+
+    # the body is validated, and only process tables have batch actions
+    response = client.post("/api/process/pause", json={"pks": "123"})
+    assert response.status_code == 422
+    response = client.post("/api/process/pause", json={"filterModel": "{bad"})
+    assert response.status_code == 400
+    response = client.post("/api/datanode/pause", json={"pks": [finished.pk]})
+    assert response.status_code in (404, 405)
+
+
+@pytest.mark.backend
+def test_background_delete(client, monkeypatch, tmp_path):
+    """Deletes run as persistent jobs, reporting the nodes found so far."""
+    import time
+
+    from aiida import orm
+    from aiida.common.links import LinkType
+    from aiida.tools import delete_nodes
+
+    from aiida_gui.app import background
+
+    monkeypatch.setattr(background, "JOB_WORKERS", 0)
+    monkeypatch.setattr(background, "_pool", None)
+    monkeypatch.setattr(background, "_table", background.JobTable(tmp_path / "jobs"))
+
+    def make_calculation():
+        source = orm.Int(1).store()
+        calc = orm.CalculationNode()
+        calc.base.links.add_incoming(source, LinkType.INPUT_CALC, "x")
+        calc.store()
+        result = orm.Int(2)
+        result.base.links.add_incoming(calc, LinkType.CREATE, "result")
+        result.store()
+        return source, calc, result
+
+    def wait(job_id):
+        for _ in range(100):
+            job = client.get(f"/api/jobs/{job_id}").json()
+            if job["done"]:
+                return job
+            time.sleep(0.1)
+        raise AssertionError(f"Job {job_id} did not finish")
+
+    source, calc, result = make_calculation()
+    response = client.delete(
+        f"/api/datanode/delete/{result.pk}?dry_run=true&background=true"
+    )
+    job = wait(response.json()["job_id"])
+    assert {pk for event in job["events"] for pk in event["pks"]} == (
+        delete_nodes([result.pk], dry_run=True)[0]
+    )
+
+    response = client.delete(
+        f"/api/datanode/delete/{source.pk}?dry_run=true&background=true"
+    )
+    job = wait(response.json()["job_id"])
+    assert job["status"] == "done" and job["result"]["count"] == 3
+    assert sorted(pk for event in job["events"] for pk in event["pks"]) == sorted(
+        [source.pk, calc.pk, result.pk]
+    )
+    assert orm.QueryBuilder().append(orm.Node, filters={"id": calc.pk}).count() == 1
+
+    response = client.delete(f"/api/datanode/delete/{source.pk}?background=true")
+    job = wait(response.json()["job_id"])
+    assert job["status"] == "done" and job["result"]["deleted"]
+    assert orm.QueryBuilder().append(orm.Node, filters={"id": calc.pk}).count() == 0
+
+    # a job cancelled before it started is not run
+    source, calc, result = make_calculation()
+    table = background.get_job_table()
+    job_id = table.create("delete_nodes", "test", {"pks": [source.pk]})
+    table.request_cancel(job_id)
+    assert background.run_job(table.path, job_id) == "cancelled"
+    assert orm.QueryBuilder().append(orm.Node, filters={"id": calc.pk}).count() == 1
+
+
+@pytest.mark.backend
+def test_background_jobs_owner(tmp_path):
+    """A restarted server fails only the unfinished jobs of stopped servers."""
+    import subprocess
+    import sys
+
+    from aiida_gui.app import background
+
+    table = background.JobTable(str(tmp_path / "jobs"))
+    live = table.create("delete_nodes", "test", {"pks": []})
+    stopped = table.create("delete_nodes", "test", {"pks": []})
+    other_host = table.create("delete_nodes", "test", {"pks": []})
+    # a server process that has exited
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    table.update(stopped, owner_pid=process.pid)
+    table.update(other_host, owner_host="elsewhere", owner_pid=process.pid)
+
+    table.fail_unfinished("test", "Interrupted by a server restart")
+    assert table.get(live)["status"] == "queued"
+    assert table.get(stopped)["status"] == "failed"
+    assert table.get(other_host)["status"] == "queued"
+
+
+@pytest.mark.backend
+def test_background_delete_worker_process(client, monkeypatch, tmp_path):
+    """With worker processes, jobs run in a spawned process that loads the
+    profile by itself."""
+    import time
+
+    from aiida import orm
+
+    from aiida_gui.app import background
+
+    monkeypatch.setattr(background, "JOB_WORKERS", 1)
+    monkeypatch.setattr(background, "_pool", None)
+    monkeypatch.setattr(background, "_table", background.JobTable(tmp_path / "jobs"))
+    node = orm.Int(1).store()
+    try:
+        job = background.submit_job("delete_nodes", pks=[node.pk])
+        for _ in range(600):
+            job = background.get_job_table().get(job["id"])
+            if job["done"]:
+                break
+            time.sleep(0.1)
+        assert job["status"] == "done", job["error"]
+        assert job["result"] == {"dry_run": False, "deleted": True, "count": 1}
+        assert not orm.QueryBuilder().append(orm.Node, filters={"id": node.pk}).count()
+    finally:
+        background.get_pool().shutdown()
+
+
+@pytest.mark.backend
+def test_task_action(client, linked_workchain, monkeypatch):
+    """Task actions are sent at once and tracked per task in a job."""
+    from concurrent.futures import Future
+
+    from aiida import orm
+
+    from aiida_gui.app import jobs
+
+    workchain, first, second = linked_workchain
+    other = orm.CalcFunctionNode().store()
+    futures = {}
+
+    class Controller:
+        def play_process(self, pk):
+            futures[pk] = Future()
+            return futures[pk]
+
+    monkeypatch.setattr(jobs, "get_process_controller", Controller)
+
+    tasks = [
+        {"name": "first", "pk": first.pk},
+        f"second-{second.pk}",
+        {"name": "third", "pk": None},
+        {"name": "other", "pk": other.pk},
+    ]
+    response = client.post(f"/api/process/tasks/play/{workchain.pk}", json=tasks)
+    assert response.status_code == 202
+    data = response.json()
+    assert data["tasks"] == {"first": first.pk, "second": second.pk, "other": other.pk}
+    assert data["not_started"] == ["third"]
+    # only the processes of the workchain are played
+    assert set(futures) == {first.pk, second.pk}
+
+    futures[first.pk].set_result(True)
+    futures[second.pk].set_exception(RuntimeError("boom"))
+    job = client.get(f"/api/jobs/{data['job_id']}").json()
+    assert job["done"]
+    assert job["results"][str(first.pk)]["status"] == "ok"
+    assert job["results"][str(second.pk)] == {"status": "failed", "message": "boom"}
+    assert job["results"][str(other.pk)]["status"] == "failed"
+
+
+@pytest.mark.backend
+def test_process_facets(client):
+    """The facets count the processes matching the filter per column value."""
+    import json
+
+    from aiida import orm
+    from aiida.engine import ProcessState
+
+    label = "FacetedCalculation"
+    for state, exit_status in [
+        (ProcessState.FINISHED, 0),
+        (ProcessState.FINISHED, 0),
+        (ProcessState.FINISHED, 3),
+        (ProcessState.EXCEPTED, None),
+    ]:
+        node = orm.CalculationNode()
+        node.set_process_state(state)
+        node.set_process_label(label)
+        if exit_status is not None:
+            node.set_exit_status(exit_status)
+        node.store()
+    # not matched by `exactly`, with which facet chips narrow the table
+    node = orm.CalculationNode()
+    node.set_process_label(f"{label}Extended")
+    node.store()
+
+    filter_model = json.dumps(
+        {"items": [{"field": "process_label", "operator": "exactly", "value": label}]}
+    )
+    response = client.get(
+        "/api/process-data/facets", params={"filterModel": filter_model}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 4
+    assert data["facets"]["process_state"] == [
+        {"value": "finished", "count": 3},
+        {"value": "excepted", "count": 1},
+    ]
+    assert {"value": 0, "count": 2} in data["facets"]["exit_status"]
+    assert data["facets"]["computer"] == [{"value": None, "count": 4}]
+
+    response = client.get(
+        "/api/process-data/facets",
+        params={"filterModel": filter_model},
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+
+    # the values of a filter are inlined in the grouping query
+    quick_filter = json.dumps(
+        {
+            "items": [
+                {"field": "process_label", "operator": "exactly", "value": label}
+            ],
+            "quickFilterValues": ["it's:50%"],
+        }
+    )
+    response = client.get(
+        "/api/process-data/facets", params={"filterModel": quick_filter}
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+
+
+@pytest.mark.backend
+def test_datagrid_filter_operators():
+    """`equals` and `is` keep matching substrings; only `exactly` matches a
+    whole value."""
+    import json
+
+    from aiida_gui.app.utils import translate_datagrid_filter_json
+
+    def translate(field, operator, value):
+        item = {"field": field, "operator": operator, "value": value}
+        return translate_datagrid_filter_json(json.dumps({"items": [item]}), [])
+
+    for operator in ("contains", "equals", "is"):
+        assert translate("process_label", operator, "Pw") == {
+            "attributes.process_label": {"like": "%Pw%"}
+        }
+        assert translate("exit_status", operator, "3") == {
+            "attributes.exit_status": {"like": "%3%"}
+        }
+    assert translate("process_label", "exactly", "Pw") == {
+        "attributes.process_label": "Pw"
+    }
+
+
+@pytest.mark.backend
+def test_workchain_rollup(client):
+    """The rollup counts the whole subtree and follows its changes."""
+    from aiida import orm
+    from aiida.common.links import LinkType
+    from aiida.engine import ProcessState
+
+    def call(parent, node_cls, state, link_type=LinkType.CALL_CALC):
+        node = node_cls()
+        node.base.links.add_incoming(parent, link_type, "call")
+        node.set_process_state(state)
+        return node.store()
+
+    root = orm.WorkChainNode()
+    root.set_process_state(ProcessState.WAITING)
+    root.store()
+    sub = call(root, orm.WorkChainNode, ProcessState.WAITING, LinkType.CALL_WORK)
+    call(root, orm.CalcJobNode, ProcessState.FINISHED)
+    running = call(sub, orm.CalcJobNode, ProcessState.RUNNING)
+    call(sub, orm.CalcJobNode, ProcessState.EXCEPTED)
+
+    response = client.get(f"/api/workchain/{root.pk}/rollup")
+    assert response.status_code == 200
+    rollup = response.json()
+    assert rollup["total"] == 4
+    assert rollup["states"] == {
+        "excepted": 1,
+        "finished": 1,
+        "running": 1,
+        "waiting": 1,
+    }
+    assert rollup["ctime"] is not None and rollup["mtime"] is not None
+    etag = response.headers["ETag"]
+    response = client.get(
+        f"/api/workchain/{root.pk}/rollup", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    # a new grandchild and a finished one are picked up incrementally
+    call(sub, orm.CalcJobNode, ProcessState.CREATED)
+    running.set_process_state(ProcessState.FINISHED)
+    orm.WorkChainNode().store()
+    response = client.get(
+        f"/api/workchain/{root.pk}/rollup", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["states"] == {
+        "created": 1,
+        "excepted": 1,
+        "finished": 2,
+        "waiting": 1,
+    }
+
+
+@pytest.mark.backend
+def test_workchain_rollup_rebuild_race(aiida_profile, monkeypatch):
+    """A descendant terminated between the fingerprint and the rebuild query
+    is counted once."""
+    from aiida import orm
+    from aiida.common.links import LinkType
+    from aiida.engine import ProcessState
+    from aiida_gui.app import rollup
+
+    root = orm.WorkChainNode()
+    root.set_process_state(ProcessState.WAITING)
+    root.store()
+    get_table_fingerprint = rollup.get_table_fingerprint
+    # the fingerprint read just before a fast calcfunction was stored
+    stale = get_table_fingerprint(orm.Node)
+    node = orm.CalcFunctionNode()
+    node.base.links.add_incoming(root, LinkType.CALL_CALC, "call")
+    node.set_process_state(ProcessState.FINISHED)
+    node.store()
+    monkeypatch.setattr(rollup, "get_table_fingerprint", lambda cls: stale)
+    subtree = rollup.SubtreeRollup(root.pk)
+    subtree.rebuild()
+    monkeypatch.setattr(rollup, "get_table_fingerprint", get_table_fingerprint)
+    subtree.update()
+    assert subtree.to_dict()["states"] == {"finished": 1}
+
+
+@pytest.mark.backend
+def test_query_builder_fallback(linked_workchain, awkward_keys_node, monkeypatch):
+    """Storage backends without SQL access get the same answers from the
+    QueryBuilder."""
+    from aiida import orm
+    from aiida.common.links import LinkType
+    from aiida_gui.app import attributes, rollup, utils
+
+    workchain, first, second = linked_workchain
+    sub = orm.WorkChainNode()
+    sub.base.links.add_incoming(workchain, LinkType.CALL_WORK, "sub")
+    sub.set_process_state("waiting")
+    sub.store()
+    inner = orm.CalcFunctionNode()
+    inner.base.links.add_incoming(sub, LinkType.CALL_CALC, "inner")
+    inner.set_process_state("finished")
+    inner.store()
+    pk = awkward_keys_node.pk
+
+    def answers():
+        return [
+            utils.get_node_links(
+                second.pk, incoming=utils.INPUT_LINK_TYPES + utils.CALL_LINK_TYPES
+            ),
+            utils.get_node_links(
+                workchain.pk, outgoing=utils.CALL_LINK_TYPES, label_prefix="s"
+            ),
+            utils.count_called_processes([workchain.pk, sub.pk, first.pk]),
+            sorted(utils.get_descendants(workchain.pk)),
+            utils.get_descendants(-1),
+            utils.get_parent_processes(inner.pk),
+            rollup.get_descendants_of(workchain.pk, [inner.pk, sub.pk, -1]),
+            rollup.RollupCache().get(workchain.pk),
+            sorted(
+                utils.get_process_facets(
+                    orm.ProcessNode, {"id": {"in": [first.pk, sub.pk, inner.pk]}}
+                ),
+                key=str,
+            ),
+            attributes.get_attribute_value(pk, "items.-1"),
+            attributes.get_attribute_value(pk, "items.3"),
+            attributes.get_attribute_overview(pk, "nested"),
+            attributes.get_attribute_overview(
+                pk, 'say "hi"', max_size=100, skip=999, limit=5
+            ),
+        ]
+
+    expected = answers()
+    executed = []
+    for module in (utils, rollup, attributes):
+        monkeypatch.setattr(module, "supports_raw_sql", lambda: False)
+        monkeypatch.setattr(module, "execute_sql", lambda *a, **k: executed.append(a))
+    assert answers() == expected
+    assert not executed